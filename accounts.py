@@ -0,0 +1,134 @@
+"""
+accounts.py — Account registry and concurrent scheduler
+========================================================
+Accounts come from, in order:
+  - BOT_ACCOUNTS   — JSON list (e.g. one GitHub secret holding every account)
+  - accounts_file  — the same JSON list in a file (config.json, or BOT_ACCOUNTS_FILE)
+  - APCA_API_KEY_<n> / APCA_API_SECRET_<n> / APCA_BASE_URL_<n> for any n
+
+JSON entries: {"name", "api_key", "api_secret", "base_url"}; a value written
+"$VAR" is read from that environment variable, so the file can be committed
+while the keys stay in secrets.
+
+run_accounts() runs one job per account on a thread pool. Each account's
+output is buffered and printed as one block when it finishes, and an
+exception in one account is reported without touching the others.
+"""
+
+import io
+import os
+import re
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import tracing
+
+DEFAULT_URL = "https://paper-api.alpaca.markets"
+
+Account = tuple[str, str, str, str]          # (name, api_key, api_secret, base_url)
+
+# ─── REGISTRY ────────────────────────────────────────────────────────────────
+
+def load_accounts(cfg: dict | None = None) -> list[Account]:
+    """Every configured account, in registry order; duplicates (same key) dropped."""
+    cfg = cfg or {}
+    raw = os.getenv("BOT_ACCOUNTS")
+    if raw:
+        entries = json.loads(raw)
+    elif path := os.getenv("BOT_ACCOUNTS_FILE") or cfg.get("accounts_file"):
+        with open(path, "r") as f:
+            entries = json.load(f)
+    else:
+        return _env_accounts()
+
+    accounts, seen = [], set()
+    for i, entry in enumerate(entries, start=1):
+        key    = _resolve(entry.get("api_key"))
+        secret = _resolve(entry.get("api_secret"))
+        url    = _resolve(entry.get("base_url")) or DEFAULT_URL
+        name   = entry.get("name") or f"Account {i}"
+        if not key or not secret:
+            print(f"⚠️  {name}: missing api_key / api_secret, skipping.")
+            continue
+        if key in seen:
+            continue
+        seen.add(key)
+        accounts.append((name, key, secret, url))
+    return accounts
+
+
+def _env_accounts() -> list[Account]:
+    suffixes = [m.group(1) for v in os.environ if (m := re.fullmatch(r"APCA_API_KEY_(\w+)", v))]
+    suffixes.sort(key=lambda s: (not s.isdigit(), int(s) if s.isdigit() else 0, s))
+
+    accounts = []
+    for s in suffixes:
+        key    = os.getenv(f"APCA_API_KEY_{s}")
+        secret = os.getenv(f"APCA_API_SECRET_{s}")
+        url    = os.getenv(f"APCA_BASE_URL_{s}") or DEFAULT_URL
+        if key and secret:
+            accounts.append((f"Account {s}", key, secret, url))
+    return accounts
+
+
+def _resolve(value: str | None) -> str | None:
+    if isinstance(value, str) and value.startswith("$"):
+        return os.getenv(value[1:])
+    return value
+
+# ─── SCHEDULER ───────────────────────────────────────────────────────────────
+
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout stand-in: threads with a buffer write to it, others pass through."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local  = threading.local()
+
+    def write(self, text: str) -> int:
+        buf = getattr(self.local, "buf", None)
+        return (buf or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def run_accounts(accounts: list[Account], job, workers: int = 4) -> list:
+    """
+    job(name, api_key, api_secret, base_url) for every account, up to
+    `workers` at a time. Returns results in account order (None where the
+    job raised).
+    """
+    if workers <= 1 or len(accounts) <= 1:
+        return [_run_one(job, account, None) for account in accounts]
+
+    out        = _ThreadOutput(sys.stdout)
+    print_lock = threading.Lock()
+    sys.stdout = out
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="account") as pool:
+            futures = [pool.submit(_run_one, job, account, (out, print_lock))
+                       for account in accounts]
+            return [f.result() for f in futures]
+    finally:
+        sys.stdout = out.stream
+
+
+def _run_one(job, account: Account, output):
+    name = account[0]
+    if output:
+        out, print_lock = output
+        out.local.buf   = io.StringIO()
+    try:
+        with tracing.span("account", account=name):
+            return job(*account)
+    except Exception as e:
+        print(f"  ❌ {name} failed: {type(e).__name__}: {e}")
+        return None
+    finally:
+        if output:
+            text, out.local.buf = out.local.buf.getvalue(), None
+            with print_lock:
+                out.stream.write(text)
+                out.stream.flush()
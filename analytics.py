@@ -0,0 +1,167 @@
+"""
+analytics.py — Realized P&L and performance over the fill ledger
+=================================================================
+Buys and sells from ledger.py are matched FIFO per symbol. Matching is done
+on cumulative quantities rather than lot by lot: each symbol's buy and sell
+streams are laid out as intervals of shares, and every overlap of a buy
+interval with a sell interval is one matched piece (qty, entry, exit). That
+is a handful of NumPy calls per symbol, so years of fills stay well under a
+second.
+
+Sells with no earlier buy in the ledger (positions opened before the ledger
+began) are left unmatched rather than paired with a later buy.
+
+Metrics: realized P&L, win rate (per closing fill), profit factor, average
+win/loss and holding time, per-symbol contribution, realized drawdown, and
+attribution to the indicators that confirmed each entry (read from the
+client_order_id tag the bot puts on buys, see execution.signal_order_id).
+"""
+
+import numpy as np
+import pandas as pd
+from execution import order_signals, indicator_tags
+
+PIECES = {"symbol": object, "qty": float, "entry_price": float, "exit_price": float,
+          "entry_at": "datetime64[ns, UTC]", "exit_at": "datetime64[ns, UTC]",
+          "pnl": float, "entry_order": object, "exit_order": object}
+
+# ─── FIFO MATCHING ───────────────────────────────────────────────────────────
+
+def match_fifo(fills: pd.DataFrame) -> pd.DataFrame:
+    """One row per matched (buy, sell) piece, in exit order."""
+    pieces = []
+    for symbol, df in fills.sort_values("filled_at", kind="stable").groupby("symbol", sort=False):
+        buys  = df[df["side"] == "buy"]
+        sells = df[df["side"] == "sell"]
+        if buys.empty or sells.empty:
+            continue
+        pieces.append(_match_symbol(symbol, buys, sells))
+
+    if not pieces:                           # typed, so holding-time math still works
+        return pd.DataFrame({c: pd.Series(dtype=t) for c, t in PIECES.items()})
+    return pd.concat(pieces, ignore_index=True).sort_values("exit_at", kind="stable",
+                                                            ignore_index=True)
+
+
+def _match_symbol(symbol: str, buys: pd.DataFrame, sells: pd.DataFrame) -> pd.DataFrame:
+    b_qty  = buys["qty"].to_numpy(dtype=np.float64)
+    s_qty  = sells["qty"].to_numpy(dtype=np.float64)
+    b_time = buys["filled_at"].to_numpy(dtype="datetime64[ns]")
+    s_time = sells["filled_at"].to_numpy(dtype="datetime64[ns]")
+    cum_b  = np.cumsum(b_qty)
+    cum_s  = np.cumsum(s_qty)
+
+    # Shares bought up to each sell; anything sold beyond that was opened
+    # before the ledger starts and is dropped from the sell stream
+    bought    = np.concatenate([[0.0], cum_b])[np.searchsorted(b_time, s_time, side="right")]
+    unmatched = np.maximum.accumulate(np.maximum(cum_s - bought, 0.0))
+    cum_s     = cum_s - unmatched
+
+    # Overlaps of [cum_b[i-1], cum_b[i]) with [cum_s[j-1], cum_s[j])
+    total = min(cum_b[-1], cum_s[-1])
+    edges = np.unique(np.concatenate([[0.0], cum_b, cum_s]))
+    edges = edges[edges <= total]
+    lo, hi = edges[:-1], edges[1:]
+    i = np.searchsorted(cum_b, lo, side="right")
+    j = np.searchsorted(cum_s, lo, side="right")
+
+    qty   = hi - lo
+    entry = buys["price"].to_numpy(dtype=np.float64)[i]
+    exit_ = sells["price"].to_numpy(dtype=np.float64)[j]
+    return pd.DataFrame({
+        "symbol":      symbol,
+        "qty":         qty,
+        "entry_price": entry,
+        "exit_price":  exit_,
+        "entry_at":    pd.to_datetime(b_time[i], utc=True),
+        "exit_at":     pd.to_datetime(s_time[j], utc=True),
+        "pnl":         qty * (exit_ - entry),
+        "entry_order": buys["client_order_id"].to_numpy(dtype=object)[i],
+        "exit_order":  sells["id"].to_numpy(dtype=object)[j],
+    })
+
+# ─── METRICS ─────────────────────────────────────────────────────────────────
+
+def performance(fills: pd.DataFrame, since: pd.Timestamp | None = None) -> dict:
+    """
+    Metrics over every round trip closed at/after `since` (entries may be
+    older). Returns {"summary": {...}, "by_symbol": DataFrame,
+    "by_indicator": DataFrame, "pieces": DataFrame}.
+    """
+    pieces = match_fifo(fills)
+    if since is not None and len(pieces):
+        pieces = pieces[pieces["exit_at"] >= pd.Timestamp(since)].reset_index(drop=True)
+
+    # A "trade" is one closing fill: all pieces it matched
+    trades = pieces.groupby("exit_order", sort=False).agg(
+        symbol=("symbol", "first"), pnl=("pnl", "sum"), exit_at=("exit_at", "first"))
+    wins   = trades["pnl"][trades["pnl"] > 0]
+    losses = trades["pnl"][trades["pnl"] < 0]
+
+    curve = trades.sort_values("exit_at")["pnl"].cumsum()
+    draw  = curve - np.maximum(curve.cummax(), 0.0)
+    held  = (pieces["exit_at"] - pieces["entry_at"]).dt.total_seconds() / 60
+    summary = {
+        "realized_pnl":     float(trades["pnl"].sum()),
+        "trades":           len(trades),
+        "win_rate_pct":     float(len(wins) / len(trades) * 100) if len(trades) else 0.0,
+        "profit_factor":    float(wins.sum() / -losses.sum()) if len(losses) else float("inf") if len(wins) else 0.0,
+        "avg_win":          float(wins.mean()) if len(wins) else 0.0,
+        "avg_loss":         float(losses.mean()) if len(losses) else 0.0,
+        "max_drawdown":     float(draw.min()) if len(draw) else 0.0,
+        "avg_hold_min":     float(np.average(held, weights=pieces["qty"])) if len(pieces) else 0.0,
+    }
+
+    by_symbol = trades.assign(win=(trades["pnl"] > 0) * 100.0).groupby("symbol").agg(
+        pnl=("pnl", "sum"), trades=("pnl", "size"), win_rate_pct=("win", "mean"),
+    ).sort_values("pnl", ascending=False)
+
+    return {"summary": summary, "by_symbol": by_symbol,
+            "by_indicator": attribute(pieces), "pieces": pieces}
+
+
+def attribute(pieces: pd.DataFrame) -> pd.DataFrame:
+    """P&L of round trips whose entry each indicator confirmed (untagged entries skipped)."""
+    # Parse each distinct flag set once, then broadcast by code
+    orders, entry   = pd.factorize(pieces["entry_order"])
+    flags           = pd.Series(entry, dtype=object).str.extract(r"^(sig-[a-z_]+-)", expand=False)
+    fcodes, distinct = pd.factorize(flags)
+    codes = np.append(fcodes, -1)[orders]      # factorize marks missing as -1 in both
+    tags  = [order_signals(f) for f in distinct]
+    pnl   = pieces["pnl"].to_numpy(dtype=np.float64)
+    rows  = []
+    for name in indicator_tags().values():
+        has  = np.array([name in t for t in tags] + [False], dtype=bool)
+        mask = has[codes]                       # code -1 (untagged) hits the trailing False
+        p    = pnl[mask]
+        rows.append({"indicator": name, "pnl": float(p.sum()), "pieces": int(mask.sum()),
+                     "win_rate_pct": float((p > 0).mean() * 100) if len(p) else 0.0})
+    return pd.DataFrame(rows).set_index("indicator")
+
+# ─── REPORT SECTION ──────────────────────────────────────────────────────────
+
+def report_lines(fills: pd.DataFrame, since: pd.Timestamp | None = None, label: str = "All time") -> list[str]:
+    """Realized-performance block for report.py."""
+    perf = performance(fills, since)
+    s    = perf["summary"]
+    if not s["trades"]:
+        return [f"  Realized ({label}): no closed trades"]
+
+    pf    = "∞" if s["profit_factor"] == float("inf") else f"{s['profit_factor']:.2f}"
+    icon  = "📈" if s["realized_pnl"] >= 0 else "📉"
+    lines = [
+        f"  Realized ({label}): ${s['realized_pnl']:+,.2f}  {icon}",
+        f"    {s['trades']} trades | win rate {s['win_rate_pct']:.0f}% | profit factor {pf}",
+        f"    avg win ${s['avg_win']:+,.2f} | avg loss ${s['avg_loss']:+,.2f} | "
+        f"max drawdown ${s['max_drawdown']:,.2f} | avg hold {s['avg_hold_min']:.0f} min",
+    ]
+    top = perf["by_symbol"]
+    if len(top):
+        lines.append("    By symbol: " + ", ".join(
+            f"{sym} ${row.pnl:+,.0f}" for sym, row in top.head(8).iterrows()))
+    ind = perf["by_indicator"]
+    if ind["pieces"].sum():
+        lines.append("    By entry signal: " + ", ".join(
+            f"{name} ${row.pnl:+,.0f} ({row.win_rate_pct:.0f}% win)"
+            for name, row in ind.iterrows() if row.pieces))
+    return lines
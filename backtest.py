@@ -0,0 +1,500 @@
+"""
+backtest.py — Offline replay of config.json against historical minute bars
+===========================================================================
+Replays cached minute bars through the bot's rules and reports a trade log
+and an equity curve:
+  - signals: generate_signals' weighted vote, evaluated for every bar at once
+    (rolling/EWM series over the full history + indicators.vote)
+  - exits:   with bracket_exits (exits.py), a take-profit limit and a stop
+             resting at the broker from the fill on, hit intrabar by the
+             high / low traded between cycles, the stop ratcheted up to the
+             trailing floor each cycle as exits.reconcile does; otherwise the
+             per-cycle sweep on unrealized P&L, as check_stops_and_targets
+  - sizing:  max_trade_pct / max_position_pct / max_open_positions, buys in
+             scan order (held symbols, then the rest by scan.py's momentum
+             pre-filter), as run_signals
+  - circuit breakers: daily profit target / loss limit close everything and
+    halt until the next session, as trade_account
+
+The portfolio loop steps once per bot cycle (every `cycle_minutes`, 5 like
+the cron) over precomputed NumPy arrays, so a year of minute bars for the
+whole watchlist runs in seconds.
+
+Fill model: limit orders are marketable (±0.1% of the last close) and fill
+at their limit price. Swept stops fill at the last close; broker stops at
+the stop price, or the first close after a gap through it, and when a
+take-profit and a stop were both reached between cycles the stop is
+assumed to have filled. No margin: a buy needs the cash.
+
+Usage:
+  python backtest.py --days 90                     # fetch (needs APCA_* env) + cache
+  python backtest.py --cache .cache/history        # replay whatever is cached
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from utils import rsi, macd
+from indicators import (MACD_FAST, MACD_SLOW, MACD_SIGNAL, Graph, REGISTRY,
+                        weights, windowed, vote)
+from timeframes import timeframes, resample, bucket_start, DAY
+from bar_cache import load_bars, save_bars
+from bars import Bars
+import exits
+
+ANCHOR = pd.Timedelta(hours=13, minutes=25)   # utils.session_start
+
+# ─── SIGNAL SERIES ───────────────────────────────────────────────────────────
+
+def _shift(a: np.ndarray, n: int) -> np.ndarray:
+    out = np.full_like(a, np.nan)
+    out[n:] = a[:-n]
+    return out
+
+
+def signal_series(bars: pd.DataFrame, cfg: dict) -> pd.DataFrame:
+    """
+    What generate_signals would return at every bar of `bars`:
+    columns close and signal (+1 buy, -1 sell, 0 none, NaN = the live bot
+    would skip the symbol — warming up or no bars yet today).
+    Indicators on a coarser timeframe see, at each minute, the completed
+    buckets plus the open one as it stood at that minute (see _open_bucket).
+    Indicators other than the classic four are evaluated on their trailing
+    window at every minute (see _windowed).
+    """
+    close = bars["close"]
+    c     = close.to_numpy(dtype=np.float64)
+    tf    = timeframes(cfg)
+    used  = weights(cfg)
+    open_ = {m: _open_bucket(bars, m) for m in {tf[n] for n in used} | {tf["sma"]} if m > 1}
+    values = {}
+
+    if tf["sma"] == 1:
+        count = np.arange(1, len(c) + 1)
+    else:
+        count = open_[tf["sma"]]["prev"] + 2      # buckets so far, the open one included
+
+    if "sma" in used and tf["sma"] == 1:
+        f = close.rolling(cfg["sma_fast"]).mean().to_numpy()
+        s = close.rolling(cfg["sma_slow"]).mean().to_numpy()
+        values["sma"] = {"fast": np.vstack([_shift(f, 2), _shift(f, 1), f]),
+                         "slow": np.vstack([_shift(s, 2), _shift(s, 1), s])}
+    elif "sma" in used:
+        rc, prev = open_[tf["sma"]]["close"], open_[tf["sma"]]["prev"]
+        values["sma"] = {"fast": _sma_tail(c, rc, prev, cfg["sma_fast"]),
+                         "slow": _sma_tail(c, rc, prev, cfg["sma_slow"])}
+
+    if "rsi" in used and tf["rsi"] == 1:
+        values["rsi"] = {"rsi": rsi(close, cfg.get("rsi_period", 10)).to_numpy()}
+    elif "rsi" in used:
+        b = open_[tf["rsi"]]
+        values["rsi"] = {"rsi": _rsi_open(c, b["close"], b["prev"], cfg.get("rsi_period", 10))}
+
+    if "macd" in used and tf["macd"] == 1:
+        hist = macd(close)[2].to_numpy()
+        prev = _shift(hist, 1)
+        prev[:1] = 0.0
+        values["macd"] = {"hist": hist, "prev": prev}
+    elif "macd" in used:
+        b = open_[tf["macd"]]
+        hist, prev = _macd_open(c, b["close"], b["prev"])
+        values["macd"] = {"hist": hist, "prev": prev}
+
+    # VWAP anchored at each session's 9:25 AM ET, cumulative within the day
+    day        = bars.index.normalize()
+    in_session = np.asarray(bars.index >= day + ANCHOR)
+    if "vwap" in used and tf["vwap"] == 1:
+        typical = ((bars["high"] + bars["low"] + bars["close"]) / 3).to_numpy()
+        volume  = bars["volume"].to_numpy(dtype=np.float64)
+        sums = pd.DataFrame({
+            "tpv": np.where(in_session, typical * volume, 0.0),
+            "vol": np.where(in_session, volume, 0.0),
+        }).groupby(np.asarray(day)).cumsum()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            vwap = sums["tpv"].to_numpy() / np.where(sums["vol"] == 0, np.nan, sums["vol"])
+        values["vwap"] = {"price": c, "vwap": vwap, "has_today": in_session}
+    elif "vwap" in used:
+        vwap, has_today = _vwap_open(bars, open_[tf["vwap"]])
+        values["vwap"] = {"price": c, "vwap": vwap, "has_today": has_today}
+
+    for name, window in windowed(cfg).items():
+        values[name] = _windowed(bars, open_.get(tf[name]), name, window, cfg)
+
+    votes    = vote(values, cfg)
+    eligible = in_session & (count >= cfg["sma_slow"] + 10)
+
+    return pd.DataFrame({
+        "close":  c,
+        "signal": np.where(eligible, votes["signal"], np.nan),
+    }, index=bars.index)
+
+
+def _windowed(bars: pd.DataFrame, b: dict | None, name: str, window: int, cfg: dict) -> dict:
+    """
+    An indicator's values at every minute, from a (window × minutes) matrix
+    of the bars it would see: the trailing minute bars, or on a coarser
+    timeframe the last completed buckets followed by the open one.
+    """
+    cols = {c: bars[c].to_numpy(dtype=np.float64) for c in ("high", "low", "close", "volume")}
+    back = np.arange(-window + 1, 1)[:, None]
+    if b is None:
+        rows   = np.arange(len(bars))[None, :] + back
+        matrix = {c: _at(x, rows) for c, x in cols.items()}
+    else:
+        rows   = b["prev"][None, :] + back[:-1] + 1
+        done   = b["buckets"]
+        live   = {"high": b["high"], "low": b["low"], "close": cols["close"], "volume": b["volume"]}
+        matrix = {c: np.vstack([_at(done[c], rows), live[c][None, :]]) for c in live}
+    return REGISTRY[name].compute(Graph({0: matrix}), 0, cfg)
+
+
+# ─── COARSER TIMEFRAMES ──────────────────────────────────────────────────────
+
+def _open_bucket(bars: pd.DataFrame, minutes: int) -> dict:
+    """
+    The `minutes` buckets of `bars` and, for every minute, the index of the
+    last completed bucket ("prev", -1 if none) plus the open bucket's
+    start, running high/low and volume as of that minute.
+    """
+    ts      = bars.index.as_unit("s").asi8
+    starts  = bucket_start(ts, minutes)
+    buckets = resample(Bars.from_frame(bars), minutes)
+    k       = np.searchsorted(buckets.ts, starts)
+    return {
+        "buckets": buckets,
+        "close":   buckets["close"],
+        "prev":    k - 1,
+        "start":   starts,
+        "high":    bars["high"].groupby(k).cummax().to_numpy(dtype=np.float64),
+        "low":     bars["low"].groupby(k).cummin().to_numpy(dtype=np.float64),
+        "volume":  bars["volume"].groupby(k).cumsum().to_numpy(dtype=np.float64),
+    }
+
+
+def _at(a: np.ndarray, i: np.ndarray) -> np.ndarray:
+    """a[i], NaN where i < 0."""
+    return np.where(i >= 0, a[np.maximum(i, 0)], np.nan)
+
+
+def _sma_tail(c: np.ndarray, rc: np.ndarray, prev: np.ndarray, period: int) -> np.ndarray:
+    """(3 × minutes) SMA of the two last completed buckets and the open one."""
+    full = pd.Series(rc).rolling(period).mean().to_numpy()
+    if period > 1:
+        live = (_at(pd.Series(rc).rolling(period - 1).sum().to_numpy(), prev) + c) / period
+    else:
+        live = c
+    return np.vstack([_at(full, prev - 1), _at(full, prev), live])
+
+
+def _rsi_open(c: np.ndarray, rc: np.ndarray, prev: np.ndarray, period: int) -> np.ndarray:
+    """utils.rsi over the completed buckets' closes followed by the minute's close."""
+    delta = np.diff(rc, prepend=np.nan)
+    last  = c - _at(rc, prev)
+    gain  = np.clip(last, 0, None)
+    loss  = np.clip(-last, 0, None)
+    if period > 1:
+        gain = gain + _at(pd.Series(np.clip(delta, 0, None)).rolling(period - 1).sum().to_numpy(), prev)
+        loss = loss + _at(pd.Series(np.clip(-delta, 0, None)).rolling(period - 1).sum().to_numpy(), prev)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - (100 / (1 + gain / np.where(loss == 0, np.nan, loss)))
+
+
+def _macd_open(c: np.ndarray, rc: np.ndarray, prev: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(histogram with the open bucket, histogram of the last completed bucket)."""
+    closes = pd.Series(rc)
+    ema_f  = closes.ewm(span=MACD_FAST, adjust=False).mean().to_numpy()
+    ema_s  = closes.ewm(span=MACD_SLOW, adjust=False).mean().to_numpy()
+    line   = ema_f - ema_s
+    ema_g  = pd.Series(line).ewm(span=MACD_SIGNAL, adjust=False).mean().to_numpy()
+
+    def step(ema: np.ndarray, x: np.ndarray, span: int) -> np.ndarray:
+        a, last = 2 / (span + 1), _at(ema, prev)
+        return np.where(prev >= 0, a * x + (1 - a) * last, x)
+
+    live_line = step(ema_f, c, MACD_FAST) - step(ema_s, c, MACD_SLOW)
+    hist      = live_line - step(ema_g, live_line, MACD_SIGNAL)
+    hist_prev = np.where(prev >= 0, _at(line - ema_g, prev), 0.0)
+    return hist, hist_prev
+
+
+def _vwap_open(bars: pd.DataFrame, b: dict) -> tuple[np.ndarray, np.ndarray]:
+    """(VWAP, has_today) over today's completed buckets plus the open one."""
+    anchor  = int(ANCHOR.total_seconds())
+    buckets = b["buckets"]
+    start   = buckets.ts
+    day     = start // DAY
+    today   = start >= day * DAY + anchor
+    typical = (buckets["high"] + buckets["low"] + buckets["close"]) / 3
+    volume  = buckets["volume"]
+    sums    = pd.DataFrame({
+        "tpv": np.where(today, typical * volume, 0.0),
+        "vol": np.where(today, volume, 0.0),
+    }).groupby(day).cumsum()
+
+    prev      = b["prev"]
+    minute    = bars.index.as_unit("s").asi8 // DAY
+    same_day  = (prev >= 0) & (day[np.maximum(prev, 0)] == minute)
+    has_today = b["start"] >= minute * DAY + anchor
+    open_tpv  = (b["high"] + b["low"] + bars["close"].to_numpy()) / 3 * b["volume"]
+    tpv = np.where(same_day, sums["tpv"].to_numpy()[np.maximum(prev, 0)], 0.0) \
+        + np.where(has_today, open_tpv, 0.0)
+    vol = np.where(same_day, sums["vol"].to_numpy()[np.maximum(prev, 0)], 0.0) \
+        + np.where(has_today, b["volume"], 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return tpv / np.where(vol == 0, np.nan, vol), has_today
+
+# ─── PORTFOLIO LOOP ──────────────────────────────────────────────────────────
+
+SIGNAL_KEYS = ["sma_fast", "sma_slow", "rsi_period", "rsi_buy_min", "rsi_overbought",
+               "rsi_sell_min", "signal_threshold", "atr_period", "atr_mult", "bb_period",
+               "bb_std"]
+
+
+def run_backtest(bars: dict[str, pd.DataFrame], cfg: dict,
+                 starting_equity: float = 100_000.0, cycle_minutes: int = 5) -> dict:
+    """
+    Simulate the bot over `bars` ({symbol: minute bars}).
+    Returns {"trades": DataFrame, "equity": Series, "summary": dict}.
+    """
+    return simulate(prepare(bars, cfg, cycle_minutes), cfg, starting_equity)
+
+
+def prepare(bars: dict[str, pd.DataFrame], cfg: dict, cycle_minutes: int = 5) -> dict:
+    """
+    Per-cycle price and signal matrices (cycles × symbols). Depends only on
+    the SIGNAL_KEYS settings, so one result can be simulated under many
+    exit/sizing settings.
+    """
+    symbols = [s for s in cfg["symbols"] if s in bars and len(bars[s])]
+    series  = {s: signal_series(bars[s], cfg) for s in symbols}
+
+    raw   = pd.DataFrame({s: series[s]["close"] for s in symbols}).sort_index()
+    sig   = pd.DataFrame({s: series[s]["signal"] for s in symbols}).reindex(raw.index)
+    days  = raw.index.normalize()
+    close = raw.ffill()
+    sig   = sig.groupby(days).ffill()                 # a signal never outlives its session
+
+    # Scan pre-filter (scan.momentum): the move over the last sma_fast bars of each symbol's own series
+    n  = cfg["sma_fast"]
+    mo = pd.DataFrame({s: bars[s]["close"] / bars[s]["close"].shift(n) - 1
+                       for s in symbols}).reindex(raw.index).ffill()
+
+    # Range traded between cycles, for exits resting at the broker: each minute
+    # is settled at the first cycle at/after it
+    cycles = close.index.minute % cycle_minutes == 0
+    at     = np.flatnonzero(cycles)
+    settle = np.searchsorted(at, np.arange(len(raw)))
+    keep   = settle < len(at)
+
+    def per_cycle(frame: pd.DataFrame, how: str) -> np.ndarray:
+        grouped = frame[keep].groupby(settle[keep])
+        return getattr(grouped, how)().reindex(range(len(at))).to_numpy()
+
+    high = pd.DataFrame({s: bars[s]["high"] for s in symbols}).reindex(raw.index)
+    low  = pd.DataFrame({s: bars[s]["low"] for s in symbols}).reindex(raw.index)
+    return {
+        "symbols": symbols,
+        "times":   close.index[cycles],
+        "px":      close.to_numpy()[cycles],
+        "sg":      sig.to_numpy()[cycles],
+        "mo":      mo.to_numpy()[cycles],
+        "hi":      per_cycle(high, "max"),
+        "lo":      per_cycle(low, "min"),
+        "first":   per_cycle(raw, "first"),
+        "day_id":  np.asarray(days[cycles]),
+    }
+
+
+def simulate(prepared: dict, cfg: dict, starting_equity: float = 100_000.0) -> dict:
+    """Portfolio loop over prepare()'s matrices under cfg's exit, sizing and breaker rules."""
+    symbols = prepared["symbols"]
+    times   = prepared["times"]
+    px      = prepared["px"]
+    sg      = prepared["sg"]
+    mo      = np.nan_to_num(prepared["mo"], nan=-np.inf)
+    day_id  = prepared["day_id"]
+    bracket = exits.enabled(cfg)
+
+    stop_pct  = cfg["stop_loss_pct"] * 100
+    take_pct  = cfg["take_profit_pct"] * 100
+    target    = cfg["daily_profit_target_pct"] * 100
+    limit     = cfg["daily_loss_limit_pct"] * 100
+    max_pos   = cfg["max_position_pct"]
+    trade_pct = cfg["max_trade_pct"]
+    max_slots = cfg["max_open_positions"]
+
+    n      = len(symbols)
+    qty    = np.zeros(n)
+    avg    = np.zeros(n)
+    take   = np.full(n, np.nan)          # exits resting at the broker (bracket_exits)
+    stop   = np.full(n, np.nan)
+    cash   = starting_equity
+    curve  = np.empty(len(times))
+    trades = []
+
+    last_equity = equity = starting_equity
+    current_day = None
+    halted      = False
+
+    def sell(i, j, price, reason):
+        nonlocal cash
+        cash += qty[j] * price
+        trades.append((times[i], symbols[j], "sell", qty[j], price,
+                       (price - avg[j]) * qty[j], reason))
+        qty[j] = avg[j] = 0.0
+        take[j] = stop[j] = np.nan
+
+    for i in range(len(times)):
+        p = px[i]
+        if day_id[i] != current_day:
+            if current_day is not None:
+                last_equity = equity            # prior close, as account.last_equity
+            current_day, halted = day_id[i], False
+
+        # ── Broker-side exits, over the range traded since the last cycle ───
+        # The stop is assumed to trigger first when both were reached; a gap
+        # through it fills at the interval's first close.
+        if bracket:
+            lo, hi, first = prepared["lo"][i], prepared["hi"][i], prepared["first"][i]
+            for j in np.flatnonzero((qty > 0) & (lo <= stop)):
+                sell(i, j, float(np.fmin(stop[j], first[j])), "stop")
+            for j in np.flatnonzero((qty > 0) & (hi >= take)):
+                sell(i, j, take[j], "take")
+
+        held   = qty > 0
+        equity = cash + float((qty[held] * p[held]).sum())
+        curve[i] = equity
+        if halted:
+            continue
+
+        # ── Circuit breakers ────────────────────────────────────────────────
+        day_pnl_pct = (equity / last_equity - 1) * 100 if last_equity else 0.0
+        if day_pnl_pct >= target or day_pnl_pct <= -limit:
+            for j in np.flatnonzero(held):
+                sell(i, j, p[j], "circuit")
+            halted = True
+            continue
+
+        if bracket:
+            # ── exits.reconcile: the stop only ratchets up ──────────────────
+            hit = np.zeros(n, dtype=bool)
+            for j in np.flatnonzero(qty > 0):
+                stop[j] = max(stop[j], exits.prices(avg[j], p[j], cfg)[1])
+        else:
+            # ── Stops / take-profit sweep ───────────────────────────────────
+            with np.errstate(divide="ignore", invalid="ignore"):
+                pnl_pct = np.where(held, (p / avg - 1) * 100, 0.0)
+            hit = held & ((pnl_pct <= -stop_pct) | (pnl_pct >= take_pct))
+            for j in np.flatnonzero(hit):
+                sell(i, j, p[j], "stop" if pnl_pct[j] < 0 else "take")
+
+        # ── Signals: sells first, then buys in scan order ───────────────────
+        # (held symbols in watchlist order, then the rest by momentum, as scan.py)
+        s = sg[i]
+        for j in np.flatnonzero((s == -1) & (qty > 0) & ~hit):
+            sell(i, j, round(p[j] * 0.999, 2), "signal")
+
+        open_count = int((qty > 0).sum())
+        wanted     = np.flatnonzero((s == 1) & ~hit)
+        fresh      = wanted[qty[wanted] == 0]
+        ordered    = np.concatenate([wanted[qty[wanted] > 0],
+                                     fresh[np.argsort(-mo[i][fresh], kind="stable")]])
+        for j in ordered:
+            if open_count >= max_slots:
+                break
+            price       = p[j]
+            current_val = qty[j] * price
+            max_val     = equity * max_pos
+            if current_val >= max_val:
+                continue
+            limit_price = round(price * 1.001, 2)
+            buy_qty     = int(min(equity * trade_pct, max_val - current_val) / price)
+            buy_qty     = min(buy_qty, int(cash / limit_price))
+            if buy_qty < 1:
+                continue
+            if qty[j] == 0:
+                open_count += 1
+            avg[j]  = (avg[j] * qty[j] + limit_price * buy_qty) / (qty[j] + buy_qty)
+            qty[j] += buy_qty
+            cash   -= buy_qty * limit_price
+            if bracket:
+                # A fresh entry's legs are priced off its limit; an add-on gets
+                # one OCO for the whole position off the average cost
+                take[j], stop[j] = exits.prices(avg[j], limit_price, cfg)
+            trades.append((times[i], symbols[j], "buy", buy_qty, limit_price, 0.0, "signal"))
+
+    trades = pd.DataFrame(trades, columns=["time", "symbol", "side", "qty", "price",
+                                           "realized_pnl", "reason"])
+    equity = pd.Series(curve, index=times, name="equity")
+    return {"trades": trades, "equity": equity,
+            "summary": summarize(trades, equity, starting_equity)}
+
+
+def summarize(trades: pd.DataFrame, equity: pd.Series, starting_equity: float) -> dict:
+    exits = trades[trades["side"] == "sell"]
+    peak  = equity.cummax()
+    final = float(equity.iloc[-1]) if len(equity) else starting_equity
+    return {
+        "final_equity":  final,
+        "return_pct":    (final / starting_equity - 1) * 100,
+        "max_drawdown_pct": float(((equity / peak - 1) * 100).min()) if len(equity) else 0.0,
+        "trades":        len(trades),
+        "round_trips":   len(exits),
+        "win_rate_pct":  float((exits["realized_pnl"] > 0).mean() * 100) if len(exits) else 0.0,
+        "realized_pnl":  float(exits["realized_pnl"].sum()),
+    }
+
+# ─── HISTORY ─────────────────────────────────────────────────────────────────
+
+def load_history(cfg: dict, cache_dir: str, days: int | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Bars for cfg["symbols"] from `cache_dir` (same format as bar_cache, but
+    never evicted). With `days`, missing symbols are fetched and cached.
+    """
+    bars    = {s: df for s in cfg["symbols"] if (df := load_bars(cache_dir, s)) is not None}
+    missing = [s for s in cfg["symbols"] if s not in bars]
+    if missing and days:
+        from alpaca.data.historical import StockHistoricalDataClient
+        from utils import get_bars_batch
+        client = StockHistoricalDataClient(os.environ["APCA_API_KEY_1"],
+                                           os.environ["APCA_API_SECRET_1"])
+        start  = datetime.now(timezone.utc) - timedelta(days=days)
+        print(f"  Fetching {days} days of minute bars for {len(missing)} symbols...")
+        for symbol, df in get_bars_batch(client, missing, start=start).items():
+            save_bars(cache_dir, symbol, df)
+            bars[symbol] = df.frame()
+    return bars
+
+# ─── ENTRY POINT ─────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest config.json on cached minute bars")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--cache", default=".cache/history")
+    parser.add_argument("--days", type=int, default=None,
+                        help="fetch this many days for symbols missing from the cache")
+    parser.add_argument("--equity", type=float, default=100_000.0)
+    parser.add_argument("--out", default=".cache/backtest")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        cfg = json.load(f)
+
+    bars = load_history(cfg, args.cache, args.days)
+    if not bars:
+        print(f"❌ No bars in {args.cache}. Run with --days N to fetch.")
+        raise SystemExit(1)
+
+    result = run_backtest(bars, cfg, args.equity)
+    os.makedirs(args.out, exist_ok=True)
+    result["trades"].to_csv(os.path.join(args.out, "trades.csv"), index=False)
+    result["equity"].to_csv(os.path.join(args.out, "equity.csv"))
+
+    print(f"\n📊 Backtest — {len(bars)} symbols, {result['equity'].index[0]:%Y-%m-%d} → "
+          f"{result['equity'].index[-1]:%Y-%m-%d}")
+    for k, v in result["summary"].items():
+        print(f"  {k:<18} {v:>14,.2f}" if isinstance(v, float) else f"  {k:<18} {v:>14}")
+    print(f"\n  Trade log and equity curve written to {args.out}/")
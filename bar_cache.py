@@ -0,0 +1,141 @@
+"""
+bar_cache.py — Persistent on-disk minute-bar store
+===================================================
+One columnar file per symbol (<dir>/<SYMBOL>.npy): a float64 array of shape
+(len(COLUMNS), n_bars), so each column is contiguous and the file can be
+memory-mapped. Timestamps are stored as epoch seconds (exact in float64).
+load_columns() hands the mapped columns straight to a bars.Bars without
+copying them.
+
+Each run fetches only the bars newer than the last cached timestamp, merges
+them in, and evicts anything older than the lookback window. <dir>/
+coverage.json records, per symbol, the start of the window its file is
+complete from; when the window reaches further back (a larger sma_slow, a
+coarser timeframe) the symbol is fetched cold again rather than run on a
+short history. In GitHub Actions the directory is carried between runs
+with actions/cache.
+"""
+
+import os
+import json
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from alpaca.data.historical import StockHistoricalDataClient
+from utils import get_bars_batch, history_start
+from bars import Bars, merge, COLUMNS as BAR_COLUMNS
+
+COLUMNS = ["timestamp", *BAR_COLUMNS]
+
+# ─── FILE I/O ────────────────────────────────────────────────────────────────
+
+def _path(cache_dir: str, symbol: str) -> str:
+    return os.path.join(cache_dir, f"{symbol}.npy")
+
+
+def load_columns(cache_dir: str, symbol: str) -> Bars | None:
+    """Memory-mapped Bars for a symbol (columns are not copied). None if absent/corrupt."""
+    try:
+        block = np.load(_path(cache_dir, symbol), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+    if block.ndim != 2 or block.shape[0] != len(COLUMNS) or block.shape[1] == 0:
+        return None
+    return Bars(block[0].astype(np.int64), block[1:])
+
+
+def load_coverage(cache_dir: str) -> dict[str, float]:
+    """{symbol: epoch seconds its cached bars are complete from}; empty if missing."""
+    try:
+        with open(os.path.join(cache_dir, "coverage.json"), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_coverage(cache_dir: str, coverage: dict[str, float]):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, "coverage.json")
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(coverage, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def load_bars(cache_dir: str, symbol: str) -> pd.DataFrame | None:
+    """Load a symbol's cached bars as a UTC-indexed frame. None if absent/corrupt."""
+    bars = load_columns(cache_dir, symbol)
+    return bars.frame() if bars is not None else None
+
+
+def save_bars(cache_dir: str, symbol: str, bars: Bars):
+    """Atomically write a symbol's bars (tmp file + rename)."""
+    os.makedirs(cache_dir, exist_ok=True)
+    block = np.empty((len(COLUMNS), len(bars)), dtype=np.float64)
+    block[0]  = bars.ts
+    block[1:] = bars.block
+
+    path = _path(cache_dir, symbol)
+    tmp  = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, block)
+    os.replace(tmp, path)
+
+# ─── INCREMENTAL FETCH ───────────────────────────────────────────────────────
+
+def merge_bars(cached: Bars | None, fresh: Bars | None,
+               cutoff: datetime) -> Bars | None:
+    """Append fresh bars (fresh wins on overlap) and drop bars before cutoff."""
+    bars = merge([cached, fresh]).since(cutoff.timestamp())
+    return bars if not bars.empty else None
+
+
+def get_cached_bars(data_client: StockHistoricalDataClient, symbols: list[str],
+                    cache_dir: str, days: int = 6, lookback: int | None = None,
+                    now: datetime | None = None) -> dict[str, Bars]:
+    """
+    Drop-in for utils.get_bars_batch backed by the on-disk store.
+    Cold symbols (no cache, cache older than the window, or a cache that
+    doesn't reach back to the window start) get the full window; warm
+    symbols share one delta request starting at the oldest of their last
+    cached bars. The last cached minute is refetched because it
+    may have been a partial bar when it was stored. The window is the
+    `lookback` bars the indicators need (utils.history_start), else `days`;
+    anything older is evicted.
+    """
+    now    = now or datetime.now(timezone.utc)
+    cutoff = history_start(now, lookback) if lookback else now - timedelta(days=days)
+    start    = cutoff.timestamp()
+    cached   = {s: load_columns(cache_dir, s) for s in symbols}
+    coverage = load_coverage(cache_dir)
+
+    # Files from before coverage.json count from their first bar
+    warm = [s for s in symbols
+            if cached[s] is not None and cached[s].ts[-1] >= start
+            and coverage.get(s, cached[s].ts[0]) <= start]
+    cold = [s for s in symbols if s not in warm]
+
+    fresh = {}
+    if cold:
+        fresh.update(get_bars_batch(data_client, cold, start=cutoff, now=now))
+    if warm:
+        since = datetime.fromtimestamp(min(int(cached[s].ts[-1]) for s in warm), timezone.utc)
+        fresh.update(get_bars_batch(data_client, warm, start=since, now=now))
+
+    out = {}
+    for symbol in symbols:
+        bars = merge_bars(cached[symbol], fresh.get(symbol), cutoff)
+        if bars is None:
+            continue
+        if symbol in fresh:
+            try:
+                save_bars(cache_dir, symbol, bars)
+                coverage[symbol] = start
+            except OSError as e:
+                print(f"  ⚠️  Bar cache write failed for {symbol}: {e}")
+        out[symbol] = bars
+
+    try:
+        save_coverage(cache_dir, coverage)
+    except OSError as e:
+        print(f"  ⚠️  Bar cache coverage write failed: {e}")
+    return out
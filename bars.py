@@ -0,0 +1,108 @@
+"""
+bars.py — Columnar minute bars for the hot path
+================================================
+A symbol's bars are one float64 block of shape (len(COLUMNS), n) plus an
+int64 array of epoch-second timestamps. bars["close"] is a row of the block
+and bars[a:b] slices every column at once, both as NumPy views, so cutting
+out today's session or the bars a state hasn't seen copies nothing.
+
+pack() turns one StockBarsRequest result ((symbol, timestamp) MultiIndex
+frame) into {symbol: Bars} views of a single shared block, instead of one
+DataFrame per symbol. frame() / from_frame() convert to and from pandas for
+the cold paths (backtest, sim).
+"""
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ("open", "high", "low", "close", "volume", "trade_count", "vwap")
+ROW     = {c: i for i, c in enumerate(COLUMNS)}
+
+# ─── CONTAINER ───────────────────────────────────────────────────────────────
+
+class Bars:
+    """One symbol's bars: bars["close"] is a column view, bars[a:b] a Bars view."""
+
+    __slots__ = ("ts", "block")
+
+    def __init__(self, ts: np.ndarray, block: np.ndarray):
+        self.ts    = ts              # int64 epoch seconds, ascending
+        self.block = block           # float64 (len(COLUMNS), len(ts))
+
+    @classmethod
+    def blank(cls) -> "Bars":
+        return cls(np.empty(0, dtype=np.int64), np.empty((len(COLUMNS), 0)))
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.block[ROW[key]]
+        if isinstance(key, slice):
+            return Bars(self.ts[key], self.block[:, key])
+        raise TypeError(f"Bars indices are column names or slices, not {type(key).__name__}")
+
+    @property
+    def empty(self) -> bool:
+        return len(self.ts) == 0
+
+    def since(self, ts: int | float) -> "Bars":
+        """Bars at/after epoch second `ts` (a view)."""
+        return self[int(np.searchsorted(self.ts, ts)):]
+
+    def frame(self) -> pd.DataFrame:
+        """UTC-indexed DataFrame copy, as StockBarsRequest returns for one symbol."""
+        index = pd.to_datetime(self.ts, unit="s", utc=True)
+        index.name = "timestamp"
+        return pd.DataFrame({c: self.block[i] for i, c in enumerate(COLUMNS)}, index=index)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Bars":
+        block = np.full((len(COLUMNS), len(df)), np.nan)
+        for i, c in enumerate(COLUMNS):
+            if c in df:
+                block[i] = df[c].to_numpy(dtype=np.float64)
+        return cls(df.index.as_unit("s").asi8, block)
+
+# ─── BUILDERS ────────────────────────────────────────────────────────────────
+
+def pack(df: pd.DataFrame | None) -> dict[str, "Bars"]:
+    """
+    {symbol: Bars} from a (symbol, timestamp) MultiIndex frame. Every entry
+    is a view into one shared block, sorted by symbol then time.
+    """
+    if df is None or df.empty:
+        return {}
+    if not isinstance(df.index, pd.MultiIndex):
+        raise ValueError("expected a (symbol, timestamp) MultiIndex frame")
+
+    codes, symbols = pd.factorize(df.index.get_level_values(0))
+    ts    = df.index.get_level_values(1).as_unit("s").asi8
+    order = np.lexsort((ts, codes))
+    ts, codes = ts[order], codes[order]
+
+    block = np.full((len(COLUMNS), len(df)), np.nan)
+    for i, c in enumerate(COLUMNS):
+        if c in df:
+            block[i] = df[c].to_numpy(dtype=np.float64)[order]
+
+    bounds = np.searchsorted(codes, np.arange(len(symbols) + 1))
+    return {sym: Bars(ts[a:b], block[:, a:b])
+            for sym, a, b in zip(symbols, bounds[:-1], bounds[1:]) if b > a}
+
+
+def merge(parts: list["Bars"]) -> "Bars":
+    """Concatenate, sort by time and keep the last of duplicate timestamps (later parts win)."""
+    parts = [p for p in parts if p is not None and len(p)]
+    if not parts:
+        return Bars.blank()
+    if len(parts) == 1:
+        return parts[0]
+
+    ts      = np.concatenate([p.ts for p in parts])
+    order   = np.argsort(ts, kind="stable")
+    ordered = ts[order]
+    keep    = order[np.r_[ordered[1:] != ordered[:-1], True]]
+    block   = np.concatenate([p.block for p in parts], axis=1)
+    return Bars(ts[keep], block[:, keep])
@@ -0,0 +1,224 @@
+"""
+bench.py — Signal pipeline benchmarks on synthetic minute bars
+==============================================================
+Measures throughput (bars/sec) and peak Python memory of the indicator and
+signal code, plus one full market-snapshot + order cycle against the simulated
+broker (sim.py). No credentials or network needed.
+
+Benchmarks:
+  rsi, macd, vwap_today                      — utils' pandas Series helpers, per symbol
+  signal_graph                               — utils.generate_signals, full recompute per
+                                               symbol: the indicator graph (indicators.py)
+                                               over columnar Bars
+  incremental                                — incremental.evaluate_symbol (warm state)
+  vectorized                                 — vectorized.signal_table, whole universe
+  cycle                                      — build_market_snapshot + run_signals
+
+Each result is appended to a JSONL file with the git commit, so regressions
+(or a faster engine vs the full-recompute baseline) show up across commits; the
+printed table includes the change vs the previous record with the same
+benchmark and data shape. A benchmark whose code path is replaced gets a new
+name: records named "generate_signals" are the earlier pandas full
+recompute, and are not compared with signal_graph.
+
+Usage:
+  python bench.py
+  python bench.py --symbols 500 --days 6 --gaps 0.02 --zero-volume 0.05
+  python bench.py --only signal_graph vectorized --repeat 10
+"""
+
+import gc
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+
+SESSION_OPEN = pd.Timedelta(hours=13, minutes=30)
+SESSION_BARS = 390
+
+# ─── SYNTHETIC DATA ──────────────────────────────────────────────────────────
+
+def synthetic_bars(symbols: int = 12, days: int = 6, gaps: float = 0.0,
+                   zero_volume: float = 0.0, end: datetime | None = None,
+                   seed: int = 0) -> dict[str, pd.DataFrame]:
+    """
+    {symbol: minute bars} shaped like StockBarsRequest output: `days`
+    weekday sessions of 390 bars from 13:30 UTC, the last one cut at `end`
+    (default: 19:00 UTC on the latest weekday). A `gaps` fraction of bars is
+    dropped at random and a `zero_volume` fraction gets volume 0.
+    """
+    rng = np.random.default_rng(seed)
+    if end is None:
+        end = pd.Timestamp.now(tz="UTC").normalize() + pd.Timedelta(hours=19)
+        while end.weekday() >= 5:
+            end -= pd.Timedelta(days=1)
+    end = pd.Timestamp(end)
+
+    sessions = pd.bdate_range(end=end.normalize(), periods=days, tz="UTC")
+    minutes  = pd.to_timedelta(np.arange(SESSION_BARS), unit="m")
+    index    = pd.DatetimeIndex(np.concatenate([(d + SESSION_OPEN + minutes).values
+                                                for d in sessions])).tz_localize("UTC")
+    index    = index[index <= end]
+    index.name = "timestamp"
+
+    out = {}
+    for i in range(symbols):
+        n     = len(index)
+        close = 20 + 200 * rng.random() * np.exp(np.cumsum(rng.normal(0, 0.0012, n)))
+        spread = close * rng.uniform(0.0002, 0.002, n)
+        volume = rng.integers(100, 50_000, n).astype(np.float64)
+        volume[rng.random(n) < zero_volume] = 0.0
+        df = pd.DataFrame({
+            "open":        close + rng.normal(0, 1, n) * spread / 4,
+            "high":        close + spread,
+            "low":         close - spread,
+            "close":       close,
+            "volume":      volume,
+            "trade_count": np.maximum(volume // 100, 0),
+            "vwap":        close,
+        }, index=index)
+        if gaps:
+            df = df[rng.random(n) >= gaps]
+        out[f"SYM{i:03d}"] = df
+    return out
+
+# ─── HARNESS ─────────────────────────────────────────────────────────────────
+
+def measure(fn, repeat: int) -> dict:
+    """Best/mean wall time over `repeat` runs and peak traced allocation of one run."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"best_ms": min(times) * 1000, "mean_ms": sum(times) / len(times) * 1000,
+            "peak_kb": peak / 1024}
+
+
+def benchmarks(bars: dict[str, pd.DataFrame], cfg: dict, now: datetime) -> dict:
+    """{name: zero-arg callable}; each processes every symbol in `bars` once."""
+    import utils
+    import bot
+    import clients
+    from incremental import IndicatorState, evaluate_symbol
+    from vectorized import signal_table
+    from execution import OrderExecutor
+    from sim import SimMarket
+    from bars import Bars
+
+    cols   = {s: Bars.from_frame(df) for s, df in bars.items()}     # as get_bars_batch returns
+    today  = {s: utils.today_slice(b, now) for s, b in cols.items()}
+    period = cfg.get("rsi_period", 10)
+
+    # Warm incremental state: everything but the last 5 bars already consumed
+    warm = {}
+    for s, b in cols.items():
+        evaluate_symbol(warm, s, b[:-5], cfg, now)
+
+    def incremental():
+        states = {k: IndicatorState.from_dict(v.to_dict()) for k, v in warm.items()}
+        for s, b in cols.items():
+            evaluate_symbol(states, s, b, cfg, now)
+
+    def cycle():
+        market = SimMarket(bars, start=now, requests_per_minute=None)
+        client = market.broker("bench")
+        run    = {**clients.sim_config(cfg), "symbols": list(bars), "orders_per_minute": 1e9}
+        snapshot = bot.build_market_snapshot(market.data_client(), run, now)
+        executor = OrderExecutor(client, run)
+        bot.run_signals(executor, snapshot, {}, market.equity, run, set())
+        executor.close()
+
+    return {
+        "rsi":              lambda: [utils.rsi(df["close"], period) for df in bars.values()],
+        "macd":             lambda: [utils.macd(df["close"]) for df in bars.values()],
+        "vwap_today":       lambda: [utils.vwap_today(today[s]) for s in bars],
+        "signal_graph":     lambda: [utils.generate_signals(b, today[s], cfg)
+                                     for s, b in cols.items()],
+        "incremental":      incremental,
+        "vectorized":       lambda: signal_table(cols, cfg, now),
+        "cycle":            cycle,
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def previous_results(path: str) -> dict:
+    """{(bench, shape): record} — the latest earlier record for each benchmark/shape."""
+    latest = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                r = json.loads(line)
+                latest[(r["bench"], r["shape"])] = r
+    except (OSError, ValueError):
+        pass
+    return latest
+
+# ─── ENTRY POINT ─────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+
+    parser = argparse.ArgumentParser(description="Benchmark the signal pipeline")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--symbols", type=int, default=12)
+    parser.add_argument("--days", type=int, default=6)
+    parser.add_argument("--gaps", type=float, default=0.01)
+    parser.add_argument("--zero-volume", type=float, default=0.02)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="*")
+    parser.add_argument("--out", default="bench_results.jsonl")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        cfg = json.load(f)
+
+    bars  = synthetic_bars(args.symbols, args.days, args.gaps, args.zero_volume)
+    now   = max(df.index[-1] for df in bars.values()).to_pydatetime()
+    rows  = sum(len(df) for df in bars.values())
+    shape = f"{args.symbols}x{args.days}d/gaps={args.gaps}/zv={args.zero_volume}"
+    prev  = previous_results(args.out)
+    meta  = {"commit": git_commit(), "python": platform.python_version(),
+             "pandas": pd.__version__, "numpy": np.__version__}
+
+    print(f"\n⏱  Benchmarks — {args.symbols} symbols × {args.days} days ({rows:,} bars), "
+          f"best of {args.repeat}")
+    print(f"  {'bench':<18} {'best ms':>10} {'mean ms':>10} {'bars/sec':>12} {'peak KB':>10} {'vs prev':>9}")
+
+    with open(args.out, "a") as out:
+        for name, fn in benchmarks(bars, cfg, now).items():
+            if args.only and name not in args.only:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):     # bot's per-symbol log lines
+                result = measure(fn, args.repeat)
+            record = {"ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                      "bench": name, "shape": shape, "rows": rows,
+                      "bars_per_sec": rows / (result["best_ms"] / 1000), **result, **meta}
+            out.write(json.dumps(record) + "\n")
+
+            before = prev.get((name, shape))
+            delta  = (f"{(result['best_ms'] / before['best_ms'] - 1) * 100:+.0f}%"
+                      if before else "—")
+            print(f"  {name:<18} {result['best_ms']:>10.1f} {result['mean_ms']:>10.1f} "
+                  f"{record['bars_per_sec']:>12,.0f} {result['peak_kb']:>10,.0f} {delta:>9}")
+
+    print(f"\n  Results appended to {args.out}")
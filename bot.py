@@ -2,24 +2,37 @@
 bot.py — Alpaca Multi-Strategy Trading Bot
 ===========================================
 Designed for GitHub Actions: stateless, runs one full cycle per invocation.
-Supports up to 2 Alpaca accounts via environment variables.
+Any number of Alpaca accounts (see accounts.py), traded concurrently.
+Closed-market runs exit after one clock request, before the trading stack
+(pandas, alpaca-py, signals) is imported; `--startup-time` times each phase.
 
 Secrets required (GitHub → Settings → Secrets → Actions):
-  APCA_API_KEY_1, APCA_API_SECRET_1, APCA_BASE_URL_1  (required)
-  APCA_API_KEY_2, APCA_API_SECRET_2, APCA_BASE_URL_2  (optional second account)
+  APCA_API_KEY_1, APCA_API_SECRET_1, APCA_BASE_URL_1  (first account)
+  APCA_API_KEY_<n>, APCA_API_SECRET_<n>, ...           (more accounts), or
+  BOT_ACCOUNTS                                          (all accounts as one JSON list)
   EMAIL_USER, EMAIL_PASS                                (for daily report)
 """
 
+import time
+STARTED = time.perf_counter()         # --startup-time measures from here
+
 import os
+import sys
 import json
-from datetime import datetime, timedelta, timezone
-from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import MarketOrderRequest, LimitOrderRequest, GetOrdersRequest
-from alpaca.trading.enums import OrderSide, TimeInForce, QueryOrderStatus
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
-from utils import generate_signals, get_today_bars, get_multi_day_bars
+import threading
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Callable
+from accounts import load_accounts, run_accounts
+import clients
+import tracing
+
+# pandas, numpy, alpaca-py and the signal modules are imported inside the
+# functions that use them: a market-closed run never loads them.
+if TYPE_CHECKING:
+    from alpaca.trading.client import TradingClient
+    from alpaca.data.historical import StockHistoricalDataClient
+    from execution import OrderExecutor
+    from scan import Budget
 
 # ─── CONFIG ──────────────────────────────────────────────────────────────────
 
@@ -29,15 +42,17 @@ def load_config():
 
 # ─── ACCOUNT HELPERS ─────────────────────────────────────────────────────────
 
-def get_equity(client: TradingClient) -> tuple[float, float]:
+def get_equity(client: "TradingClient") -> tuple[float, float]:
     """Returns (current_equity, prev_close_equity)."""
-    acct = client.get_account()
+    with tracing.api("get_account"):
+        acct = client.get_account()
     return float(acct.equity), float(acct.last_equity)
 
 
-def get_positions(client: TradingClient) -> dict:
+def get_positions(client: "TradingClient") -> dict:
     """Returns {symbol: {qty, avg_cost, price}}."""
-    raw = client.get_all_positions()
+    with tracing.api("get_all_positions"):
+        raw = client.get_all_positions()
     return {
         p.symbol: {
             "qty":      int(float(p.qty)),
@@ -49,15 +64,34 @@ def get_positions(client: TradingClient) -> dict:
     }
 
 
-def is_market_open(client: TradingClient) -> bool:
-    return client.get_clock().is_open
+def get_open_orders(client: "TradingClient") -> list:
+    """Every open order, bracket / OCO legs listed on their own."""
+    from alpaca.trading.requests import GetOrdersRequest
+    from alpaca.trading.enums import QueryOrderStatus
+    with tracing.api("get_orders", status="open"):
+        return client.get_orders(GetOrdersRequest(status=QueryOrderStatus.OPEN, limit=500))
+
+
+def index_orders(orders: list | None) -> dict:
+    """{(symbol, side): [orders]} for working entries and plain sells; exit legs left out."""
+    from exits import is_exit
+    index = {}
+    for o in orders or []:
+        if not is_exit(o):
+            index.setdefault((o.symbol, o.side), []).append(o)
+    return index
+
+
+def is_market_open(client: "TradingClient") -> bool:
+    with tracing.api("get_clock"):
+        return client.get_clock().is_open
 
 # ─── STOP / TAKE PROFIT ──────────────────────────────────────────────────────
 
-def check_stops_and_targets(client: TradingClient, positions: dict, cfg: dict) -> set:
+def check_stops_and_targets(executor: "OrderExecutor", positions: dict, cfg: dict) -> set:
     """
     Exits any position that has hit its stop-loss or take-profit.
-    Returns set of symbols that were closed.
+    All exits are submitted concurrently. Returns set of symbols that were closed.
     """
     closed = set()
     stop_pct  = cfg["stop_loss_pct"]
@@ -70,12 +104,12 @@ def check_stops_and_targets(client: TradingClient, positions: dict, cfg: dict) -
 
         if pnl_pct <= -(stop_pct * 100):
             print(f"  🛑 STOP-LOSS  {symbol}: {pnl_pct:+.2f}% — closing {qty} shares")
-            _market_sell(client, symbol, qty)
+            _market_sell(executor, symbol, qty)
             closed.add(symbol)
 
         elif pnl_pct >= (take_pct * 100):
             print(f"  🎯 TAKE-PROFIT {symbol}: {pnl_pct:+.2f}% — closing {qty} shares")
-            _market_sell(client, symbol, qty)
+            _market_sell(executor, symbol, qty)
             closed.add(symbol)
 
         # Trailing stop: lock in half the gain if up > 5%
@@ -83,135 +117,413 @@ def check_stops_and_targets(client: TradingClient, positions: dict, cfg: dict) -
             trail_floor = price * (1 - (stop_pct * 0.5))
             print(f"  ↗ Trailing floor active on {symbol}: ${trail_floor:.2f} (up {pnl_pct:.1f}%)")
 
+    for symbol, _, err in executor.drain():
+        if err:
+            print(f"    ❌ Sell failed for {symbol}: {err}")
+
     return closed
 
 
-def _market_sell(client: TradingClient, symbol: str, qty: int):
+def _market_sell(executor: "OrderExecutor", symbol: str, qty: int):
+    from alpaca.trading.requests import MarketOrderRequest
+    from alpaca.trading.enums import OrderSide, TimeInForce
     try:
-        from alpaca.trading.requests import MarketOrderRequest
-        from alpaca.trading.enums import OrderSide, TimeInForce
         req = MarketOrderRequest(symbol=symbol, qty=qty, side=OrderSide.SELL,
                                   time_in_force=TimeInForce.DAY)
-        client.submit_order(req)
+        executor.submit(symbol, req)
     except Exception as e:
         print(f"    ❌ Sell failed for {symbol}: {e}")
 
+# ─── MARKET SNAPSHOT ─────────────────────────────────────────────────────────
+
+def fetch_bars(data_client: "StockHistoricalDataClient", cfg: dict,
+               now: datetime | None = None) -> dict:
+    """
+    Minute bars for every symbol — via the on-disk cache if configured.
+    Only as many sessions as the indicator lookbacks need are fetched.
+    """
+    from utils import get_bars_batch, lookback_bars
+    from bar_cache import get_cached_bars
+
+    cache_dir = cfg.get("bar_cache_dir")
+    lookback  = lookback_bars(cfg)
+    with tracing.span("fetch.bars", symbols=len(cfg["symbols"]), cached=bool(cache_dir),
+                      lookback=lookback):
+        if cache_dir:
+            return get_cached_bars(data_client, cfg["symbols"], cache_dir,
+                                   lookback=lookback, now=now)
+        return get_bars_batch(data_client, cfg["symbols"], lookback=lookback, now=now)
+
+
+def evaluate_signals(all_bars: dict, symbols: list[str], cfg: dict, now: datetime,
+                     states: dict | None = None) -> dict:
+    """
+    Signals for `symbols` from their bars: {symbol: {signal, stats, price}};
+    symbols without enough data are left out. With `states` (incremental
+    indicator states, updated in place) only bars new since the last run
+    are processed; vectorized_signals takes precedence over both.
+    """
+    from utils import generate_signals, today_slice
+    from incremental import evaluate_symbol
+    from vectorized import signal_table, table_row
+    from timeframes import timeframes, bar_count
+
+    snapshot = {}
+    sma_tf   = timeframes(cfg)["sma"]
+
+    ready = {}
+    for symbol in symbols:
+        bars_hist = all_bars.get(symbol)
+        if bars_hist is None or bar_count(bars_hist, sma_tf) < cfg["sma_slow"] + 10:
+            print(f"  [{symbol}] Not enough historical data, skipping.")
+            continue
+        if today_slice(bars_hist, now) is None:
+            print(f"  [{symbol}] No intraday data, skipping.")
+            continue
+        ready[symbol] = bars_hist
+
+    # Whole universe in one pass over a (time × symbol) matrix
+    if cfg.get("vectorized_signals"):
+        with tracing.span("signals.vectorized", symbols=len(ready)):
+            table = signal_table(ready, cfg, now)
+        for symbol, bars_hist in ready.items():
+            signal, stats = table_row(table, symbol)
+            snapshot[symbol] = {
+                "signal": signal,
+                "stats":  stats,
+                "price":  float(bars_hist["close"][-1]),
+            }
+        return snapshot
+
+    for symbol, bars_hist in ready.items():
+        try:
+            with tracing.span("signals", symbol=symbol, incremental=states is not None):
+                if states is not None:
+                    signal, stats  = evaluate_symbol(states, symbol, bars_hist, cfg, now)
+                else:
+                    signal, stats  = generate_signals(bars_hist, today_slice(bars_hist, now), cfg)
+            snapshot[symbol] = {
+                "signal": signal,
+                "stats":  stats,
+                "price":  float(bars_hist["close"][-1]),
+            }
+        except Exception as e:
+            print(f"  [{symbol}] ❌ Error: {e}")
+
+    return snapshot
+
+
+def load_indicator_states(cfg: dict) -> dict | None:
+    """Incremental indicator states if indicator_state_path is in use, else None."""
+    from incremental import load_states
+    state_path = cfg.get("indicator_state_path")
+    if not state_path or cfg.get("vectorized_signals"):
+        return None
+    return load_states(state_path)
+
+
+def save_indicator_states(cfg: dict, states: dict | None):
+    from incremental import save_states
+    if states is None:
+        return
+    try:
+        save_states(cfg["indicator_state_path"], states)
+    except OSError as e:
+        print(f"  ⚠️  Indicator state write failed: {e}")
+
+
+def build_market_snapshot(data_client: "StockHistoricalDataClient", cfg: dict,
+                          now: datetime | None = None) -> dict:
+    """
+    Fetches bars and evaluates signals for every symbol in one go.
+    Returns {symbol: {signal, stats, price}}; symbols without enough data are
+    left out. `now` (default: wall clock) anchors "today" for VWAP — set for
+    replays. The bot itself scans lazily through get_market_snapshot.
+    """
+    now      = now or datetime.now(timezone.utc)
+    all_bars = fetch_bars(data_client, cfg, now)
+    states   = load_indicator_states(cfg)
+    snapshot = evaluate_signals(all_bars, cfg["symbols"], cfg, now, states)
+    save_indicator_states(cfg, states)
+    return snapshot
+
+
+def _open_market(market: dict, cfg: dict):
+    """
+    First use of the run's market state (caller holds market["lock"]): the
+    snapshot and scan ranking come from the checkpoint if it has this bar's,
+    else bars are fetched and ranked and the snapshot starts empty.
+    """
+    if market.get("snapshot") is not None:
+        return
+    ckpt  = market.get("checkpoint")
+    saved = ckpt.snapshot() if ckpt else None
+    if saved is not None:
+        print(f"\n  ♻️  Market snapshot for this bar from the checkpoint")
+        market["snapshot"], market["rank"] = saved
+        return
+    from scan import rank
+    market["snapshot"], market["rank"] = {}, rank(cfg["symbols"], _market_bars(market, cfg), cfg)
+
+
+def _market_bars(market: dict, cfg: dict) -> dict:
+    if market.get("bars") is None:
+        print(f"\n  Fetching market data for {len(cfg['symbols'])} symbols...")
+        market["bars"] = fetch_bars(market["data_client"], cfg, market.get("now"))
+    return market["bars"]
+
+
+def market_rank(market: dict, cfg: dict) -> list[str]:
+    """The run's watchlist ranked by the scan pre-filter (scan.rank)."""
+    with market["lock"]:
+        _open_market(market, cfg)
+        return market["rank"]
+
+
+def get_market_snapshot(market: dict, cfg: dict, symbols: list[str] | None = None) -> dict:
+    """
+    The run's shared market snapshot, with signals for `symbols` (default:
+    the whole watchlist) computed if they aren't in it yet. Bars are fetched
+    once per run and signals once per symbol, by whichever account asks
+    first; accounts run concurrently and wait on each other here. Symbols
+    without enough data are kept as None so they aren't evaluated twice.
+    """
+    with market["lock"]:
+        _open_market(market, cfg)
+        snapshot = market["snapshot"]
+        todo     = [s for s in (cfg["symbols"] if symbols is None else symbols) if s not in snapshot]
+        if not todo:
+            return snapshot
+
+        all_bars = _market_bars(market, cfg)
+        if "states" not in market:
+            market["states"] = load_indicator_states(cfg)
+        now = market.get("now") or datetime.now(timezone.utc)
+        with tracing.span("market.snapshot", symbols=len(todo)):
+            scanned = evaluate_signals(all_bars, todo, cfg, now, market["states"])
+        snapshot.update({s: scanned.get(s) for s in todo})
+        save_indicator_states(cfg, market["states"])
+
+        ckpt = market.get("checkpoint")
+        if ckpt:
+            ckpt.set_snapshot(snapshot, market["rank"])
+    return snapshot
+
 # ─── SIGNAL LOOP ─────────────────────────────────────────────────────────────
 
-def run_signals(client: TradingClient, data_client: StockHistoricalDataClient,
-                positions: dict, equity: float, cfg: dict, force_closed: set):
+def run_signals(executor: "OrderExecutor", snapshot: dict,
+                positions: dict, equity: float, cfg: dict, force_closed: set,
+                exit_orders: dict | None = None, open_orders: list | None = None,
+                sent: set | None = None, candidates: list | None = None,
+                scan: Callable[[list[str]], dict] | None = None,
+                budget: "Budget | None" = None):
     """
-    Scans symbols for buy/sell signals and submits orders.
+    Acts on the shared market snapshot: submits orders for buy/sell signals.
+    Orders are submitted concurrently. Sells go out first and each accepted
+    sell frees a slot for this cycle's buys; each buy reserves its slot as
+    it is queued, so max_open_positions holds however the submissions land.
+    With bracket exits, buys carry their stop / take-profit legs and a sell
+    reprices the position's take-profit (`exit_orders`, from exits.reconcile).
+
+    `open_orders` (the cycle's get_open_orders) keeps signals from stacking
+    orders: a symbol with an order already working on that side gets it
+    repriced if the limit has moved more than reprice_pct, and is otherwise
+    left alone. A sell signal cancels a working buy. Working entries hold a
+    position slot like filled ones. `sent` is the (symbol, side) pairs an
+    interrupted attempt at this cycle already sent (checkpoint.py); those
+    signals are not acted on twice.
+
+    With `candidates` (ranked, from scan.scan_order) the watchlist symbols
+    not among them are scanned first, then the candidates are pulled
+    through `scan` (symbols -> snapshot with their signals) SCAN_CHUNK at a
+    time until the buys found fill the free slots or `budget` runs out.
     """
+    from alpaca.trading.requests import LimitOrderRequest, ReplaceOrderRequest
+    from alpaca.trading.enums import OrderSide, OrderClass, TimeInForce
+    from execution import signal_order_id
+    from scan import SCAN_CHUNK
+    import indicators
+    import exits
+
     symbols    = cfg["symbols"]
     max_pos    = cfg["max_position_pct"]
     trade_pct  = cfg["max_trade_pct"]
     max_slots  = cfg["max_open_positions"]
-    open_count = len(positions)
-
-    for symbol in symbols:
-        if symbol in force_closed:
+    tolerance  = cfg.get("reprice_pct", 0.001)
+    working    = index_orders(open_orders)
+    entries    = {s for s, side in working if side == OrderSide.BUY and s not in positions}
+    open_count = len(positions) + len(entries)
+    votes      = sum(indicators.weights(cfg).values())
+    buys       = []
+    leaving    = set()          # symbols whose slot this cycle's sells / cancels free up
+    selling    = set()          # held symbols a sell signal may free up
+    sent       = sent or set()
+    ranked     = set(candidates or ())
+
+    def stale(order, limit_price: float) -> bool:
+        return abs(float(order.limit_price) / limit_price - 1) > tolerance
+
+    def free_slots() -> int:
+        claims = sum(1 for s in buys if (s, OrderSide.BUY) not in working)
+        return max_slots - open_count + len(selling) - claims
+
+    def scan_order():
+        """Held symbols, then candidates while slots are free and the budget lasts."""
+        nonlocal snapshot
+        yield from (s for s in symbols if s not in ranked)
+        for i, symbol in enumerate(candidates or ()):
+            if free_slots() <= 0:
+                print(f"  ⏸ Position slots spoken for — {len(candidates) - i} candidates not scanned")
+                return
+            if budget is not None and budget.expired():
+                print(f"  ⏱ Scan budget ({budget.seconds:g}s) spent — "
+                      f"{len(candidates) - i} candidates not scanned")
+                return
+            if i % SCAN_CHUNK == 0:
+                snapshot = scan(candidates[i:i + SCAN_CHUNK])
+            yield symbol
+
+    for symbol in scan_order():
+        if symbol in force_closed or snapshot.get(symbol) is None:
             continue
 
         try:
-            # Fetch data: multi-day minute bars for indicators
-            bars_intra = get_today_bars(data_client, symbol)      # today only (for VWAP)
-            bars_hist  = get_multi_day_bars(data_client, symbol)  # 3+ days (for SMA/RSI/MACD)
-
-            if bars_hist is None or len(bars_hist) < cfg["sma_slow"] + 10:
-                print(f"  [{symbol}] Not enough historical data, skipping.")
-                continue
-
-            if bars_intra is None or bars_intra.empty:
-                print(f"  [{symbol}] No intraday data, skipping.")
-                continue
-
-            signal, stats = generate_signals(bars_hist, bars_intra, cfg)
-            price = float(bars_hist["close"].iloc[-1])
+            signal = snapshot[symbol]["signal"]
+            stats  = snapshot[symbol]["stats"]
+            price  = snapshot[symbol]["price"]
 
             print(
-                f"  [{symbol}] ${price:.2f} | "
-                f"SMA({cfg['sma_fast']}/{cfg['sma_slow']}): {stats['sma_f']:.2f}/{stats['sma_s']:.2f} | "
-                f"RSI: {stats['rsi']:.1f} | "
-                f"MACD hist: {stats['macd_hist']:+.3f} | "
-                f"VWAP: {stats['vwap']:.2f} | "
-                f"Signal: {signal or '—'} [{stats['buy_conf']}/4 buy, {stats['sell_conf']}/4 sell]"
+                f"  [{symbol}] ${price:.2f} | {indicators.describe(stats, cfg)} | "
+                f"Signal: {signal or '—'} [{stats['buy_conf']}/{votes} buy, {stats['sell_conf']}/{votes} sell]"
             )
 
             current_pos = positions.get(symbol)
-            current_val = (current_pos["qty"] * price) if current_pos else 0.0
-            max_val     = equity * max_pos
 
-            # ── BUY ─────────────────────────────────────────────────────────
+            if (symbol, signal) in sent:
+                print(f"    ⏸ {symbol}: {signal.upper()} already sent this cycle (checkpoint)")
+                continue
             if signal == "buy":
-                if open_count >= max_slots:
-                    print(f"    ⏸ Max open positions ({max_slots}) reached")
-                    continue
-
-                if current_val >= max_val:
-                    print(f"    ⏸ Position already at max size (${current_val:.0f})")
-                    continue
-
-                available  = min(equity * trade_pct, max_val - current_val)
-                qty        = int(available / price)
-                if qty < 1:
-                    print(f"    ⏸ BUY qty=0, skipping")
-                    continue
-
-                limit_price = round(price * 1.001, 2)
-                print(f"    ✅ BUY  {qty}x {symbol} @ limit ${limit_price:.2f} (${qty*price:.0f})")
-                try:
-                    req = LimitOrderRequest(
-                        symbol=symbol, qty=qty, side=OrderSide.BUY,
-                        time_in_force=TimeInForce.DAY,
-                        limit_price=limit_price,
-                    )
-                    client.submit_order(req)
-                    open_count += 1
-                except Exception as e:
-                    print(f"    ❌ BUY order failed: {e}")
+                buys.append(symbol)
+                continue
+            if signal != "sell":
+                continue
 
             # ── SELL ────────────────────────────────────────────────────────
-            elif signal == "sell" and current_pos:
-                qty = current_pos["qty"]
-                limit_price = round(price * 0.999, 2)
+            # Signal flipped before the entry filled: pull the working buy
+            for o in working.get((symbol, OrderSide.BUY), []):
+                print(f"    ✖ {symbol}: cancelling working BUY {o.qty}x @ ${float(o.limit_price):.2f}")
+                executor.cancel(symbol, o.id)
+
+            if not current_pos:
+                continue
+            selling.add(symbol)
+            qty         = current_pos["qty"]
+            limit_price = round(price * 0.999, 2)
+            takes       = (exit_orders or {}).get(symbol, {}).get("take")
+            sells       = takes or working.get((symbol, OrderSide.SELL), [])
+            moved       = [o for o in sells if stale(o, limit_price)]
+
+            if sells and not moved:
+                print(f"    ⏸ {symbol}: SELL @ ${float(sells[0].limit_price):.2f} already working")
+                leaving.add(symbol)
+            elif sells:
+                # Reprice what is working; with exits that is the take-profit, so the stop stays armed
+                print(f"    🔥 SELL {qty}x {symbol} @ limit ${limit_price:.2f} "
+                      f"({'take-profit' if takes else 'working order'} moved)")
+                for o in moved:
+                    executor.replace(symbol, o.id, ReplaceOrderRequest(limit_price=limit_price))
+            else:
                 print(f"    🔥 SELL {qty}x {symbol} @ limit ${limit_price:.2f}")
-                try:
-                    req = LimitOrderRequest(
-                        symbol=symbol, qty=qty, side=OrderSide.SELL,
-                        time_in_force=TimeInForce.DAY,
-                        limit_price=limit_price,
-                    )
-                    client.submit_order(req)
-                    open_count -= 1
-                except Exception as e:
-                    print(f"    ❌ SELL order failed: {e}")
+                req = LimitOrderRequest(
+                    symbol=symbol, qty=qty, side=OrderSide.SELL,
+                    time_in_force=TimeInForce.DAY,
+                    limit_price=limit_price,
+                )
+                executor.submit(symbol, req)
 
         except Exception as e:
             print(f"  [{symbol}] ❌ Error: {e}")
 
-# ─── MAIN PER-ACCOUNT LOGIC ──────────────────────────────────────────────────
+    for symbol, _, err in executor.drain():
+        if err:
+            print(f"    ❌ SELL order failed for {symbol}: {err}")
+        else:
+            leaving.add(symbol)
+    open_count -= len(leaving)
+
+    # ── BUY ─────────────────────────────────────────────────────────────────
+    for symbol in buys:
+        price       = snapshot[symbol]["price"]
+        limit_price = round(price * 1.001, 2)
+        pending     = working.get((symbol, OrderSide.BUY))
+        if pending:
+            o = pending[0]
+            # Bracket entries stay as placed: their legs are priced off the entry
+            if stale(o, limit_price) and o.order_class == OrderClass.SIMPLE:
+                print(f"    ↻ BUY  {o.qty}x {symbol} repriced ${float(o.limit_price):.2f} "
+                      f"→ ${limit_price:.2f}")
+                executor.replace(symbol, o.id, ReplaceOrderRequest(limit_price=limit_price))
+            else:
+                print(f"    ⏸ {symbol}: BUY {o.qty}x @ ${float(o.limit_price):.2f} already working")
+            continue
 
-def trade_account(name: str, api_key: str, api_secret: str, base_url: str, cfg: dict):
-    print(f"\n{'═'*50}")
-    print(f"  🤖 Trading: {name} ({'Paper' if 'paper' in base_url else '⚠️  LIVE'})")
-    print(f"{'═'*50}")
+        current_pos = positions.get(symbol)
+        current_val = (current_pos["qty"] * price) if current_pos else 0.0
+        max_val     = equity * max_pos
 
-    is_paper = "paper" in base_url
-    client = TradingClient(api_key, api_secret, paper=is_paper)
-    data_client = StockHistoricalDataClient(api_key, api_secret)
+        if open_count >= max_slots:
+            print(f"    ⏸ {symbol}: max open positions ({max_slots}) reached")
+            continue
+
+        if current_val >= max_val:
+            print(f"    ⏸ {symbol}: position already at max size (${current_val:.0f})")
+            continue
 
+        available  = min(equity * trade_pct, max_val - current_val)
+        qty        = int(available / price)
+        if qty < 1:
+            print(f"    ⏸ {symbol}: BUY qty=0, skipping")
+            continue
+
+        order_id    = signal_order_id(snapshot[symbol]["stats"])
+        print(f"    ✅ BUY  {qty}x {symbol} @ limit ${limit_price:.2f} (${qty*price:.0f})")
+        try:
+            if exits.enabled(cfg):
+                req = exits.bracket_order(symbol, qty, limit_price, cfg, order_id)
+            else:
+                req = LimitOrderRequest(
+                    symbol=symbol, qty=qty, side=OrderSide.BUY,
+                    time_in_force=TimeInForce.DAY,
+                    limit_price=limit_price,
+                    client_order_id=order_id,
+                )
+            executor.submit(symbol, req)
+            open_count += 1
+        except Exception as e:
+            print(f"    ❌ BUY order failed for {symbol}: {e}")
+
+    for symbol, _, err in executor.drain():
+        if err:
+            print(f"    ❌ BUY order failed for {symbol}: {err}")
+
+# ─── MAIN PER-ACCOUNT LOGIC ──────────────────────────────────────────────────
+
+def open_session(client: "TradingClient", cfg: dict) -> tuple[float, dict] | None:
+    """
+    Market-open check, equity snapshot, circuit breakers and positions.
+    Returns (equity, positions), or None if the account should not trade.
+    """
     # Market open check
     if not is_market_open(client):
         print("  Market is closed. Skipping.")
-        return
+        return None
 
     # Portfolio snapshot
     try:
         equity, last_equity = get_equity(client)
     except Exception as e:
         print(f"  ❌ Account fetch failed: {e}")
-        return
+        return None
 
     day_pnl     = equity - last_equity
     day_pnl_pct = (day_pnl / last_equity) * 100 if last_equity else 0
@@ -220,13 +532,15 @@ def trade_account(name: str, api_key: str, api_secret: str, base_url: str, cfg:
     # Circuit breakers
     if day_pnl_pct >= cfg["daily_profit_target_pct"] * 100:
         print(f"  🏆 Daily profit target hit ({day_pnl_pct:.2f}%). Closing all & stopping.")
-        client.close_all_positions()
-        return
+        with tracing.api("close_all_positions"):
+            client.close_all_positions(cancel_orders=True)
+        return None
 
     if day_pnl_pct <= -(cfg["daily_loss_limit_pct"] * 100):
         print(f"  🚨 Daily loss limit hit ({day_pnl_pct:.2f}%). Closing all & stopping.")
-        client.close_all_positions()
-        return
+        with tracing.api("close_all_positions"):
+            client.close_all_positions(cancel_orders=True)
+        return None
 
     # Positions
     try:
@@ -234,10 +548,55 @@ def trade_account(name: str, api_key: str, api_secret: str, base_url: str, cfg:
         print(f"  Open positions: {len(positions)} — {list(positions.keys()) or 'none'}")
     except Exception as e:
         print(f"  ❌ Position fetch failed: {e}")
+        return None
+
+    return equity, positions
+
+
+def trade_account(name: str, api_key: str, api_secret: str, base_url: str, cfg: dict,
+                  market: dict):
+    """
+    Runs one trading cycle for an account. `market` is the run-wide shared
+    data state ({"data_client", "snapshot", "now", "lock", "checkpoint",
+    "budget"}); bars and signals are computed once, by whichever account
+    needs them first.
+    """
+    print(f"\n{'═'*50}")
+    print(f"  🤖 Trading: {name} ({'Paper' if 'paper' in base_url else '⚠️  LIVE'})")
+    print(f"{'═'*50}")
+
+    ckpt = market.get("checkpoint")
+    if ckpt and ckpt.done(name):
+        print("  ✔ Already traded this cycle (checkpoint). Skipping.")
         return
 
-    # Stop-loss / take-profit sweep
-    force_closed = check_stops_and_targets(client, positions, cfg)
+    client = clients.trading_client(name, api_key, api_secret, base_url, cfg)
+
+    session = open_session(client, cfg)
+    if session is None:
+        return
+    equity, positions = session
+
+    from execution import OrderExecutor
+    import exits
+
+    # One snapshot of the working orders: exits are reconciled and signals deduplicated against it
+    try:
+        orders = get_open_orders(client)
+    except Exception as e:
+        print(f"  ❌ Open order fetch failed: {e}")
+        return
+
+    # Every order is journaled before it goes out, so a retry of this cycle won't resend it
+    journal  = (lambda symbol, req: ckpt.record(name, symbol, req)) if ckpt else None
+    executor = OrderExecutor(client, cfg, journal)
+    if exits.enabled(cfg):
+        # Stops / take-profits sit at the broker: keep them in step with the positions
+        exit_orders, force_closed = exits.reconcile(executor, positions, orders, cfg)
+    else:
+        # Stop-loss / take-profit sweep (orders go out concurrently)
+        exit_orders  = None
+        force_closed = check_stops_and_targets(executor, positions, cfg)
 
     # Refresh positions if anything was closed
     if force_closed:
@@ -246,24 +605,97 @@ def trade_account(name: str, api_key: str, api_secret: str, base_url: str, cfg:
         except Exception:
             pass
 
-    # Signal scan & new orders
-    print(f"\n  Scanning {len(cfg['symbols'])} symbols...")
-    run_signals(client, data_client, positions, equity, cfg, force_closed)
+    # Signal scan & new orders: held symbols first, then candidates best-first
+    from scan import scan_order
+    held              = set(positions) | {o.symbol for o in orders}
+    first, candidates = scan_order(cfg["symbols"], held, market_rank(market, cfg))
+    snapshot          = get_market_snapshot(market, cfg, first)
+    print(f"\n  Scanning {len(first)} held symbols, then up to {len(candidates)} candidates...")
+    run_signals(executor, snapshot, positions, equity, cfg, force_closed, exit_orders, orders,
+                ckpt.sent(name) if ckpt else None, candidates,
+                lambda symbols: get_market_snapshot(market, cfg, symbols), market.get("budget"))
+    executor.close()
+    if ckpt:
+        ckpt.finish(name)
+
+
+# ─── STARTUP TIMING ──────────────────────────────────────────────────────────
 
+def load_trading_stack():
+    """Imports everything a trading cycle loads lazily (pandas, numpy, alpaca-py, signals)."""
+    import numpy, pandas
+    import alpaca.trading.client, alpaca.trading.requests, alpaca.data.historical
+    import utils, bar_cache, incremental, vectorized, execution, exits, indicators
+
+
+def startup_table(phases: dict[str, float]) -> str:
+    """`--startup-time` report: seconds per startup phase, in order, plus the total."""
+    rows = [*phases.items(), ("total", time.perf_counter() - STARTED)]
+    return "\n".join(f"  {name:<16} {sec * 1000:>8.1f} ms" for name, sec in rows)
 
 # ─── ENTRY POINT ─────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
     print(f"\n🤖 Alpaca Bot — {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC')}")
-    cfg = load_config()
-
-    for i in [1, 2]:
-        key    = os.getenv(f"APCA_API_KEY_{i}")
-        secret = os.getenv(f"APCA_API_SECRET_{i}")
-        url    = os.getenv(f"APCA_BASE_URL_{i}", "https://paper-api.alpaca.markets")
-
-        if key and secret:
-            trade_account(f"Account {i}", key, secret, url, cfg)
-        elif i == 1:
-            print("❌ APCA_API_KEY_1 / APCA_API_SECRET_1 not set. Exiting.")
-            break
+    phases   = {"imports": time.perf_counter() - STARTED}
+    mark     = time.perf_counter()
+    cfg      = load_config()
+    accounts = load_accounts(cfg)
+    tracing.enable(os.getenv("BOT_TRACE") or cfg.get("trace_path"))
+    phases["config"] = time.perf_counter() - mark
+
+    if clients.backend(cfg) == "sim":
+        print("  🧪 Simulated broker backend")
+        cfg      = clients.sim_config(cfg)
+        accounts = accounts or [("Account 1", None, None, "paper")]
+
+    if not accounts:
+        print("❌ No accounts configured (APCA_API_KEY_<n> / BOT_ACCOUNTS). Exiting.")
+        sys.exit(0)
+
+    if "--daemon" in sys.argv:
+        from stream import run_daemon
+        run_daemon(accounts, cfg)
+        sys.exit(0)
+
+    # Most cron ticks fall outside market hours: one light clock request
+    # settles those before pandas / alpaca-py are ever imported
+    _, key, secret, url = accounts[0]
+    mark    = time.perf_counter()
+    is_open = clients.market_open(key, secret, url, cfg)
+    phases["clock"] = time.perf_counter() - mark
+
+    if "--startup-time" in sys.argv:
+        mark = time.perf_counter()
+        load_trading_stack()
+        phases["trading stack"] = time.perf_counter() - mark
+        print(f"  Market {'open' if is_open else 'closed' if is_open is False else 'unknown'}\n"
+              f"\n⏱  Startup\n{startup_table(phases)}")
+        sys.exit(0)
+
+    if is_open is False:
+        print("  Market is closed. Skipping.")
+        tracing.close()
+        sys.exit(0)
+
+    # Market data is account-independent: one data client per run
+    _, key, secret, _ = accounts[0]
+    from checkpoint import open_checkpoint
+    from scan import Budget
+    market = {"data_client": clients.data_client(key, secret, cfg), "snapshot": None,
+              "now": clients.market_time(cfg), "lock": threading.Lock(),
+              "budget": Budget(cfg.get("scan_budget_sec"), STARTED)}
+    market["checkpoint"] = open_checkpoint(cfg, market["now"])
+    if market["checkpoint"] and market["checkpoint"].resumed:
+        print("  ♻️  Resuming the interrupted cycle from the checkpoint")
+
+    # Accounts run side by side: a slow or failing one can't hold up the others' stops
+    workers = cfg.get("account_workers", 4)
+    with tracing.span("run", accounts=len(accounts), symbols=len(cfg["symbols"])):
+        run_accounts(accounts, lambda *account: trade_account(*account, cfg, market), workers)
+    # A failed account (run_accounts only logs it) keeps the cycle open for a retry
+    if market["checkpoint"] and not market["checkpoint"].complete([a[0] for a in accounts]):
+        print("  ⚠️  Not every account finished: the next run within the window resumes this cycle")
+
+    print(f"\n⏱  Run summary\n{tracing.summary()}")
+    tracing.close()
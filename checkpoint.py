@@ -0,0 +1,132 @@
+"""
+checkpoint.py — Durable progress for one trading cycle
+=======================================================
+bot.py is one process per cron tick; a run killed mid-cycle (runner
+timeout, crash, API outage) used to leave no trace of what it had done.
+The checkpoint (checkpoint_path in config.json, kept in the Actions cache
+next to the bar cache and indicator state) records, for the cycle in flight:
+  - the market snapshot (signal, stats and price per symbol scanned so
+    far), the scan ranking (scan.py) and the bar they were taken on
+  - per account, every order handed to the executor — written before the
+    request goes out — and whether the account finished its cycle
+
+A run in which every account finished marks its checkpoint complete. A
+run starting within checkpoint_window_sec of an incomplete one is a retry
+of that cycle: it doesn't send a signal order for a symbol / side the
+earlier attempt already sent, and if the bar hasn't moved it also reuses
+the snapshot (bars are only fetched for symbols not scanned yet) and skips
+accounts that finished on that bar. Anything else — a complete checkpoint,
+or one older than the window — is a new cycle and starts a fresh
+checkpoint, so a cron tick or a manual run right after a finished cycle
+trades every account. The window counts from the cycle's first attempt
+and retries don't extend it, so one cycle's retries chain for at most
+checkpoint_window_sec. Every write is atomic (tmp file + rename), so a
+kill mid-write leaves the previous version.
+
+Per-symbol bar and indicator progress lives in the bar cache and
+indicator_state_path; open orders and positions are read from the broker.
+"""
+
+import os
+import json
+import threading
+from datetime import datetime, timezone
+
+# ─── CHECKPOINT ──────────────────────────────────────────────────────────────
+
+class Checkpoint:
+    """One cycle's progress; thread-safe, saved on every change."""
+
+    def __init__(self, path: str, now: datetime, window: float):
+        self.path  = path
+        self.bar   = now.replace(second=0, microsecond=0).isoformat()
+        self.lock  = threading.Lock()
+        state      = _load(path)
+        started    = state.get("started")
+        resumed    = (started is not None and not state.get("complete", False)
+                      and 0 <= (now - datetime.fromisoformat(started)).total_seconds() < window)
+        self.state = state if resumed else {"started": now.isoformat(), "complete": False,
+                                            "bar": None, "snapshot": None, "accounts": {}}
+        self.resumed = resumed
+
+    # ── Snapshot ────────────────────────────────────────────────────────────
+    def snapshot(self) -> tuple[dict, list] | None:
+        """(market snapshot, scan ranking) if they were taken on the current bar."""
+        with self.lock:
+            if self.state["bar"] != self.bar or self.state.get("rank") is None:
+                return None
+            return self.state["snapshot"], self.state["rank"]
+
+    def set_snapshot(self, snapshot: dict, rank: list):
+        with self.lock:
+            self.state.update(bar=self.bar, snapshot=snapshot, rank=rank)
+            self._save()
+
+    # ── Accounts ────────────────────────────────────────────────────────────
+    def done(self, account: str) -> bool:
+        """The account finished this cycle on the current bar."""
+        with self.lock:
+            acct = self.state["accounts"].get(account, {})
+            return acct.get("done", False) and acct.get("bar") == self.bar
+
+    def finish(self, account: str):
+        with self.lock:
+            self._account(account).update(done=True, bar=self.bar)
+            self._save()
+
+    def complete(self, accounts: list[str]) -> bool:
+        """
+        Marks the cycle complete — the next run starts a new one — if every
+        account in `accounts` finished it on this bar. An account whose run
+        raised or bailed out leaves the cycle open for a retry. Returns
+        whether it was marked.
+        """
+        if not all(self.done(a) for a in accounts):
+            return False
+        with self.lock:
+            self.state["complete"] = True
+            self._save()
+        return True
+
+    def record(self, account: str, symbol: str, req):
+        """Journal an order before it is submitted (OrderExecutor's journal hook)."""
+        side  = getattr(req.side, "value", req.side)
+        klass = getattr(getattr(req, "order_class", None), "value", None) or "simple"
+        with self.lock:
+            self._account(account)["orders"].append(
+                {"symbol": symbol, "side": side, "class": klass,
+                 "client_order_id": req.client_order_id})
+            self._save()
+
+    def sent(self, account: str) -> set[tuple[str, str]]:
+        """(symbol, side) of the signal orders this cycle already sent (OCO exits left out)."""
+        with self.lock:
+            orders = self.state["accounts"].get(account, {}).get("orders", [])
+            return {(o["symbol"], o["side"]) for o in orders if o["class"] != "oco"}
+
+    def _account(self, account: str) -> dict:
+        return self.state["accounts"].setdefault(account, {"done": False, "orders": []})
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+
+def open_checkpoint(cfg: dict, now: datetime | None = None) -> Checkpoint | None:
+    """The run's checkpoint (resumed or fresh); None if checkpoint_path isn't set."""
+    path = cfg.get("checkpoint_path")
+    if not path:
+        return None
+    return Checkpoint(path, now or datetime.now(timezone.utc), cfg.get("checkpoint_window_sec", 240))
+
+
+def _load(path: str) -> dict:
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) and "accounts" in state else {}
+    except (OSError, ValueError):
+        return {}
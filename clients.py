@@ -0,0 +1,83 @@
+"""
+clients.py — Alpaca client backend
+===================================
+bot.py, report.py and stream.py get their clients here instead of building
+them directly:
+  "alpaca" (default) — the real TradingClient / StockHistoricalDataClient
+  "sim"              — the in-process simulated broker (sim.py)
+
+Selected by the BOT_BACKEND env var, else "backend" in config.json.
+"""
+
+import os
+import json
+from datetime import datetime
+
+TRADING_URLS  = {True: "https://paper-api.alpaca.markets", False: "https://api.alpaca.markets"}
+CLOCK_TIMEOUT = 10                           # seconds
+
+# ─── BACKEND ─────────────────────────────────────────────────────────────────
+
+def backend(cfg: dict | None = None) -> str:
+    return os.getenv("BOT_BACKEND") or (cfg or {}).get("backend", "alpaca")
+
+
+def _sim_market(cfg: dict | None):
+    from sim import default_market
+    if not cfg:                              # no config.json: read it from the working dir
+        with open("config.json", "r") as f:
+            cfg = json.load(f)
+    return default_market(cfg)
+
+
+def trading_client(name: str, api_key: str, api_secret: str, base_url: str,
+                   cfg: dict | None = None):
+    """TradingClient for one account (a SimBroker keyed by account name under "sim")."""
+    if backend(cfg) == "sim":
+        return _sim_market(cfg).broker(name)
+
+    from alpaca.trading.client import TradingClient
+    return TradingClient(api_key, api_secret, paper="paper" in base_url)
+
+
+def market_open(api_key: str, api_secret: str, base_url: str,
+                cfg: dict | None = None) -> bool | None:
+    """
+    Is the market open — one GET /v2/clock over the standard library, so a
+    closed-market run never imports alpaca-py or pandas. None if the answer
+    is unknown (request failed); the caller then goes the usual way.
+    """
+    if backend(cfg) == "sim":
+        return _sim_market(cfg).is_open()
+
+    import urllib.request
+    try:
+        url = TRADING_URLS["paper" in base_url] + "/v2/clock"
+        req = urllib.request.Request(url, headers={"APCA-API-KEY-ID": api_key,
+                                                   "APCA-API-SECRET-KEY": api_secret})
+        with urllib.request.urlopen(req, timeout=CLOCK_TIMEOUT) as resp:
+            return bool(json.load(resp)["is_open"])
+    except Exception as e:
+        print(f"  ⚠️  Clock check failed ({e}); continuing with the full run.")
+        return None
+
+
+def data_client(api_key: str, api_secret: str, cfg: dict | None = None):
+    if backend(cfg) == "sim":
+        return _sim_market(cfg).data_client()
+
+    from alpaca.data.historical import StockHistoricalDataClient
+    return StockHistoricalDataClient(api_key, api_secret)
+
+
+def market_time(cfg: dict | None = None) -> datetime | None:
+    """The simulated clock under "sim"; None (wall clock) otherwise."""
+    if backend(cfg) == "sim":
+        return _sim_market(cfg).now.to_pydatetime()
+    return None
+
+
+def sim_config(cfg: dict) -> dict:
+    """cfg without the on-disk bar cache / indicator state / checkpoint, which hold real market data."""
+    return {k: v for k, v in cfg.items()
+            if k not in ("bar_cache_dir", "indicator_state_path", "checkpoint_path")}
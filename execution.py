@@ -0,0 +1,160 @@
+"""
+execution.py — Concurrent order submission
+===========================================
+Orders for one account go through a bounded thread pool so a slow API
+response no longer holds up every later symbol. Submits, cancels and
+replaces share each account's executor, with:
+  - a token-bucket rate limiter (Alpaca allows ~200 requests/min/account)
+  - retry with exponential backoff on transient failures (429, 5xx, network)
+  - a client_order_id on every order, so a retry after an ambiguous
+    failure cannot create a duplicate — the broker rejects the second copy
+    and the original order is looked up instead
+
+Signal buys carry the indicators that confirmed them in that id
+("sig-smv-<hex>"), so performance can be attributed per indicator from
+order history alone (analytics.py).
+"""
+
+import re
+import time
+import uuid
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, Future
+from alpaca.trading.client import TradingClient
+from indicators import REGISTRY
+import tracing
+
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+# ─── RATE LIMITER ────────────────────────────────────────────────────────────
+
+class RateLimiter:
+    """Thread-safe token bucket: `rate_per_min` requests/min, bursts up to `burst`."""
+
+    def __init__(self, rate_per_min: float, burst: int = 10):
+        self.rate   = rate_per_min / 60.0
+        self.burst  = burst
+        self.tokens = float(burst)
+        self.stamp  = time.monotonic()
+        self.lock   = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now         = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp  = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+# ─── EXECUTOR ────────────────────────────────────────────────────────────────
+
+class OrderExecutor:
+    """
+    Submits orders concurrently for one account.
+    submit() / cancel() / replace() return immediately; drain() waits for
+    everything queued so far and returns [(symbol, order | None, error | None)]
+    in queue order (the new order for a replace, None for a cancel).
+    `journal(symbol, req)`, if given, sees every order before it is sent.
+    """
+
+    def __init__(self, client: TradingClient, cfg: dict, journal=None):
+        self.client  = client
+        self.journal = journal
+        self.retries = cfg.get("order_retries", 3)
+        self.backoff = cfg.get("order_backoff_sec", 0.5)
+        self.limiter = RateLimiter(cfg.get("orders_per_minute", 190))
+        self.pool    = ThreadPoolExecutor(max_workers=cfg.get("order_workers", 8),
+                                          thread_name_prefix="orders")
+        self.pending: list[tuple[str, Future]] = []
+
+    def submit(self, symbol: str, req) -> Future:
+        if getattr(req, "client_order_id", None) is None:
+            req.client_order_id = uuid.uuid4().hex
+        if self.journal:
+            self.journal(symbol, req)
+        return self._queue(symbol, self._submit_with_retry, req)
+
+    def cancel(self, symbol: str, order_id) -> Future:
+        return self._queue(symbol, self._call, "cancel_order_by_id", symbol, order_id)
+
+    def replace(self, symbol: str, order_id, req) -> Future:
+        return self._queue(symbol, self._call, "replace_order_by_id", symbol, order_id, req)
+
+    def _queue(self, symbol: str, fn, *args) -> Future:
+        future = self.pool.submit(fn, *args)
+        self.pending.append((symbol, future))
+        return future
+
+    def drain(self) -> list[tuple[str, object, Exception | None]]:
+        results = []
+        for symbol, future in self.pending:
+            try:
+                results.append((symbol, future.result(), None))
+            except Exception as e:
+                results.append((symbol, None, e))
+        self.pending = []
+        return results
+
+    def close(self):
+        self.pool.shutdown(wait=True)
+
+    def _submit_with_retry(self, req):
+        order = self._call("submit_order", req.symbol, req)
+        tracing.count("orders_submitted")
+        return order
+
+    def _call(self, method: str, symbol: str, *args):
+        """client.<method>(*args) behind the rate limiter, retried on transient failures."""
+        for attempt in range(self.retries + 1):
+            with tracing.span("orders.rate_wait"):
+                self.limiter.acquire()
+            try:
+                with tracing.api(method, symbol=symbol, attempt=attempt):
+                    return getattr(self.client, method)(*args)
+            except Exception as e:
+                if attempt > 0 and method == "submit_order" and _is_duplicate(e):
+                    # An earlier attempt reached the broker after all
+                    with tracing.api("get_order_by_client_id", symbol=symbol):
+                        return self.client.get_order_by_client_id(args[0].client_order_id)
+                if attempt == self.retries or not _is_transient(e):
+                    tracing.count("orders_failed")
+                    raise
+            tracing.count("order_retries")
+            time.sleep(self.backoff * (2 ** attempt))
+
+
+def _is_transient(e: Exception) -> bool:
+    if getattr(e, "status_code", None) in TRANSIENT_STATUS:
+        return True
+    return isinstance(e, (ConnectionError, TimeoutError,
+                          requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def _is_duplicate(e: Exception) -> bool:
+    return getattr(e, "status_code", None) == 422 and "client_order_id" in str(e)
+
+# ─── ORDER TAGS ──────────────────────────────────────────────────────────────
+
+def indicator_tags() -> dict[str, str]:
+    """{tag letter: indicator name} for every registered indicator, in registry order."""
+    return {ind.tag: name for name, ind in REGISTRY.items()}
+
+
+def signal_order_id(stats: dict) -> str:
+    """Unique client_order_id for a buy, recording which indicators were bullish."""
+    flags = "".join(k for k, name in indicator_tags().items() if stats.get(f"{name}_bull"))
+    return f"sig-{flags or '_'}-{uuid.uuid4().hex[:20]}"
+
+
+def order_signals(client_order_id: str | None) -> set | None:
+    """Indicator names from a signal_order_id tag; None for untagged orders."""
+    m = re.match(r"sig-([a-z_]+)-", client_order_id or "")
+    if not m:
+        return None
+    tags = indicator_tags()
+    return {tags[k] for k in m.group(1) if k in tags}
@@ -0,0 +1,152 @@
+"""
+exits.py — Broker-side stop-loss / take-profit orders
+======================================================
+With "bracket_exits" on (config.json) every signal buy goes out as a
+bracket order: the limit entry plus a take-profit limit and a stop-loss
+stop, one-cancels-other, priced off the entry from take_profit_pct /
+stop_loss_pct. Exits fire at the broker the moment price gets there
+instead of at the next run's position sweep.
+
+reconcile() runs once per account cycle and keeps those orders in step
+with the positions:
+  - a position without exits, or whose exits cover a different quantity
+    (a second buy, a partial fill, DAY legs expired overnight), gets them
+    cancelled and one GTC OCO pair for the whole position, priced off the
+    average cost
+  - once a position is up TRAIL_TRIGGER, its stop is raised to the trailing
+    floor (half the stop distance below the price) — it only ever moves up
+  - a position already past its stop or target with nothing at the broker
+    is sold at market, as the old sweep did
+  - symbols with an entry or a signal sell still working are left alone
+
+A signal sell moves the take-profit limit down to the sell price rather
+than sending a second order for shares the exits already hold, so the
+stop stays armed until the sell fills.
+"""
+
+from alpaca.trading.requests import (LimitOrderRequest, MarketOrderRequest, ReplaceOrderRequest,
+                                     TakeProfitRequest, StopLossRequest)
+from alpaca.trading.enums import OrderSide, OrderType, OrderClass, TimeInForce
+from execution import OrderExecutor
+
+TRAIL_TRIGGER = 0.05     # trailing floor arms once a position is up 5%
+STOPS         = (OrderType.STOP, OrderType.STOP_LIMIT)
+
+# ─── PRICES ──────────────────────────────────────────────────────────────────
+
+def enabled(cfg: dict) -> bool:
+    return bool(cfg.get("bracket_exits", False))
+
+
+def prices(basis: float, price: float, cfg: dict) -> tuple[float, float]:
+    """(take-profit limit, stop) for a position entered at `basis`, now at `price`."""
+    stop_pct = cfg["stop_loss_pct"]
+    take     = round(basis * (1 + cfg["take_profit_pct"]), 2)
+    stop     = round(basis * (1 - stop_pct), 2)
+    if price >= basis * (1 + TRAIL_TRIGGER):
+        stop = max(stop, round(price * (1 - stop_pct * 0.5), 2))
+    return take, stop
+
+# ─── ORDERS ──────────────────────────────────────────────────────────────────
+
+def bracket_order(symbol: str, qty: int, limit_price: float, cfg: dict,
+                  client_order_id: str | None = None) -> LimitOrderRequest:
+    """A DAY limit buy with take-profit / stop-loss legs priced off `limit_price`."""
+    take, stop = prices(limit_price, limit_price, cfg)
+    return LimitOrderRequest(
+        symbol=symbol, qty=qty, side=OrderSide.BUY, time_in_force=TimeInForce.DAY,
+        limit_price=limit_price, order_class=OrderClass.BRACKET,
+        take_profit=TakeProfitRequest(limit_price=take),
+        stop_loss=StopLossRequest(stop_price=stop),
+        client_order_id=client_order_id,
+    )
+
+
+def oco_order(symbol: str, qty: int, take: float, stop: float) -> LimitOrderRequest:
+    """GTC take-profit limit + stop for a position already held."""
+    return LimitOrderRequest(
+        symbol=symbol, qty=qty, side=OrderSide.SELL, time_in_force=TimeInForce.GTC,
+        order_class=OrderClass.OCO,
+        take_profit=TakeProfitRequest(limit_price=take),
+        stop_loss=StopLossRequest(stop_price=stop),
+    )
+
+
+def is_exit(order) -> bool:
+    """A take-profit / stop leg of a bracket or OCO (not an entry or a plain sell)."""
+    return order.side == OrderSide.SELL and order.order_class != OrderClass.SIMPLE
+
+
+def open_exits(orders: list) -> tuple[dict, set]:
+    """
+    Splits open orders (flat, legs included) into ({symbol: {"take": [...],
+    "stop": [...]}} for exit legs, {symbols with any other order working}).
+    """
+    exits, working = {}, set()
+    for o in orders:
+        if not is_exit(o):
+            working.add(o.symbol)
+            continue
+        kind = "stop" if o.type in STOPS else "take"
+        exits.setdefault(o.symbol, {"take": [], "stop": []})[kind].append(o)
+    return exits, working
+
+# ─── RECONCILE ───────────────────────────────────────────────────────────────
+
+def reconcile(executor: OrderExecutor, positions: dict, orders: list,
+              cfg: dict) -> tuple[dict, set]:
+    """
+    Brings exit orders in line with `positions` (see module docstring).
+    Returns (exits now at the broker, symbols sold at market).
+    """
+    exits, working = open_exits(orders)
+    missing, raised, sold = [], set(), set()
+
+    for symbol, pos in positions.items():
+        if symbol in working:
+            continue
+        qty, price = pos["qty"], pos["price"]
+        take, stop = prices(pos["avg_cost"], price, cfg)
+        ex         = exits.get(symbol)
+        covered    = sum(int(float(o.qty)) for o in ex["take"]) if ex else 0
+
+        if not ex and (price <= stop or price >= take):
+            print(f"  🛑 {symbol} past its exit at ${price:.2f} with no order at the broker "
+                  f"— closing {qty} shares")
+            executor.submit(symbol, MarketOrderRequest(symbol=symbol, qty=qty, side=OrderSide.SELL,
+                                                       time_in_force=TimeInForce.DAY))
+            sold.add(symbol)
+
+        elif covered != qty:
+            print(f"  🛡  Exits for {qty}x {symbol}: take ${take:.2f} / stop ${stop:.2f}"
+                  + (f" (replacing exits for {covered})" if ex else ""))
+            for legs in exits.pop(symbol, {}).values():
+                for o in legs:
+                    executor.cancel(symbol, o.id)
+            missing.append((symbol, qty, take, stop))
+
+        else:
+            for o in ex["stop"]:
+                if float(o.stop_price) < stop:
+                    print(f"  ↗ Trailing stop on {symbol} raised to ${stop:.2f} "
+                          f"(up {(price / pos['avg_cost'] - 1) * 100:.1f}%)")
+                    executor.replace(symbol, o.id, ReplaceOrderRequest(stop_price=stop))
+                    raised.add(o.id)
+
+    # Cancels have to land before new exits can hold the same shares
+    for symbol, order, err in executor.drain():
+        if err:
+            print(f"    ❌ Exit update failed for {symbol}: {err}")
+        elif order is not None and order.type in STOPS:          # a raised stop's replacement
+            ex = exits[symbol]
+            ex["stop"] = [o for o in ex["stop"] if o.id not in raised] + [order]
+
+    for symbol, qty, take, stop in missing:
+        executor.submit(symbol, oco_order(symbol, qty, take, stop))
+    for symbol, order, err in executor.drain():
+        if err:
+            print(f"    ❌ Exit order failed for {symbol}: {err}")
+        else:
+            exits[symbol] = {"take": [order], "stop": list(order.legs or [])}
+
+    return exits, sold
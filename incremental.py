@@ -0,0 +1,286 @@
+"""
+incremental.py — Streaming-state indicator engine
+==================================================
+Same indicators as utils.generate_signals (SMA fast/slow, RSI, MACD histogram,
+today's VWAP), but kept as running state that is updated one bar at a time:
+ring buffers for the rolling windows, the three EMA values for MACD, and
+cumulative TP·volume / volume for VWAP. A cycle only feeds the bars that are
+new since the last run, so the cost is O(new bars) instead of O(window).
+
+State is JSON-serializable (to_dict / from_dict) and persisted between runs
+in `indicator_state_path`. Stats match the pandas path up to float rounding;
+the EMAs are seeded at the first bar ever seen rather than at the start of
+the current fetch window, a difference that decays to nothing long before
+the SMA warmup is over.
+
+With per-indicator timeframes (timeframes.py) a symbol has one state per
+bar size, keyed SYMBOL@<n>m, fed with buckets resampled from the minute
+bars; each run resamples only from the state's last committed bucket on.
+
+Enabled indicators beyond those four (ATR, Bollinger — see indicators.py)
+are evaluated on a Graph over the last few bars, which the state keeps in
+a ring buffer as long as their longest window.
+"""
+
+import os
+import json
+import math
+import numpy as np
+from collections import deque
+from datetime import datetime, timezone
+from utils import session_start
+from bars import Bars
+from timeframes import timeframes, resample, pick
+from indicators import (MACD_FAST, MACD_SLOW, MACD_SIGNAL, Graph, REGISTRY,
+                        windowed, score)
+
+# ─── ENGINE ──────────────────────────────────────────────────────────────────
+
+class IndicatorState:
+    """Running indicator state for one symbol."""
+
+    def __init__(self, sma_fast: int, sma_slow: int, rsi_period: int, window: int = 0):
+        self.params     = [sma_fast, sma_slow, rsi_period, window]
+        self.count      = 0          # bars consumed
+        self.last_ts    = None       # epoch seconds of the last consumed bar
+        self.last_close = None
+        self.fast_win   = deque(maxlen=sma_fast)
+        self.slow_win   = deque(maxlen=sma_slow)
+        self.gain_win   = deque(maxlen=rsi_period)
+        self.loss_win   = deque(maxlen=rsi_period)
+        self.sma_recent = deque(maxlen=3)   # [(sma_f, sma_s)] — for the cross check
+        self.ema_fast   = None
+        self.ema_slow   = None
+        self.ema_signal = None
+        self.hist       = deque(maxlen=2)
+        self.vwap_day   = None       # session date the VWAP sums belong to
+        self.cum_tp_vol = 0.0
+        self.cum_vol    = 0.0
+        self.vwap_bars  = 0
+        self.tail       = deque(maxlen=window)   # [(high, low, close, volume)] for windowed indicators
+
+    @classmethod
+    def for_config(cls, cfg: dict) -> "IndicatorState":
+        return cls(*_params(cfg))
+
+    def matches(self, cfg: dict) -> bool:
+        return self.params == _params(cfg)
+
+    # ── Updates ──────────────────────────────────────────────────────────────
+
+    def update(self, bars: Bars):
+        """Consume bars (ascending, all newer than last_ts)."""
+        cols = zip(bars.ts.tolist(), bars["high"].tolist(), bars["low"].tolist(),
+                   bars["close"].tolist(), bars["volume"].tolist())
+        for ts, high, low, close, volume in cols:
+            self.push(ts, high, low, close, volume)
+
+    def push(self, ts: int, high: float, low: float, close: float, volume: float):
+        # SMAs
+        self.fast_win.append(close)
+        self.slow_win.append(close)
+        self.sma_recent.append((_mean(self.fast_win), _mean(self.slow_win)))
+
+        # RSI — diff-based, so the first bar ever seen contributes nothing
+        if self.last_close is not None:
+            delta = close - self.last_close
+            self.gain_win.append(max(delta, 0.0))
+            self.loss_win.append(max(-delta, 0.0))
+
+        # MACD (EWM with adjust=False: seeded with the first value)
+        self.ema_fast = _ema(self.ema_fast, close, MACD_FAST)
+        self.ema_slow = _ema(self.ema_slow, close, MACD_SLOW)
+        line          = self.ema_fast - self.ema_slow
+        self.ema_signal = _ema(self.ema_signal, line, MACD_SIGNAL)
+        self.hist.append(line - self.ema_signal)
+
+        # VWAP — resets at each session, only counts bars after the anchor
+        bar_time = datetime.fromtimestamp(ts, timezone.utc)
+        day      = bar_time.date().isoformat()
+        if day != self.vwap_day:
+            self.vwap_day, self.cum_tp_vol, self.cum_vol, self.vwap_bars = day, 0.0, 0.0, 0
+        if bar_time >= session_start(bar_time):
+            self.cum_tp_vol += (high + low + close) / 3 * volume
+            self.cum_vol    += volume
+            self.vwap_bars  += 1
+
+        if self.tail.maxlen:
+            self.tail.append((high, low, close, volume))
+
+        self.count     += 1
+        self.last_ts    = ts
+        self.last_close = close
+
+    # ── Readout ──────────────────────────────────────────────────────────────
+
+    def rsi(self) -> float:
+        if len(self.gain_win) < self.gain_win.maxlen:
+            return math.nan
+        gain = _mean(self.gain_win)
+        loss = _mean(self.loss_win)
+        if loss == 0:
+            return math.nan
+        return 100 - (100 / (1 + gain / loss))
+
+    def vwap(self, now: datetime) -> float | None:
+        """Today's VWAP, None if no bars of today's session were seen."""
+        if now < session_start(now) or self.vwap_day != now.date().isoformat():
+            return None
+        if not self.vwap_bars:
+            return None
+        return self.cum_tp_vol / self.cum_vol if self.cum_vol else math.nan
+
+    def values(self, cfg: dict, now: datetime | None = None) -> dict[str, dict]:
+        """{indicator: values} as indicators.score takes them."""
+        now    = now or datetime.now(timezone.utc)
+        recent = list(self.sma_recent)
+        vwap   = self.vwap(now)
+        out    = {
+            "sma":  {"fast": [f for f, _ in recent], "slow": [s for _, s in recent]},
+            "rsi":  {"rsi": self.rsi()},
+            "macd": {"hist": self.hist[-1], "prev": self.hist[-2] if len(self.hist) > 1 else 0.0},
+            "vwap": {"price": self.last_close, "vwap": math.nan if vwap is None else vwap,
+                     "has_today": vwap is not None},
+        }
+        extra = windowed(cfg)
+        if extra:
+            cols  = np.array(self.tail, dtype=np.float64).reshape(-1, 4).T
+            graph = Graph({0: dict(zip(("high", "low", "close", "volume"), cols))})
+            out.update({name: REGISTRY[name].compute(graph, 0, cfg) for name in extra})
+        return out
+
+    def signals(self, cfg: dict, now: datetime | None = None) -> tuple[str | None, dict]:
+        """Same (signal, stats) as utils.generate_signals on the bars consumed."""
+        return score(self.values(cfg, now), cfg)
+
+    # ── Serialization ────────────────────────────────────────────────────────
+
+    def to_dict(self) -> dict:
+        return {
+            "params":     self.params,
+            "count":      self.count,
+            "last_ts":    self.last_ts,
+            "last_close": self.last_close,
+            "fast_win":   list(self.fast_win),
+            "slow_win":   list(self.slow_win),
+            "gain_win":   list(self.gain_win),
+            "loss_win":   list(self.loss_win),
+            "sma_recent": [list(p) for p in self.sma_recent],
+            "ema":        [self.ema_fast, self.ema_slow, self.ema_signal],
+            "hist":       list(self.hist),
+            "vwap":       [self.vwap_day, self.cum_tp_vol, self.cum_vol, self.vwap_bars],
+            "tail":       [list(b) for b in self.tail],
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "IndicatorState":
+        state = cls(*d["params"])
+        state.count, state.last_ts, state.last_close = d["count"], d["last_ts"], d["last_close"]
+        state.fast_win.extend(d["fast_win"])
+        state.slow_win.extend(d["slow_win"])
+        state.gain_win.extend(d["gain_win"])
+        state.loss_win.extend(d["loss_win"])
+        state.sma_recent.extend(tuple(p) for p in d["sma_recent"])
+        state.ema_fast, state.ema_slow, state.ema_signal = d["ema"]
+        state.hist.extend(d["hist"])
+        state.vwap_day, state.cum_tp_vol, state.cum_vol, state.vwap_bars = d["vwap"]
+        state.tail.extend(tuple(b) for b in d.get("tail", []))
+        return state
+
+
+def _params(cfg: dict) -> list:
+    window = max(windowed(cfg).values(), default=0)
+    return [cfg["sma_fast"], cfg["sma_slow"], cfg.get("rsi_period", 10), window]
+
+
+def _mean(window: deque) -> float:
+    if len(window) < window.maxlen:
+        return math.nan
+    return sum(window) / len(window)
+
+
+def _ema(prev: float | None, value: float, span: int) -> float:
+    if prev is None:
+        return value
+    alpha = 2 / (span + 1)
+    return alpha * value + (1 - alpha) * prev
+
+# ─── PERSISTENCE ─────────────────────────────────────────────────────────────
+
+def load_states(path: str) -> dict[str, IndicatorState]:
+    """Load {symbol: IndicatorState}; empty dict if missing or unreadable."""
+    try:
+        with open(path, "r") as f:
+            raw = json.load(f)
+        return {sym: IndicatorState.from_dict(d) for sym, d in raw.items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}
+
+
+def save_states(path: str, states: dict[str, IndicatorState]):
+    """Atomically write all symbol states (tmp file + rename)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({sym: s.to_dict() for sym, s in states.items()}, f)
+    os.replace(tmp, path)
+
+# ─── SNAPSHOT HOOK ───────────────────────────────────────────────────────────
+
+def advance(state: IndicatorState | None, bars: Bars,
+            cfg: dict) -> IndicatorState:
+    """
+    Bring a symbol's state up to date with `bars` and return it.
+    The newest bar may still be forming, so it is never committed to the
+    state — callers evaluate it on a copy (see evaluate). A state that does
+    not connect to `bars` (config change, gap, first run) is rebuilt.
+    """
+    committed = bars[:-1]
+    if (state is None or not state.matches(cfg) or state.last_ts is None
+            or committed.empty or state.last_ts < committed.ts[0]):
+        state = IndicatorState.for_config(cfg)
+
+    if state.last_ts is not None:
+        committed = committed.since(state.last_ts + 1)
+    state.update(committed)
+    return state
+
+
+def evaluate(state: IndicatorState, bars: Bars, cfg: dict,
+             now: datetime | None = None) -> tuple[str | None, dict]:
+    """Signals for `bars` on top of an advanced state (newest bar applied to a copy)."""
+    return _view(state, bars).signals(cfg, now)
+
+
+def _view(state: IndicatorState, bars: Bars) -> IndicatorState:
+    view = IndicatorState.from_dict(state.to_dict())
+    view.update(bars[-1:])
+    return view
+
+
+def state_key(symbol: str, minutes: int) -> str:
+    """State-file key: the symbol for minute bars, SYMBOL@<n>m for coarser ones."""
+    return symbol if minutes == 1 else f"{symbol}@{minutes}m"
+
+
+def evaluate_symbol(states: dict[str, IndicatorState], symbol: str, bars: Bars,
+                    cfg: dict, now: datetime | None = None) -> tuple[str | None, dict]:
+    """
+    advance + evaluate on every configured timeframe, reading each indicator
+    from its own timeframe's state. `states` is updated in place.
+    """
+    tf     = timeframes(cfg)
+    values = {}
+    for minutes in sorted(set(tf.values())):
+        key   = state_key(symbol, minutes)
+        state = states.get(key)
+        frame = bars if minutes == 1 else None        # advance() skips what it has seen
+        if (frame is None and state is not None and state.matches(cfg)
+                and state.last_ts is not None and bars.ts[0] <= state.last_ts):
+            frame = resample(bars, minutes, since=state.last_ts)
+        if frame is None or len(frame) < 2:
+            frame = resample(bars, minutes)
+
+        states[key]     = advance(state, frame, cfg)
+        values[minutes] = _view(states[key], frame).values(cfg, now)
+    return score(pick(values, cfg), cfg)
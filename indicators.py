@@ -0,0 +1,476 @@
+"""
+indicators.py — Indicator registry and shared computation graph
+================================================================
+Each indicator is a registered class declaring the bar columns it reads,
+the history it needs (lookback), how it votes and the letter that tags it
+in signal order ids (execution.signal_order_id). config.json "indicators"
+enables and weights them, e.g. {"sma": 1, "rsi": 1, "macd": 2, "atr": 1};
+a signal fires when the weighted bullish (or bearish) votes reach
+signal_threshold. Without "indicators" the classic four vote with weight 1.
+
+Indicators don't read the close series themselves: they ask a Graph for
+nodes ("sma" of "close" over 21 bars, "ema" of "macd_line"...). Nodes are
+memoized per (timeframe, node, params), so an intermediate shared by
+several indicators — the same SMA, EMA, bar-to-bar diff or true range — is
+computed once per symbol per cycle. Node arrays run along axis 0 (time),
+so the same graph serves one symbol (1-D columns, utils.generate_signals)
+or the whole universe (2-D time × symbol matrices, vectorized.py).
+
+The streaming and backtest engines keep their own forms of the classic
+four (NATIVE). Any other indicator declares a finite window — the trailing
+bars that fully determine its latest value — and those engines evaluate it
+on a Graph over just that window.
+"""
+
+import math
+import numpy as np
+from abc import ABC, abstractmethod
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+MACD_FAST, MACD_SLOW, MACD_SIGNAL = 12, 26, 9
+MACD_WARMUP = 4          # EMA spans of history before MACD values are trusted
+TAIL        = 3          # newest rows any vote reads (the SMA cross looks back 3 bars)
+
+NATIVE  = ("sma", "rsi", "macd", "vwap")
+DEFAULT = {name: 1 for name in NATIVE}
+
+# ─── GRAPH ───────────────────────────────────────────────────────────────────
+
+NODES = {}
+
+
+def node(fn):
+    NODES[fn.__name__.lstrip("_")] = fn
+    return fn
+
+
+class Graph:
+    """
+    Memoized indicator intermediates. `frames` is {minutes: columns} and
+    `today` the same for today's session bars; columns are anything indexed
+    by column name (bars.Bars, or a dict of arrays). Rolling nodes only fill
+    the newest `rows` rows (all of them when None).
+    """
+
+    def __init__(self, frames: dict, today: dict | None = None, rows: int | None = TAIL):
+        self.frames = frames
+        self.today  = today or {}
+        self.rows   = rows
+        self.cache  = {}
+
+    def get(self, minutes: int, name: str, *args):
+        key = (minutes, name, *args)
+        if key not in self.cache:
+            self.cache[key] = NODES[name](self, minutes, *args)
+        return self.cache[key]
+
+    def src(self, minutes: int, spec) -> np.ndarray:
+        """A node given as a name ("close") or a (name, *args) tuple."""
+        return self.get(minutes, spec) if isinstance(spec, str) else self.get(minutes, *spec)
+
+
+for _column in ("open", "high", "low", "close", "volume"):
+    NODES[_column] = lambda g, minutes, c=_column: np.asarray(g.frames[minutes][c], dtype=np.float64)
+
+
+@node
+def _diff(g: Graph, minutes: int, src="close") -> np.ndarray:
+    x   = g.src(minutes, src)
+    out = np.full(x.shape, np.nan)
+    out[1:] = x[1:] - x[:-1]
+    return out
+
+
+@node
+def _gain(g: Graph, minutes: int, src="close") -> np.ndarray:
+    return np.maximum(g.get(minutes, "diff", src), 0.0)
+
+
+@node
+def _loss(g: Graph, minutes: int, src="close") -> np.ndarray:
+    return np.maximum(-g.get(minutes, "diff", src), 0.0)
+
+
+@node
+def _sma(g: Graph, minutes: int, src, period: int) -> np.ndarray:
+    return _rolling(g.src(minutes, src), period, g.rows, _mean)
+
+
+@node
+def _std(g: Graph, minutes: int, src, period: int) -> np.ndarray:
+    """Rolling population standard deviation."""
+    return _rolling(g.src(minutes, src), period, g.rows, np.std)
+
+
+@node
+def _ema(g: Graph, minutes: int, src, span: int) -> np.ndarray:
+    """EWM with adjust=False, seeded at each column's first value."""
+    x = g.src(minutes, src)
+    if x.ndim == 1:
+        return pd.Series(x, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+    a   = 2 / (span + 1)
+    out = np.empty_like(x)
+    ema = np.full(x.shape[1:], np.nan)
+    for i, row in enumerate(x):
+        ema = out[i] = np.where(np.isnan(ema), row, a * row + (1 - a) * ema)
+    return out
+
+
+@node
+def _macd_line(g: Graph, minutes: int) -> np.ndarray:
+    return g.get(minutes, "ema", "close", MACD_FAST) - g.get(minutes, "ema", "close", MACD_SLOW)
+
+
+@node
+def _true_range(g: Graph, minutes: int) -> np.ndarray:
+    """max(high - low, |high - prev close|, |low - prev close|); NaN on the first bar."""
+    high, low, close = (g.get(minutes, c) for c in ("high", "low", "close"))
+    out = np.full(close.shape, np.nan)
+    prev    = close[:-1]
+    out[1:] = np.maximum(high[1:] - low[1:],
+                         np.maximum(np.abs(high[1:] - prev), np.abs(low[1:] - prev)))
+    return out
+
+
+@node
+def _vwap(g: Graph, minutes: int) -> tuple:
+    """(VWAP, has_today) over today's bars; NaN rows (matrix padding) don't count."""
+    today = g.today.get(minutes)
+    if today is None:
+        return math.nan, False
+    high, low, close, volume = (np.asarray(today[c], dtype=np.float64)
+                                for c in ("high", "low", "close", "volume"))
+    live   = ~np.isnan(close)
+    tp_vol = np.where(live, (high + low + close) / 3 * volume, 0.0).sum(axis=0)
+    vol    = np.where(live, volume, 0.0).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return tp_vol / np.where(vol == 0, np.nan, vol), live.any(axis=0)
+
+
+def _mean(windows: np.ndarray, axis: int) -> np.ndarray:
+    return np.add.reduce(windows, axis=axis) / windows.shape[axis]   # np.mean without its overhead
+
+
+def _rolling(x: np.ndarray, period: int, rows: int | None, reduce) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    n   = x.shape[0]
+    k   = n - period + 1                          # complete windows
+    if k <= 0:
+        return out
+    if rows and rows < k:
+        for end in range(n - rows + 1, n + 1):          # a few windows: plain slices are cheaper
+            out[end - 1] = reduce(x[end - period:end], axis=0)
+        return out
+    out[n - k:] = reduce(sliding_window_view(x[n - k - period + 1:], period, axis=0), axis=-1)
+    return out
+
+
+def last(x: np.ndarray, back: int = 0):
+    """The value `back` rows before the newest (NaN if there is no such row)."""
+    if x.shape[0] <= back:
+        return np.full(x.shape[1:], np.nan) if x.ndim > 1 else math.nan
+    return x[-1 - back]
+
+# ─── REGISTRY ────────────────────────────────────────────────────────────────
+
+REGISTRY = {}
+
+
+def register(cls):
+    """
+    Class decorator; instantiating here makes a missing method fail at
+    import, as does a tag that isn't one letter or is already taken.
+    """
+    ind  = cls()
+    tags = {i.tag: n for n, i in REGISTRY.items() if n != cls.name}
+    if len(cls.tag) != 1 or not cls.tag.islower():
+        raise ValueError(f"{cls.__name__}: tag must be one lowercase letter, got {cls.tag!r}")
+    if cls.tag in tags:
+        raise ValueError(f"{cls.__name__}: tag {cls.tag!r} is already {tags[cls.tag]}'s")
+    REGISTRY[cls.name] = ind
+    return cls
+
+
+class Indicator(ABC):
+    """
+    One vote. compute() reads Graph nodes on the indicator's timeframe and
+    returns its values at the newest bar; vote() turns them into (bull,
+    bear) with NumPy operators, so values may be scalars or per-symbol /
+    per-bar arrays.
+    """
+    name      = ""
+    tag       = ""            # one letter in signal order ids (execution.signal_order_id)
+    inputs    = ("close",)    # bar columns read
+    today     = False         # also reads today's session bars (Graph.today)
+    stat_keys = ()            # keys stats() returns
+
+    @abstractmethod
+    def lookback(self, cfg: dict) -> int:
+        """Bars of its own timeframe needed before its values are trusted."""
+        ...
+
+    def window(self, cfg: dict) -> int | None:
+        """Trailing bars that fully determine the latest value; None if unbounded."""
+        return None
+
+    @abstractmethod
+    def compute(self, g: Graph, minutes: int, cfg: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def vote(self, v: dict, cfg: dict) -> tuple:
+        ...
+
+    @abstractmethod
+    def stats(self, v: dict) -> dict:
+        ...
+
+    @abstractmethod
+    def describe(self, stats: dict, cfg: dict) -> str:
+        ...
+
+
+@register
+class SMA(Indicator):
+    """Fast SMA above the slow one, or crossed above it within the last 3 bars."""
+    name      = "sma"
+    tag       = "s"
+    stat_keys = ("sma_f", "sma_s")
+
+    def lookback(self, cfg):
+        return cfg["sma_slow"] + 10
+
+    def window(self, cfg):
+        return max(cfg["sma_fast"], cfg["sma_slow"]) + TAIL - 1
+
+    def compute(self, g, minutes, cfg):
+        return {"fast": g.get(minutes, "sma", "close", cfg["sma_fast"])[-TAIL:],
+                "slow": g.get(minutes, "sma", "close", cfg["sma_slow"])[-TAIL:]}
+
+    def vote(self, v, cfg):
+        f, s = np.asarray(v["fast"]), np.asarray(v["slow"])
+        bull_cross = ((f[1:] > s[1:]) & (f[:-1] <= s[:-1])).any(axis=0)
+        bear_cross = ((f[1:] < s[1:]) & (f[:-1] >= s[:-1])).any(axis=0)
+        return (f[-1] > s[-1]) | bull_cross, (f[-1] < s[-1]) | bear_cross
+
+    def stats(self, v):
+        return {"sma_f": np.asarray(v["fast"])[-1], "sma_s": np.asarray(v["slow"])[-1]}
+
+    def describe(self, stats, cfg):
+        return f"SMA({cfg['sma_fast']}/{cfg['sma_slow']}): {stats['sma_f']:.2f}/{stats['sma_s']:.2f}"
+
+
+@register
+class RSI(Indicator):
+    """Bullish in the healthy momentum zone, bearish once elevated."""
+    name      = "rsi"
+    tag       = "r"
+    stat_keys = ("rsi",)
+
+    def lookback(self, cfg):
+        return cfg.get("rsi_period", 10) + 1
+
+    def window(self, cfg):
+        return cfg.get("rsi_period", 10) + 1
+
+    def compute(self, g, minutes, cfg):
+        period = cfg.get("rsi_period", 10)
+        gain   = last(g.get(minutes, "sma", ("gain", "close"), period))
+        loss   = last(g.get(minutes, "sma", ("loss", "close"), period))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {"rsi": 100 - (100 / (1 + gain / np.where(loss == 0, np.nan, loss)))}
+
+    def vote(self, v, cfg):
+        rsi = v["rsi"]
+        return ((rsi > cfg.get("rsi_buy_min", 38)) & (rsi < cfg.get("rsi_overbought", 68)),
+                rsi > cfg.get("rsi_sell_min", 58))
+
+    def stats(self, v):
+        return {"rsi": v["rsi"]}
+
+    def describe(self, stats, cfg):
+        return f"RSI: {stats['rsi']:.1f}"
+
+
+@register
+class MACD(Indicator):
+    """Histogram positive and expanding (bull) / negative and expanding (bear)."""
+    name      = "macd"
+    tag       = "m"
+    stat_keys = ("macd_hist",)
+
+    def lookback(self, cfg):
+        return MACD_WARMUP * (MACD_SLOW + MACD_SIGNAL)
+
+    def compute(self, g, minutes, cfg):
+        line = g.get(minutes, "macd_line")
+        hist = line - g.get(minutes, "ema", "macd_line", MACD_SIGNAL)
+        prev = last(hist, 1)
+        return {"hist": last(hist), "prev": np.where(np.isnan(prev), 0.0, prev)}
+
+    def vote(self, v, cfg):
+        hist, prev = v["hist"], v["prev"]
+        return (hist > 0) & (hist > prev), (hist < 0) & (hist < prev)
+
+    def stats(self, v):
+        return {"macd_hist": v["hist"]}
+
+    def describe(self, stats, cfg):
+        return f"MACD hist: {stats['macd_hist']:+.3f}"
+
+
+@register
+class VWAP(Indicator):
+    """Price above / below today's VWAP; neutral before today's first bar."""
+    name      = "vwap"
+    tag       = "v"
+    inputs    = ("high", "low", "close", "volume")
+    today     = True
+    stat_keys = ("vwap",)
+
+    def lookback(self, cfg):
+        return 0                                  # today's bars are always fetched
+
+    def compute(self, g, minutes, cfg):
+        vwap, has_today = g.get(minutes, "vwap")
+        return {"price": last(g.get(minutes, "close")), "vwap": vwap, "has_today": has_today}
+
+    def vote(self, v, cfg):
+        price, vwap, has = v["price"], v["vwap"], v["has_today"]
+        return has & (price > vwap), has & (price < vwap)
+
+    def stats(self, v):
+        return {"vwap": np.where(v["has_today"], v["vwap"], 0.0)}
+
+    def describe(self, stats, cfg):
+        return f"VWAP: {stats['vwap']:.2f}"
+
+
+@register
+class ATR(Indicator):
+    """Breakout: the last bar moved more than atr_mult × ATR up (bull) or down (bear)."""
+    name      = "atr"
+    tag       = "a"
+    inputs    = ("high", "low", "close")
+    stat_keys = ("atr",)
+
+    def lookback(self, cfg):
+        return cfg.get("atr_period", 14) + 1
+
+    def window(self, cfg):
+        return cfg.get("atr_period", 14) + 1
+
+    def compute(self, g, minutes, cfg):
+        return {"move": last(g.get(minutes, "diff", "close")),
+                "atr":  last(g.get(minutes, "sma", "true_range", cfg.get("atr_period", 14)))}
+
+    def vote(self, v, cfg):
+        band = cfg.get("atr_mult", 0.5) * v["atr"]
+        return v["move"] > band, v["move"] < -band
+
+    def stats(self, v):
+        return {"atr": v["atr"]}
+
+    def describe(self, stats, cfg):
+        return f"ATR: {stats['atr']:.3f}"
+
+
+@register
+class Bollinger(Indicator):
+    """Price in the upper half of the bands (bull) or the lower half (bear); outside is neutral."""
+    name      = "bollinger"
+    tag       = "b"
+    stat_keys = ("bb_upper", "bb_lower")
+
+    def lookback(self, cfg):
+        return cfg.get("bb_period", 20)
+
+    def window(self, cfg):
+        return cfg.get("bb_period", 20)
+
+    def compute(self, g, minutes, cfg):
+        period = cfg.get("bb_period", 20)
+        mid    = last(g.get(minutes, "sma", "close", period))
+        width  = cfg.get("bb_std", 2.0) * last(g.get(minutes, "std", "close", period))
+        return {"price": last(g.get(minutes, "close")), "mid": mid,
+                "upper": mid + width, "lower": mid - width}
+
+    def vote(self, v, cfg):
+        price, mid = v["price"], v["mid"]
+        return (price > mid) & (price < v["upper"]), (price < mid) & (price > v["lower"])
+
+    def stats(self, v):
+        return {"bb_upper": v["upper"], "bb_lower": v["lower"]}
+
+    def describe(self, stats, cfg):
+        return f"BB: {stats['bb_lower']:.2f}–{stats['bb_upper']:.2f}"
+
+# ─── CONFIG ──────────────────────────────────────────────────────────────────
+
+def weights(cfg: dict) -> dict[str, float]:
+    """{indicator: weight} for the enabled indicators (weight 0 disables), in config order."""
+    raw = cfg.get("indicators") or DEFAULT
+    for name in raw:
+        if name not in REGISTRY:
+            raise ValueError(f"unknown indicator {name!r} in config (known: {', '.join(REGISTRY)})")
+    return {name: w for name, w in raw.items() if w}
+
+
+def windowed(cfg: dict) -> dict[str, int]:
+    """{indicator: window} for enabled indicators an engine must run on a trailing window."""
+    out = {}
+    for name in weights(cfg):
+        if name in NATIVE:
+            continue
+        window = REGISTRY[name].window(cfg)
+        if window is None:
+            raise ValueError(f"indicator {name!r} has no finite window")
+        out[name] = window
+    return out
+
+
+def lookback(cfg: dict, tf: dict[str, int]) -> int:
+    """Minute bars covering every enabled indicator's lookback on its own timeframe."""
+    return max([REGISTRY[n].lookback(cfg) * tf[n] for n in weights(cfg)], default=0)
+
+# ─── EVALUATION ──────────────────────────────────────────────────────────────
+
+def compute(g: Graph, tf: dict[str, int], cfg: dict, names=None) -> dict[str, dict]:
+    """{indicator: values} for `names` (default: every enabled indicator)."""
+    return {n: REGISTRY[n].compute(g, tf[n], cfg) for n in (names or weights(cfg))}
+
+
+def vote(values: dict[str, dict], cfg: dict) -> dict:
+    """
+    The weighted vote over arrays (or scalars): "signal" is +1 buy, -1 sell,
+    0 none, plus buy_conf / sell_conf and <indicator>_bull.
+    """
+    buy = sell = 0
+    bulls = {}
+    for name, w in weights(cfg).items():
+        bull, bear = REGISTRY[name].vote(values[name], cfg)
+        buy  = buy + w * bull
+        sell = sell + w * bear
+        bulls[f"{name}_bull"] = bull
+
+    threshold = cfg.get("signal_threshold", 2)
+    signal    = np.where(buy >= threshold, 1, np.where(sell >= threshold, -1, 0))
+    return {"signal": signal, "buy_conf": buy, "sell_conf": sell, **bulls}
+
+
+def score(values: dict[str, dict], cfg: dict) -> tuple[str | None, dict]:
+    """(signal, stats) for one symbol from the enabled indicators' values, with plain Python values."""
+    votes = vote(values, cfg)
+    stats = {}
+    for name in values:
+        stats.update(REGISTRY[name].stats(values[name]))
+    stats.update({k: v for k, v in votes.items() if k != "signal"})
+    stats  = {k: v.item() if hasattr(v, "item") else v for k, v in stats.items()}
+    signal = {1: "buy", -1: "sell"}.get(int(votes["signal"]))
+    return signal, stats
+
+
+def describe(stats: dict, cfg: dict) -> str:
+    """One log line of the enabled indicators' stats."""
+    return " | ".join(REGISTRY[name].describe(stats, cfg) for name in weights(cfg))
@@ -0,0 +1,156 @@
+"""
+ledger.py — Append-only fill ledger per account
+================================================
+Closed orders are streamed from the API page by page (oldest first, 500 per
+request) since a stored watermark, and every order with a fill is appended
+to <ledger_dir>/<account>.jsonl. Later runs only pull orders newer than the
+watermark, so reports and rollups read local history instead of refetching it.
+
+The watermark never moves past the oldest order that is still open: an
+order submitted before it can fill later and must be picked up by the next
+sync. Fills are de-duplicated by order id, so re-reading a page is harmless.
+"""
+
+import os
+import re
+import json
+import pandas as pd
+from datetime import datetime
+from alpaca.trading.requests import GetOrdersRequest
+from alpaca.trading.enums import QueryOrderStatus
+import tracing
+
+PAGE_SIZE = 500                  # API maximum
+FIELDS    = ["id", "client_order_id", "symbol", "side", "qty", "price",
+             "submitted_at", "filled_at"]
+
+# ─── ORDER STREAM ────────────────────────────────────────────────────────────
+
+def iter_orders(client, status: QueryOrderStatus, after: datetime | None = None,
+                page_size: int = PAGE_SIZE):
+    """
+    Yields every order with `status` submitted after `after`, oldest first,
+    paging by submitted_at. Orders sharing the boundary timestamp are
+    re-requested and skipped by id.
+    """
+    seen = set()
+    while True:
+        req = GetOrdersRequest(status=status, after=after, direction="asc", limit=page_size)
+        with tracing.api("get_orders", status=status.value) as attrs:
+            page = client.get_orders(req)
+            attrs["rows"] = len(page)
+
+        fresh = [o for o in page if str(o.id) not in seen]
+        for o in fresh:
+            seen.add(str(o.id))
+            yield o
+        if len(page) < page_size:
+            return
+        if not fresh:
+            print(f"  ⚠️  More than {page_size} orders share {after}; order history may be incomplete.")
+            return
+        # Step back a microsecond so orders at the boundary aren't lost
+        after = pd.Timestamp(fresh[-1].submitted_at) - pd.Timedelta(microseconds=1)
+
+
+def _fill_record(o) -> dict | None:
+    qty = float(o.filled_qty or 0)
+    if qty <= 0 or not o.filled_avg_price:
+        return None
+    return {
+        "id":              str(o.id),
+        "client_order_id": o.client_order_id,
+        "symbol":          o.symbol,
+        "side":            o.side.value,
+        "qty":             qty,
+        "price":           float(o.filled_avg_price),
+        "submitted_at":    pd.Timestamp(o.submitted_at).isoformat(),
+        "filled_at":       pd.Timestamp(o.filled_at or o.submitted_at).isoformat(),
+    }
+
+# ─── LEDGER FILES ────────────────────────────────────────────────────────────
+
+def _paths(ledger_dir: str, account: str) -> tuple[str, str]:
+    slug = re.sub(r"[^\w.-]+", "_", account).strip("_") or "account"
+    base = os.path.join(ledger_dir, slug)
+    return f"{base}.jsonl", f"{base}.watermark.json"
+
+
+def _read_watermark(path: str) -> datetime | None:
+    try:
+        with open(path, "r") as f:
+            return pd.Timestamp(json.load(f)["watermark"]).to_pydatetime()
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write_watermark(path: str, watermark: datetime):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"watermark": watermark.isoformat()}, f)
+    os.replace(tmp, path)
+
+
+def _ledger_ids(path: str, since: datetime | None) -> set:
+    """Order ids already in the ledger (only those submitted at/after `since`)."""
+    ids = set()
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                r = json.loads(line)
+                if since is None or pd.Timestamp(r["submitted_at"]) >= since:
+                    ids.add(r["id"])
+    except OSError:
+        pass
+    return ids
+
+# ─── SYNC / LOAD ─────────────────────────────────────────────────────────────
+
+def sync_ledger(client, ledger_dir: str, account: str) -> int:
+    """Append fills from orders closed since the watermark; returns the number added."""
+    os.makedirs(ledger_dir, exist_ok=True)
+    ledger_path, mark_path = _paths(ledger_dir, account)
+    after = _read_watermark(mark_path)
+    known = _ledger_ids(ledger_path, after)
+
+    # Open orders pin the watermark: they may still fill
+    open_since = [pd.Timestamp(o.submitted_at) for o in iter_orders(client, QueryOrderStatus.OPEN)]
+
+    added, newest = 0, after
+    with open(ledger_path, "a") as f:
+        for o in iter_orders(client, QueryOrderStatus.CLOSED, after):
+            submitted = pd.Timestamp(o.submitted_at).to_pydatetime()
+            newest    = max(newest, submitted) if newest else submitted
+            record    = _fill_record(o)
+            if record is None or record["id"] in known:
+                continue
+            f.write(json.dumps(record) + "\n")
+            known.add(record["id"])
+            added += 1
+        f.flush()
+        os.fsync(f.fileno())
+
+    if newest is not None:
+        if open_since:
+            newest = min(newest, (min(open_since) - pd.Timedelta(microseconds=1)).to_pydatetime())
+        _write_watermark(mark_path, newest)
+    tracing.count("ledger_fills_added", added)
+    return added
+
+
+def load_fills(ledger_dir: str, account: str, since: datetime | None = None) -> pd.DataFrame:
+    """The account's fills (filled_at >= since), oldest first, as a DataFrame."""
+    ledger_path, _ = _paths(ledger_dir, account)
+    try:
+        df = pd.read_json(ledger_path, lines=True, dtype={"id": str, "client_order_id": str})
+    except (OSError, ValueError):
+        df = pd.DataFrame()
+    if df.empty:
+        return pd.DataFrame(columns=FIELDS)
+
+    for col in ("submitted_at", "filled_at"):
+        df[col] = pd.to_datetime(df[col], utc=True, format="ISO8601")
+    df = df.drop_duplicates("id").sort_values("filled_at", kind="stable").reset_index(drop=True)
+    if since is not None:
+        df = df[df["filled_at"] >= pd.Timestamp(since)].reset_index(drop=True)
+    return df
@@ -0,0 +1,189 @@
+"""
+optimize.py — Parallel parameter sweep over config.json strategy knobs
+=======================================================================
+Grid or random search over the signal and exit settings, each combination
+scored by a full backtest (backtest.py) on cached minute bars.
+
+  - Bars are packed once into a single shared-memory float64 block; worker
+    processes map it instead of receiving pickled DataFrames.
+  - Combinations are grouped by their signal settings (backtest.SIGNAL_KEYS):
+    each group's signals are prepared once and then simulated under every
+    stop/take-profit variant in the group.
+
+Output: a ranked results table (CSV) and the best combination merged into a
+copy of config.json.
+
+Usage:
+  python optimize.py                    # full default grid
+  python optimize.py --samples 300      # random subset of the grid
+  python optimize.py --metric return_pct --workers 8
+"""
+
+import os
+import json
+import random
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from backtest import prepare, simulate, load_history, SIGNAL_KEYS
+
+DEFAULT_GRID = {
+    "rsi_period":       [7, 10, 14],
+    "rsi_buy_min":      [30, 38, 45],
+    "rsi_overbought":   [65, 68, 75],
+    "sma_fast":         [5, 8, 12],
+    "sma_slow":         [21, 30, 50],
+    "signal_threshold": [2, 3],
+    "stop_loss_pct":    [0.02, 0.03, 0.04],
+    "take_profit_pct":  [0.04, 0.06, 0.09],
+}
+
+COLUMNS = ["timestamp", "high", "low", "close", "volume"]
+
+# ─── SEARCH SPACE ────────────────────────────────────────────────────────────
+
+def combinations(grid: dict, samples: int | None = None, seed: int = 0) -> list[dict]:
+    """All valid grid points (or a random sample of them)."""
+    keys   = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    combos = [c for c in combos if _valid(c)]
+    if samples and samples < len(combos):
+        combos = random.Random(seed).sample(combos, samples)
+    return combos
+
+
+def _valid(c: dict) -> bool:
+    return (c.get("sma_fast", 0) < c.get("sma_slow", 1)
+            and c.get("stop_loss_pct", 0) < c.get("take_profit_pct", 1)
+            and c.get("rsi_buy_min", 0) < c.get("rsi_overbought", 100))
+
+# ─── SHARED BARS ─────────────────────────────────────────────────────────────
+
+def share_bars(bars: dict[str, pd.DataFrame]) -> tuple[shared_memory.SharedMemory, tuple, list]:
+    """Pack bars into one (len(COLUMNS) × total_rows) shared block + [(symbol, offset, rows)]."""
+    layout, offset = [], 0
+    for symbol, df in bars.items():
+        layout.append((symbol, offset, len(df)))
+        offset += len(df)
+
+    shape = (len(COLUMNS), offset)
+    shm   = shared_memory.SharedMemory(create=True, size=max(8 * shape[0] * shape[1], 1))
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    for symbol, start, rows in layout:
+        df = bars[symbol]
+        block[0, start:start + rows] = df.index.as_unit("s").asi8
+        for i, col in enumerate(COLUMNS[1:], start=1):
+            block[i, start:start + rows] = df[col].to_numpy(dtype=np.float64)
+    return shm, shape, layout
+
+
+_worker = {}
+
+
+def _init_worker(name: str, shape: tuple, layout: list, base_cfg: dict):
+    shm   = shared_memory.SharedMemory(name=name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    bars  = {}
+    for symbol, start, rows in layout:
+        cols  = block[:, start:start + rows]            # views into shared memory
+        index = pd.to_datetime(cols[0].astype(np.int64), unit="s", utc=True)
+        bars[symbol] = pd.DataFrame({c: cols[i] for i, c in enumerate(COLUMNS) if i},
+                                    index=index, copy=False)
+    _worker.update(shm=shm, bars=bars, cfg=base_cfg)
+
+
+def _evaluate_group(group: list[dict]) -> list[dict]:
+    """Prepare signals once for the group's shared signal settings, simulate each variant."""
+    cfg      = {**_worker["cfg"], **group[0]}
+    prepared = prepare(_worker["bars"], cfg)
+    results  = []
+    for combo in group:
+        summary = simulate(prepared, {**_worker["cfg"], **combo})["summary"]
+        results.append({**combo, **summary})
+    return results
+
+# ─── SWEEP ───────────────────────────────────────────────────────────────────
+
+def sweep(bars: dict[str, pd.DataFrame], base_cfg: dict, combos: list[dict],
+          workers: int | None = None, metric: str = "return_pct") -> pd.DataFrame:
+    """Evaluate every combination across a process pool; returns results ranked by `metric`."""
+    groups = {}
+    for combo in combos:
+        key = tuple(combo.get(k, base_cfg.get(k)) for k in SIGNAL_KEYS)
+        groups.setdefault(key, []).append(combo)
+
+    shm, shape, layout = share_bars(bars)
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(shm.name, shape, layout, base_cfg)) as pool:
+            futures = [pool.submit(_evaluate_group, g) for g in groups.values()]
+            for done, future in enumerate(as_completed(futures), start=1):
+                results.extend(future.result())
+                print(f"  {done}/{len(futures)} signal groups, {len(results)}/{len(combos)} runs",
+                      end="\r", flush=True)
+        print()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    table = pd.DataFrame(results)
+    return table.sort_values(metric, ascending=False).reset_index(drop=True)
+
+
+def write_best(table: pd.DataFrame, base_cfg: dict, keys: list[str], path: str) -> dict:
+    """
+    Merge the top-ranked combination into a copy of config.json and write it.
+    Values are read per column (a row would upcast every knob to float64)
+    and integer knobs stay integers, as the indicator windows need.
+    """
+    best = {**base_cfg}
+    for k in keys:
+        v = table[k].iloc[0]
+        v = v.item() if hasattr(v, "item") else v
+        if isinstance(base_cfg.get(k), int) and isinstance(v, float) and v.is_integer():
+            v = int(v)
+        best[k] = v
+    with open(path, "w") as f:
+        json.dump(best, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return best
+
+# ─── ENTRY POINT ─────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parameter sweep over config.json")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--cache", default=".cache/history")
+    parser.add_argument("--grid", help="JSON file overriding DEFAULT_GRID")
+    parser.add_argument("--samples", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--metric", default="return_pct")
+    parser.add_argument("--out", default=".cache/optimize")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        cfg = json.load(f)
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid, "r") as f:
+            grid = json.load(f)
+
+    bars = load_history(cfg, args.cache)
+    if not bars:
+        print(f"❌ No bars in {args.cache}. Run `python backtest.py --days N` first.")
+        raise SystemExit(1)
+
+    combos = combinations(grid, args.samples)
+    print(f"\n🔍 Sweeping {len(combos)} combinations over {len(bars)} symbols...")
+    table = sweep(bars, cfg, combos, args.workers, args.metric)
+
+    os.makedirs(args.out, exist_ok=True)
+    table.to_csv(os.path.join(args.out, "results.csv"), index=False)
+    write_best(table, cfg, list(grid), os.path.join(args.out, "config.best.json"))
+
+    print(table.head(10).to_string(index=False))
+    print(f"\n  Ranked results and best config written to {args.out}/")
@@ -2,16 +2,32 @@
 report.py — Daily performance report via email
 ===============================================
 Runs once per day (typically at market close via GitHub Actions).
-Reads all accounts and sends a formatted summary email.
+Reads all accounts (concurrently, see accounts.py) and sends a formatted
+summary email. Fills come from the local order ledger (ledger.py), which
+only pulls orders closed since the previous report.
 """
 
 import os
+import json
 import smtplib
 from email.message import EmailMessage
 from datetime import datetime, timezone
-from alpaca.trading.client import TradingClient
-from alpaca.trading.requests import GetOrdersRequest
-from alpaca.trading.enums import QueryOrderStatus
+import pandas as pd
+from ledger import sync_ledger, load_fills
+from analytics import report_lines
+from accounts import load_accounts, run_accounts
+import clients
+
+
+# ─── CONFIG ──────────────────────────────────────────────────────────────────
+
+def load_config() -> dict:
+    """config.json if present — the report only needs the account settings."""
+    try:
+        with open("config.json", "r") as f:
+            return json.load(f)
+    except OSError:
+        return {}
 
 
 # ─── EMAIL ───────────────────────────────────────────────────────────────────
@@ -38,9 +54,11 @@ def send_email(subject: str, body: str):
 
 # ─── REPORT BUILDER ──────────────────────────────────────────────────────────
 
-def build_account_report(name: str, api_key: str, api_secret: str, base_url: str) -> str:
+def build_account_report(name: str, api_key: str, api_secret: str, base_url: str,
+                         cfg: dict | None = None) -> str:
+    cfg      = cfg or {}
     is_paper = "paper" in base_url
-    client   = TradingClient(api_key, api_secret, paper=is_paper)
+    client   = clients.trading_client(name, api_key, api_secret, base_url, cfg)
     mode     = "Paper" if is_paper else "⚠️  LIVE"
 
     lines = [f"  {'─'*30}", f"  {name} ({mode})", f"  {'─'*30}"]
@@ -91,26 +109,47 @@ def build_account_report(name: str, api_key: str, api_secret: str, base_url: str
     except Exception as e:
         lines.append(f"  Positions error: {e}")
 
-    # ── Today's filled orders ────────────────────────────────────────────────
+    # ── Fills (from the local ledger, synced incrementally) ─────────────────
     lines.append("")
+    ledger_dir = cfg.get("ledger_dir", ".cache/ledger")
     try:
-        today_str = datetime.now(timezone.utc).strftime("%Y-%m-%dT00:00:00Z")
-        req = GetOrdersRequest(status=QueryOrderStatus.CLOSED, after=today_str, limit=50)
-        orders = client.get_orders(req)
-        filled = [o for o in orders if o.status.value == "filled"]
+        added = sync_ledger(client, ledger_dir, name)
+        print(f"  {name}: {added} new fills recorded")
+    except Exception as e:
+        lines.append(f"  ⚠️  Order sync failed ({e}) — fills below may be incomplete")
 
-        if filled:
+    try:
+        now    = clients.market_time(cfg) or datetime.now(timezone.utc)
+        today  = pd.Timestamp(now).normalize()
+        fills  = load_fills(ledger_dir, name)
+        filled = fills[fills["filled_at"] >= today]
+
+        if len(filled):
             lines.append(f"  Today's Fills ({len(filled)}):")
-            for o in filled:
-                side  = o.side.value.upper()
-                sym   = o.symbol
-                qty   = int(float(o.filled_qty)) if o.filled_qty else 0
-                price = float(o.filled_avg_price) if o.filled_avg_price else 0
-                ts    = o.filled_at.strftime("%H:%M") if o.filled_at else "?"
+            for o in filled.itertuples(index=False):
+                side  = o.side.upper()
                 icon  = "↑" if side == "BUY" else "↓"
-                lines.append(f"  {icon} {ts}  {side:<4} {qty:>4}x {sym:<6} @ ${price:.2f}")
+                lines.append(f"  {icon} {o.filled_at:%H:%M}  {side:<4} {int(o.qty):>4}x "
+                             f"{o.symbol:<6} @ ${o.price:.2f}")
         else:
             lines.append("  Today's Fills: none")
+
+        # ── Rollups ─────────────────────────────────────────────────────────
+        lines.append("")
+        for label, start in (("Today", today),
+                             ("Week",  today - pd.Timedelta(days=today.weekday())),
+                             ("Month", today.replace(day=1))):
+            window   = fills[fills["filled_at"] >= start]
+            notional = window["qty"] * window["price"]
+            bought   = notional[window["side"] == "buy"].sum()
+            sold     = notional[window["side"] == "sell"].sum()
+            lines.append(f"  {label + ':':<7} {len(window):>4} fills  "
+                         f"bought ${bought:>11,.2f}  sold ${sold:>11,.2f}")
+
+        # ── Realized performance (FIFO over the whole ledger) ──────────────
+        lines.append("")
+        lines += report_lines(fills, since=today, label="Today")
+        lines += report_lines(fills, label="All time")
     except Exception as e:
         lines.append(f"  Orders error: {e}")
 
@@ -126,18 +165,13 @@ def get_report() -> str:
         "=" * 45,
         "",
     ]
-    sections = []
-
-    for i in [1, 2]:
-        key    = os.getenv(f"APCA_API_KEY_{i}")
-        secret = os.getenv(f"APCA_API_SECRET_{i}")
-        url    = os.getenv(f"APCA_BASE_URL_{i}", "https://paper-api.alpaca.markets")
-
-        if not key or not secret:
-            continue
-
-        section = build_account_report(f"Account {i}", key, secret, url)
-        sections.append(section)
+    cfg      = load_config()
+    accounts = load_accounts(cfg)
+    if not accounts and clients.backend(cfg) == "sim":
+        accounts = [("Account 1", None, None, "paper")]
+    sections = run_accounts(accounts, lambda *a: build_account_report(*a, cfg),
+                            cfg.get("account_workers", 4))
+    sections = [s for s in sections if s]
 
     footer = [
         "",
@@ -0,0 +1,75 @@
+"""
+scan.py — Scan order and time budget for the signal loop
+=========================================================
+Not every symbol on the watchlist matters equally in a cycle. Symbols the
+account holds, or has an order working on, come first: their sells and
+cancels are what protect the book, and they're always scanned. Every other
+symbol can only ever produce a buy, so once the account's position slots
+are spoken for there is nothing left to gain from computing its signals.
+
+run_signals therefore scans the held symbols (watchlist order), then the
+candidates SCAN_CHUNK at a time, best pre-filter score first, and stops
+as soon as:
+  - the buys it has collected fill the slots still free, or
+  - the cycle's scan_budget_sec (config.json, counted from process start)
+    is spent — the rest of the watchlist waits for the next cycle
+
+The pre-filter reads bars that are already fetched: the close's move over
+the last sma_fast minute bars. The SMA, MACD and VWAP votes all lean on
+recent upward momentum, so the likeliest buys get looked at first. The
+ranking is account-independent — computed once per run and kept in the
+checkpoint with the snapshot — and signals are only computed for the
+symbols actually scanned (see bot.get_market_snapshot).
+"""
+
+import time
+import math
+
+SCAN_CHUNK = 20          # candidates whose signals are computed per step
+
+# ─── BUDGET ──────────────────────────────────────────────────────────────────
+
+class Budget:
+    """Wall-clock allowance for a cycle; `seconds` None / 0 = unlimited."""
+
+    def __init__(self, seconds: float | None, started: float | None = None):
+        self.seconds = seconds or None
+        self.started = time.perf_counter() if started is None else started
+
+    def spent(self) -> float:
+        return time.perf_counter() - self.started
+
+    def left(self) -> float:
+        return math.inf if self.seconds is None else self.seconds - self.spent()
+
+    def expired(self) -> bool:
+        return self.left() <= 0
+
+# ─── ORDER ───────────────────────────────────────────────────────────────────
+
+def momentum(bars, n: int) -> float:
+    """Close-to-close move over the last `n` bars; -inf if there aren't enough."""
+    if bars is None or len(bars) <= n:
+        return -math.inf
+    close = bars["close"]
+    first = float(close[-1 - n])
+    return float(close[-1]) / first - 1 if first > 0 else -math.inf
+
+
+def rank(symbols: list[str], all_bars: dict, cfg: dict) -> list[str]:
+    """The watchlist by pre-filter score, best first; ties keep watchlist order."""
+    n      = cfg["sma_fast"]
+    scores = {s: momentum(all_bars.get(s), n) for s in symbols}
+    return sorted(symbols, key=lambda s: -scores[s])
+
+
+def scan_order(symbols: list[str], held: set,
+               ranked: list[str]) -> tuple[list[str], list[str]]:
+    """
+    (held symbols in watchlist order, the others in `ranked` order). Symbols
+    `ranked` doesn't know (a watchlist edit mid-cycle) go last.
+    """
+    listed = set(symbols)
+    ranked = [s for s in ranked if s in listed]
+    rest   = ranked + [s for s in symbols if s not in set(ranked)]
+    return [s for s in symbols if s in held], [s for s in rest if s not in held]
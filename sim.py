@@ -0,0 +1,548 @@
+"""
+sim.py — In-process simulated broker
+=====================================
+Stand-ins for TradingClient and StockHistoricalDataClient backed by replayed
+minute bars, so bot.py, report.py and stream.py run without credentials or
+network. Selected with BOT_BACKEND=sim or "backend": "sim" in config.json
+(see clients.py).
+
+  SimMarket     — the replayed bars and the simulated clock, shared by all accounts
+  SimBroker     — one account: cash, positions, orders (TradingClient methods)
+  SimDataClient — get_stock_bars over bars that have completed by the clock
+
+Orders fill against bars that start at or after submission: market orders
+at the next bar's open, limit orders when a bar trades through the limit,
+stops when a bar trades through the stop. Bracket orders hold their
+take-profit / stop legs until the entry fills; once one exit of a bracket
+or OCO fills, the other is cancelled. Orders can be cancelled and replaced.
+DAY orders expire at the session rollover, GTC orders stay. Every API call can be given a
+latency and counts against a per-client requests/minute limit; excess
+calls fail with status 429 like the real API.
+
+Load test (many accounts and symbols, whole trade_account cycle):
+  python sim.py --accounts 20 --symbols 300 --cycles 12
+"""
+
+import time
+import uuid
+import threading
+import numpy as np
+import pandas as pd
+from types import SimpleNamespace
+from collections import deque
+from datetime import datetime
+from alpaca.trading.enums import OrderSide, OrderType, OrderStatus, OrderClass, TimeInForce
+
+SESSION_OPEN  = pd.Timedelta(hours=13, minutes=30)
+SESSION_CLOSE = pd.Timedelta(hours=20)
+OPEN_STATUS   = {OrderStatus.NEW, OrderStatus.ACCEPTED}
+LIVE_STATUS   = OPEN_STATUS | {OrderStatus.HELD}      # held: bracket legs awaiting the entry
+
+
+class SimAPIError(Exception):
+    """Raised like alpaca's APIError: carries the HTTP status_code."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(message)
+        self.status_code = status_code
+
+# ─── MARKET ──────────────────────────────────────────────────────────────────
+
+class SimMarket:
+    """Replayed bars + the simulated clock. advance() moves time and matches orders."""
+
+    def __init__(self, bars: dict[str, pd.DataFrame], start: datetime | None = None,
+                 equity: float = 100_000.0, latency_ms: float = 0.0,
+                 requests_per_minute: float | None = 200):
+        self.bars     = bars
+        self.equity   = equity
+        self.latency  = latency_ms / 1000
+        self.rpm      = requests_per_minute
+        self.brokers  = {}
+        self.lock     = threading.Lock()
+        self.arrays   = {
+            s: {"ts": df.index.as_unit("ns").asi8,
+                **{c: df[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close")}}
+            for s, df in bars.items()
+        }
+        last     = max(df.index[-1] for df in bars.values())
+        self.now = _utc(start) if start is not None else last
+
+    @classmethod
+    def from_config(cls, bars: dict[str, pd.DataFrame], cfg: dict) -> "SimMarket":
+        return cls(bars, start=cfg.get("sim_start"), equity=cfg.get("sim_equity", 100_000.0),
+                   latency_ms=cfg.get("sim_latency_ms", 0.0),
+                   requests_per_minute=cfg.get("sim_requests_per_minute", 200))
+
+    # ── Clients ─────────────────────────────────────────────────────────────
+    def broker(self, name: str) -> "SimBroker":
+        with self.lock:
+            if name not in self.brokers:
+                self.brokers[name] = SimBroker(self, name)
+            return self.brokers[name]
+
+    def data_client(self) -> "SimDataClient":
+        return SimDataClient(self)
+
+    # ── Clock ───────────────────────────────────────────────────────────────
+    def is_open(self) -> bool:
+        since_midnight = self.now - self.now.normalize()
+        return self.now.weekday() < 5 and SESSION_OPEN <= since_midnight < SESSION_CLOSE
+
+    def price(self, symbol: str) -> float | None:
+        """Close of the newest bar completed by now."""
+        a = self.arrays.get(symbol)
+        if a is None:
+            return None
+        i = np.searchsorted(a["ts"], self.now.value, side="left") - 1
+        return float(a["close"][i]) if i >= 0 else None
+
+    def advance(self, to: datetime):
+        """Move the clock to `to`: fill orders on the bars in between, roll sessions over."""
+        to = _utc(to)
+        for broker in list(self.brokers.values()):
+            broker._match(self.now, to)
+        rollover = to.normalize() != self.now.normalize()
+        if rollover:
+            for broker in list(self.brokers.values()):
+                broker._close_session()
+        self.now = to
+
+
+class _Throttle:
+    """Latency + sliding one-minute request window for one simulated client."""
+
+    def __init__(self, market: SimMarket):
+        self.market = market
+        self.calls  = deque()
+        self.lock   = threading.Lock()
+
+    def __call__(self):
+        if self.market.latency:
+            time.sleep(self.market.latency)
+        if not self.market.rpm:
+            return
+        with self.lock:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] >= 60:
+                self.calls.popleft()
+            if len(self.calls) >= self.market.rpm:
+                raise SimAPIError(429, "rate limit exceeded")
+            self.calls.append(now)
+
+# ─── BROKER ──────────────────────────────────────────────────────────────────
+
+class SimBroker:
+    """One simulated account, answering the TradingClient calls the bot makes."""
+
+    def __init__(self, market: SimMarket, name: str):
+        self.market      = market
+        self.name        = name
+        self.cash        = market.equity
+        self.last_equity = market.equity
+        self.positions   = {}                # symbol -> [qty, avg_cost]
+        self.orders      = []
+        self.by_id       = {}
+        self.by_client   = {}
+        self.lock        = threading.RLock()
+        self.throttle    = _Throttle(market)
+        self.seq, self.seq_at = 0, None
+
+    # ── Account ─────────────────────────────────────────────────────────────
+    def get_clock(self):
+        self.throttle()
+        m     = self.market
+        day   = m.now.normalize()
+        close = day + SESSION_CLOSE
+        return SimpleNamespace(timestamp=m.now.to_pydatetime(), is_open=m.is_open(),
+                               next_open=(day + SESSION_OPEN).to_pydatetime(),
+                               next_close=close.to_pydatetime())
+
+    def get_account(self):
+        self.throttle()
+        with self.lock:
+            equity = self._equity()
+            return SimpleNamespace(equity=str(equity), last_equity=str(self.last_equity),
+                                   cash=str(self.cash), buying_power=str(self._buying_power()))
+
+    def get_all_positions(self):
+        self.throttle()
+        with self.lock:
+            out = []
+            for symbol, (qty, avg) in self.positions.items():
+                price = self.market.price(symbol) or avg
+                out.append(SimpleNamespace(
+                    symbol=symbol, qty=str(qty), avg_entry_price=str(avg),
+                    current_price=str(price), unrealized_pl=str((price - avg) * qty),
+                    unrealized_plpc=str(price / avg - 1),
+                ))
+            return out
+
+    def close_all_positions(self, cancel_orders: bool = True):
+        self.throttle()
+        with self.lock:
+            if cancel_orders:
+                for o in self.orders:
+                    if o.status in LIVE_STATUS:
+                        o.status = OrderStatus.CANCELED
+            return [self._new_order(SimpleNamespace(
+                        symbol=s, qty=q, side=OrderSide.SELL, type=OrderType.MARKET,
+                        limit_price=None, client_order_id=None))
+                    for s, (q, _) in self.positions.items()]
+
+    # ── Orders ──────────────────────────────────────────────────────────────
+    def submit_order(self, req):
+        self.throttle()
+        with self.lock:
+            if req.client_order_id and req.client_order_id in self.by_client:
+                raise SimAPIError(422, "client_order_id must be unique")
+            if req.symbol not in self.market.arrays:
+                raise SimAPIError(422, f"asset \"{req.symbol}\" not found")
+
+            qty   = int(float(req.qty))
+            price = getattr(req, "limit_price", None) or self.market.price(req.symbol) or 0.0
+            if req.side == OrderSide.BUY and qty * price > self._buying_power():
+                raise SimAPIError(403, "insufficient buying power")
+            if req.side == OrderSide.SELL and qty > self._sellable(req.symbol):
+                raise SimAPIError(403, "insufficient qty available for order")
+
+            order_class = getattr(req, "order_class", None) or OrderClass.SIMPLE
+            if order_class == OrderClass.OCO:
+                # The take-profit limit is the order itself, the stop its leg
+                order = self._new_order(req, limit_price=req.take_profit.limit_price)
+            else:
+                order = self._new_order(req)
+            if order_class in (OrderClass.BRACKET, OrderClass.OCO):
+                order.legs = self._exit_legs(order, req)
+            return order
+
+    def cancel_order_by_id(self, order_id):
+        """Cancels the order; any part of a bracket / OCO takes its open exits with it."""
+        self.throttle()
+        with self.lock:
+            o = self._order(order_id)
+            if o.status not in LIVE_STATUS:
+                raise SimAPIError(422, f"order is {o.status.value}")
+            o.status = OrderStatus.CANCELED
+            if o.order_class != OrderClass.SIMPLE:
+                for x in self._group(o):
+                    if x.side == OrderSide.SELL and x.status in LIVE_STATUS:
+                        x.status = OrderStatus.CANCELED
+
+    def replace_order_by_id(self, order_id, order_data=None):
+        """A new order with the given qty / prices in place of the old one (status "replaced")."""
+        self.throttle()
+        with self.lock:
+            old = self._order(order_id)
+            if old.status not in OPEN_STATUS:
+                raise SimAPIError(422, f"order is {old.status.value}")
+            new = SimpleNamespace(**vars(old))
+            new.id, new.replaces, new.submitted_at = uuid.uuid4().hex, old.id, self._stamp()
+            new.client_order_id = getattr(order_data, "client_order_id", None) or uuid.uuid4().hex
+            for field in ("qty", "limit_price", "stop_price", "time_in_force"):
+                value = getattr(order_data, field, None)
+                if value is not None:
+                    setattr(new, field, str(int(value)) if field == "qty" else value)
+            old.status = OrderStatus.REPLACED
+            for x in self.orders:
+                if x.legs and old in x.legs:
+                    x.legs = [new if leg is old else leg for leg in x.legs]
+            self._index(new)
+            return new
+
+    def get_orders(self, req=None):
+        self.throttle()
+        status    = getattr(getattr(req, "status", None), "value", "open")
+        after     = getattr(req, "after", None)
+        until     = getattr(req, "until", None)
+        limit     = getattr(req, "limit", None) or 50
+        ascending = getattr(getattr(req, "direction", None), "value", "desc") == "asc"
+        nested    = getattr(req, "nested", None)
+        with self.lock:
+            orders = [o for o in self.orders
+                      if (status == "all" or (status == "open") == (o.status in LIVE_STATUS))
+                      and not (nested and o.parent)]
+        if after is not None:
+            orders = [o for o in orders if o.submitted_at > _utc(after)]
+        if until is not None:
+            orders = [o for o in orders if o.submitted_at < _utc(until)]
+        orders.sort(key=lambda o: o.submitted_at, reverse=not ascending)
+        return orders[:limit]
+
+    def get_order_by_client_id(self, client_id: str):
+        self.throttle()
+        with self.lock:
+            if client_id not in self.by_client:
+                raise SimAPIError(404, "order not found")
+            return self.by_client[client_id]
+
+    # ── Internals ───────────────────────────────────────────────────────────
+    def _new_order(self, req, **fields):
+        order = SimpleNamespace(
+            id=uuid.uuid4().hex, client_order_id=req.client_order_id or uuid.uuid4().hex,
+            symbol=req.symbol, qty=str(int(float(req.qty))), side=OrderSide(req.side),
+            type=OrderType(req.type), limit_price=getattr(req, "limit_price", None),
+            stop_price=getattr(req, "stop_price", None),
+            order_class=getattr(req, "order_class", None) or OrderClass.SIMPLE,
+            time_in_force=getattr(req, "time_in_force", None) or TimeInForce.DAY,
+            status=OrderStatus.NEW, submitted_at=self._stamp(),
+            filled_qty="0", filled_avg_price=None, filled_at=None,
+            legs=None, parent=None, replaces=None,
+        )
+        vars(order).update(fields)
+        order.group = order.parent or order.id
+        self._index(order)
+        return order
+
+    def _exit_legs(self, parent, req) -> list:
+        """Stop (and, for a bracket, take-profit) sell legs; held until a bracket's entry fills."""
+        status = OrderStatus.HELD if parent.side == OrderSide.BUY else OrderStatus.NEW
+        leg    = dict(symbol=parent.symbol, qty=parent.qty, side=OrderSide.SELL,
+                      order_class=parent.order_class, time_in_force=parent.time_in_force,
+                      client_order_id=None)
+        legs   = []
+        if parent.side == OrderSide.BUY:
+            legs.append(self._new_order(SimpleNamespace(**leg, type=OrderType.LIMIT,
+                                                        limit_price=req.take_profit.limit_price),
+                                        status=status, parent=parent.id))
+        legs.append(self._new_order(SimpleNamespace(**leg, type=OrderType.STOP,
+                                                    stop_price=req.stop_loss.stop_price),
+                                    status=status, parent=parent.id))
+        return legs
+
+    def _index(self, order):
+        self.orders.append(order)
+        self.by_id[order.id] = order
+        self.by_client[order.client_order_id] = order
+
+    def _order(self, order_id):
+        order = self.by_id.get(str(order_id))
+        if order is None:
+            raise SimAPIError(404, "order not found")
+        return order
+
+    def _group(self, order) -> list:
+        """Every order of `order`'s bracket / OCO, replacements included."""
+        return [o for o in self.orders if o.group == order.group]
+
+    def _stamp(self) -> datetime:
+        """Submission time: the clock plus 1µs per order already sent this minute."""
+        self.seq = self.seq + 1 if self.seq_at == self.market.now else 0
+        self.seq_at = self.market.now
+        return (self.market.now + pd.Timedelta(microseconds=self.seq)).to_pydatetime()
+
+    def _equity(self) -> float:
+        return self.cash + sum(q * (self.market.price(s) or avg)
+                               for s, (q, avg) in self.positions.items())
+
+    def _buying_power(self) -> float:
+        reserved = sum(int(o.qty) * (o.limit_price or self.market.price(o.symbol) or 0.0)
+                       for o in self.orders
+                       if o.status in OPEN_STATUS and o.side == OrderSide.BUY)
+        return self.cash - reserved
+
+    def _sellable(self, symbol: str) -> int:
+        held    = self.positions.get(symbol, [0, 0.0])[0]
+        pending = sum(int(o.qty) for o in self.orders
+                      if o.status in OPEN_STATUS and o.side == OrderSide.SELL
+                      and o.symbol == symbol
+                      and not (o.type == OrderType.STOP and o.order_class != OrderClass.SIMPLE))
+        return held - pending
+
+    def _match(self, start: pd.Timestamp, end: pd.Timestamp):
+        """Fill open orders on bars that start in [submitted_at, end)."""
+        with self.lock:
+            for o in self.orders:
+                if o.status not in OPEN_STATUS:
+                    continue
+                a  = self.market.arrays[o.symbol]
+                lo = np.searchsorted(a["ts"], pd.Timestamp(o.submitted_at).floor("min").value,
+                                     side="left")
+                lo = max(lo, np.searchsorted(a["ts"], start.value, side="left"))
+                hi = np.searchsorted(a["ts"], end.value, side="left")
+                for i in range(lo, hi):
+                    fill = self._fill_price(o, a["open"][i], a["high"][i], a["low"][i])
+                    if fill is not None:
+                        self._fill(o, fill, pd.Timestamp(a["ts"][i], tz="UTC"))
+                        break
+
+    @staticmethod
+    def _fill_price(o, open_: float, high: float, low: float) -> float | None:
+        if o.type == OrderType.MARKET:
+            return open_
+        if o.type == OrderType.STOP:
+            if o.side == OrderSide.SELL and low <= o.stop_price:
+                return min(open_, o.stop_price)
+            if o.side == OrderSide.BUY and high >= o.stop_price:
+                return max(open_, o.stop_price)
+            return None
+        if o.side == OrderSide.BUY and low <= o.limit_price:
+            return min(open_, o.limit_price)
+        if o.side == OrderSide.SELL and high >= o.limit_price:
+            return max(open_, o.limit_price)
+        return None
+
+    def _fill(self, o, price: float, ts: pd.Timestamp):
+        qty      = int(o.qty)
+        held, avg = self.positions.get(o.symbol, [0, 0.0])
+        if o.side == OrderSide.BUY:
+            self.cash -= float(qty * price)
+            self.positions[o.symbol] = [held + qty, float((held * avg + qty * price) / (held + qty))]
+        else:
+            qty        = min(qty, held)
+            self.cash += float(qty * price)
+            if held - qty > 0:
+                self.positions[o.symbol] = [held - qty, avg]
+            else:
+                self.positions.pop(o.symbol, None)
+        o.status, o.filled_qty   = OrderStatus.FILLED, str(qty)
+        o.filled_avg_price       = str(price)
+        o.filled_at              = ts.to_pydatetime()
+
+        if o.order_class == OrderClass.SIMPLE:
+            return
+        if o.side == OrderSide.BUY:
+            # Bracket entry filled: its exits go live from the next bar
+            for leg in o.legs or []:
+                if leg.status == OrderStatus.HELD:
+                    leg.status       = OrderStatus.NEW
+                    leg.submitted_at = (ts + pd.Timedelta(minutes=1)).to_pydatetime()
+        else:
+            # One exit filled: the other is cancelled
+            for x in self._group(o):
+                if x is not o and x.side == OrderSide.SELL and x.status in LIVE_STATUS:
+                    x.status = OrderStatus.CANCELED
+
+    def _close_session(self):
+        with self.lock:
+            for o in self.orders:
+                if o.status in LIVE_STATUS and o.time_in_force == TimeInForce.DAY:
+                    o.status = OrderStatus.EXPIRED
+            self.last_equity = self._equity()
+
+# ─── DATA ────────────────────────────────────────────────────────────────────
+
+class SimDataClient:
+    """get_stock_bars over the bars completed by the simulated clock."""
+
+    def __init__(self, market: SimMarket):
+        self.market   = market
+        self.throttle = _Throttle(market)
+
+    def get_stock_bars(self, req):
+        self.throttle()
+        symbols = req.symbol_or_symbols
+        symbols = [symbols] if isinstance(symbols, str) else symbols
+        start   = _utc(req.start) if req.start else None
+        end     = self.market.now if req.end is None else min(_utc(req.end), self.market.now)
+
+        frames = {}
+        for s in symbols:
+            df = self.market.bars.get(s)
+            if df is None:
+                continue
+            df = df[df.index < end]
+            frames[s] = df[df.index >= start] if start is not None else df
+        if not frames:
+            return SimpleNamespace(df=pd.DataFrame())
+
+        df = pd.concat(frames, names=["symbol", "timestamp"])
+        if req.limit:
+            df = df.iloc[:req.limit]          # like the API: limit spans all symbols, oldest first
+        return SimpleNamespace(df=df)
+
+def _utc(ts) -> pd.Timestamp:
+    """Request timestamps arrive naive (the SDK strips tz, meaning UTC) or aware."""
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+# ─── DEFAULT MARKET ──────────────────────────────────────────────────────────
+
+_market = None
+
+
+def install(market: SimMarket):
+    """Make `market` the one clients.py hands out."""
+    global _market
+    _market = market
+
+
+def default_market(cfg: dict) -> SimMarket:
+    """The installed market, or one built from cached history (sim_bars_dir)."""
+    global _market
+    if _market is None:
+        from bar_cache import load_bars
+        cache_dir = cfg.get("sim_bars_dir", ".cache/history")
+        bars      = {s: df for s in cfg["symbols"] if (df := load_bars(cache_dir, s)) is not None}
+        if not bars:
+            raise RuntimeError(f"No bars for the simulated broker in {cache_dir} "
+                               f"(run `python backtest.py --days N` to fill it)")
+        _market = SimMarket.from_config(bars, cfg)
+    return _market
+
+# ─── LOAD TEST ───────────────────────────────────────────────────────────────
+
+if __name__ == "__main__":
+    import io
+    import json
+    import argparse
+    import contextlib
+    import sim                              # the module clients.py sees, not __main__
+    import clients
+    import tracing
+    from bot import trade_account
+    from accounts import run_accounts
+    from bench import synthetic_bars
+    from scan import Budget
+
+    parser = argparse.ArgumentParser(description="Load-test trade_account against the simulated broker")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--accounts", type=int, default=10)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--days", type=int, default=6)
+    parser.add_argument("--cycles", type=int, default=6)
+    parser.add_argument("--workers", type=int, default=4, help="accounts traded concurrently")
+    parser.add_argument("--cycle-minutes", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--rpm", type=float, default=None, help="requests/min per client (default: unlimited)")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as f:
+        cfg = clients.sim_config(json.load(f))
+
+    bars = synthetic_bars(args.symbols, args.days)
+    end  = max(df.index[-1] for df in bars.values())
+    t0   = end - pd.Timedelta(minutes=args.cycle_minutes * args.cycles)
+    cfg  = {**cfg, "backend": "sim", "symbols": list(bars), "orders_per_minute": args.rpm or 1e9}
+
+    market = sim.SimMarket(bars, start=t0, latency_ms=args.latency_ms,
+                           requests_per_minute=args.rpm)
+    sim.install(market)
+    names = [f"Account {i}" for i in range(1, args.accounts + 1)]
+
+    print(f"\n🧪 Load test: {args.accounts} accounts × {args.symbols} symbols × "
+          f"{args.cycles} cycles ({args.latency_ms:g} ms latency, {args.workers} workers)")
+    print(f"  {'cycle':<20} {'ms':>9} {'orders':>7} {'fills':>6}")
+
+    total = 0.0
+    for c in range(args.cycles):
+        orders_before = sum(len(market.broker(n).orders) for n in names)
+        shared = {"data_client": clients.data_client(None, None, cfg), "snapshot": None,
+                  "now": market.now.to_pydatetime(), "lock": threading.Lock(),
+                  "budget": Budget(cfg.get("scan_budget_sec"))}
+        start  = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            run_accounts([(n, None, None, "paper") for n in names],
+                         lambda *a: trade_account(*a, cfg, shared), args.workers)
+        elapsed = time.perf_counter() - start
+        total  += elapsed
+
+        orders = sum(len(market.broker(n).orders) for n in names) - orders_before
+        market.advance(market.now + pd.Timedelta(minutes=args.cycle_minutes))
+        fills  = sum(o.status == OrderStatus.FILLED for n in names for o in market.broker(n).orders)
+        print(f"  {market.now.strftime('%Y-%m-%d %H:%M'):<20} {elapsed*1000:>9.1f} {orders:>7} {fills:>6}")
+
+    runs = args.accounts * args.cycles
+    print(f"\n  {runs} account cycles in {total:.2f}s — {runs/total:,.1f} cycles/s, "
+          f"{total/runs*1000:.1f} ms per account cycle")
+    print(f"\n⏱  Stage summary\n{tracing.summary()}")
@@ -0,0 +1,252 @@
+"""
+stream.py — Long-running daemon mode
+=====================================
+Alternative to the */5 cron run: `python bot.py --daemon` stays up for the
+session, subscribes to streaming minute bars and, on every bar, updates the
+symbol's indicator state in memory, checks stops/take-profits on held
+positions and evaluates the signal — so exits react within a minute
+instead of up to 5 minutes plus runner startup. With bracket exits the
+broker holds the stops, and the daemon reconciles them on every refresh.
+
+Decision logic is bot.py's own: open_session (market check, circuit
+breakers), check_stops_and_targets or exits.reconcile, run_signals and the
+incremental indicator engine. Only the trigger changes.
+
+Offline, `replay()` feeds historical bars through the same engine in
+timestamp order as a stand-in for the websocket.
+"""
+
+import time
+import asyncio
+import threading
+import pandas as pd
+from datetime import datetime, timezone
+from alpaca.trading.client import TradingClient
+from alpaca.data.live import StockDataStream
+from alpaca.data.enums import DataFeed
+from bot import (open_session, get_positions, get_open_orders, check_stops_and_targets,
+                 run_signals, fetch_bars)
+from execution import OrderExecutor
+from incremental import IndicatorState
+from timeframes import timeframes, resample, pick, Resampler
+from bars import Bars
+from indicators import score
+import exits
+import clients
+
+# ─── ENGINE ──────────────────────────────────────────────────────────────────
+
+class Session:
+    """One account's trading state inside the daemon."""
+
+    def __init__(self, name: str, client: TradingClient, cfg: dict):
+        self.name      = name
+        self.client    = client
+        self.executor  = OrderExecutor(client, cfg)
+        self.equity    = 0.0
+        self.positions = {}
+        self.orders    = None        # open orders as of the last sync
+        self.exits     = None        # exit orders at the broker (bracket exits only)
+        self.active    = True
+        self.refreshed = 0.0
+
+
+class StreamEngine:
+    """
+    Per-bar evaluation shared by all accounts: indicator state (one per
+    configured timeframe) is updated once per bar, then each active account
+    applies exits and signals.
+    """
+
+    def __init__(self, cfg: dict, sessions: list[Session], history: dict[str, Bars]):
+        self.cfg         = cfg
+        self.sessions    = sessions
+        self.refresh_sec = cfg.get("daemon_refresh_sec", 60)
+        self.min_bars    = cfg["sma_slow"] + 10
+        self.tf          = timeframes(cfg)
+        self.states      = {}        # {symbol: {minutes: IndicatorState}}
+        self.resamplers  = {}        # {symbol: {minutes: Resampler}}, coarser timeframes only
+        self.last_ts     = {}        # {symbol: epoch seconds of the last minute bar}
+        for symbol, bars in history.items():
+            # Newest historical bar may still be forming — the stream resends it
+            self._seed(symbol, bars[:-1])
+
+    def _seed(self, symbol: str, bars: Bars):
+        """Fresh per-timeframe state for `symbol`, warmed up on `bars`."""
+        self.states[symbol]     = {}
+        self.resamplers[symbol] = {}
+        for minutes in set(self.tf.values()):
+            state = IndicatorState.for_config(self.cfg)
+            frame = resample(bars, minutes)
+            if minutes > 1:
+                # The last bucket stays open: its minutes go to the resampler
+                resampler = Resampler(minutes)
+                if len(frame):
+                    tail = bars.since(frame.ts[-1])
+                    for row in zip(tail.ts.tolist(), tail["high"].tolist(), tail["low"].tolist(),
+                                   tail["close"].tolist(), tail["volume"].tolist()):
+                        resampler.push(*row)
+                    frame = frame[:-1]
+                self.resamplers[symbol][minutes] = resampler
+            state.update(frame)
+            self.states[symbol][minutes] = state
+        if len(bars):
+            self.last_ts[symbol] = int(bars.ts[-1])
+
+    @property
+    def active(self) -> bool:
+        return any(s.active for s in self.sessions)
+
+    def refresh(self, session: Session, force: bool = False):
+        """Re-run the account gate (equity, circuit breakers, positions) every refresh_sec."""
+        if not force and time.monotonic() - session.refreshed < self.refresh_sec:
+            return
+        session.refreshed = time.monotonic()
+        print(f"\n  🔄 {session.name}")
+        gate = open_session(session.client, self.cfg)
+        if gate is None:
+            session.active = False
+            return
+        session.equity, session.positions = gate
+        self._sync_orders(session)
+
+    def _sync_orders(self, session: Session):
+        """Re-reads the open orders and, with bracket exits, reconciles them (bot.trade_account)."""
+        try:
+            session.orders = get_open_orders(session.client)
+            if exits.enabled(self.cfg):
+                session.exits, sold = exits.reconcile(session.executor, session.positions,
+                                                      session.orders, self.cfg)
+                if sold:
+                    session.positions = get_positions(session.client)
+        except Exception as e:
+            print(f"  ❌ Open order sync failed: {e}")
+
+    def on_bar(self, symbol: str, ts: datetime, high: float, low: float,
+               close: float, volume: float):
+        if symbol not in self.states:
+            self._seed(symbol, Bars.blank())
+        epoch = int(ts.timestamp())
+        if epoch <= self.last_ts.get(symbol, -1):
+            return
+        self.last_ts[symbol] = epoch
+        bar = (float(high), float(low), float(close), float(volume))
+
+        # Coarser timeframes: a closed bucket is committed, the open one read off a copy
+        views = {}
+        for minutes, state in self.states[symbol].items():
+            if minutes == 1:
+                state.push(epoch, *bar)
+                views[minutes] = state
+                continue
+            resampler = self.resamplers[symbol][minutes]
+            done      = resampler.push(epoch, *bar)
+            if done:
+                state.push(*done)
+            views[minutes] = IndicatorState.from_dict(state.to_dict())
+            views[minutes].push(*resampler.bucket)
+
+        snapshot = {}
+        sma, vwap = views[self.tf["sma"]], views[self.tf["vwap"]]
+        if sma.count >= self.min_bars and vwap.vwap(ts) is not None:
+            values           = {minutes: view.values(self.cfg, ts) for minutes, view in views.items()}
+            signal, stats    = score(pick(values, self.cfg), self.cfg)
+            snapshot[symbol] = {"signal": signal, "stats": stats, "price": float(close)}
+
+        for session in self.sessions:
+            if session.active:
+                self.refresh(session)
+            if session.active:
+                self._trade(session, symbol, float(close), snapshot)
+
+    def _trade(self, session: Session, symbol: str, close: float, snapshot: dict):
+        closed = set()
+        pos    = session.positions.get(symbol)
+        if pos and not exits.enabled(self.cfg):
+            pos["price"]      = close
+            pos["unreal_pct"] = (close / pos["avg_cost"] - 1) * 100
+            closed = check_stops_and_targets(session.executor, {symbol: pos}, self.cfg)
+
+        traded = bool(closed)
+        if snapshot:
+            run_signals(session.executor, snapshot, session.positions,
+                        session.equity, self.cfg, closed, session.exits, session.orders)
+            traded = traded or snapshot[symbol]["signal"] is not None
+
+        if traded:
+            try:
+                session.positions = get_positions(session.client)
+                self._sync_orders(session)
+            except Exception as e:
+                print(f"  ❌ Position fetch failed: {e}")
+
+    def close(self):
+        for session in self.sessions:
+            session.executor.close()
+
+# ─── FEEDS ───────────────────────────────────────────────────────────────────
+
+def replay(cfg: dict, sessions: list[Session], bars: dict[str, pd.DataFrame],
+           start: datetime) -> StreamEngine:
+    """
+    Offline stand-in for the stream: bars before `start` seed the indicator
+    state, bars from `start` on are fed one at a time in timestamp order.
+    """
+    history = {s: Bars.from_frame(df[df.index < start]) for s, df in bars.items()}
+    engine  = StreamEngine(cfg, sessions, {s: b for s, b in history.items() if len(b)})
+    for session in sessions:
+        engine.refresh(session, force=True)
+
+    live   = [df[df.index >= start].assign(symbol=s) for s, df in bars.items()]
+    merged = pd.concat(live).sort_index(kind="stable")
+    for ts, row in zip(merged.index, merged.itertuples(index=False)):
+        engine.on_bar(row.symbol, ts.to_pydatetime(), row.high, row.low, row.close, row.volume)
+        if not engine.active:
+            break
+
+    engine.close()
+    return engine
+
+
+def run_daemon(accounts: list[tuple[str, str, str, str]], cfg: dict):
+    """Stream minute bars for cfg["symbols"] until the market closes."""
+    sessions = [
+        Session(name, clients.trading_client(name, key, secret, url, cfg), cfg)
+        for name, key, secret, url in accounts
+    ]
+    _, key, secret, _ = accounts[0]
+
+    clock = sessions[0].client.get_clock()
+    if not clock.is_open:
+        print("  Market is closed. Skipping.")
+        return
+
+    print(f"\n  📡 Daemon mode: streaming {len(cfg['symbols'])} symbols until "
+          f"{clock.next_close.strftime('%H:%M %Z')}")
+    history = fetch_bars(clients.data_client(key, secret, cfg), cfg)
+    engine  = StreamEngine(cfg, sessions, history)
+    for session in sessions:
+        engine.refresh(session, force=True)
+
+    stream = StockDataStream(key, secret, feed=DataFeed.IEX)
+
+    async def on_bar(bar):
+        # Blocking API calls run off the event loop so the socket stays serviced
+        await asyncio.to_thread(engine.on_bar, bar.symbol, bar.timestamp,
+                                bar.high, bar.low, bar.close, bar.volume)
+        if not engine.active:
+            await stream.stop_ws()
+
+    # Stop at the bell even if no more bars arrive
+    until_close = (clock.next_close - datetime.now(timezone.utc)).total_seconds()
+    timer = threading.Timer(max(until_close, 0) + 60, stream.stop)
+    timer.daemon = True
+    timer.start()
+
+    stream.subscribe_bars(on_bar, *cfg["symbols"])
+    try:
+        stream.run()
+    finally:
+        timer.cancel()
+        engine.close()
+        print("\n  📡 Daemon stopped.")
@@ -0,0 +1,15 @@
+import os
+import sys
+import json
+import pytest
+
+# The bot's modules live flat at the repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def base_cfg() -> dict:
+    """The repo's config.json."""
+    with open(os.path.join(ROOT, "config.json"), "r") as f:
+        return json.load(f)
@@ -0,0 +1,31 @@
+"""analytics.performance on ledgers with nothing to match yet."""
+
+import pandas as pd
+
+from analytics import performance
+from ledger import FIELDS
+
+
+def fills(rows: list[dict]) -> pd.DataFrame:
+    df = pd.DataFrame(rows, columns=FIELDS)
+    for col in ("submitted_at", "filled_at"):
+        df[col] = pd.to_datetime(df[col], utc=True)
+    return df
+
+
+def test_no_round_trips_yet():
+    buy = {"id": "1", "client_order_id": "sig-smv-1", "symbol": "AAPL", "side": "buy",
+           "qty": 10, "price": 100.0, "submitted_at": "2026-10-16T14:00:00Z",
+           "filled_at": "2026-10-16T14:00:01Z"}
+    for df in (pd.DataFrame(columns=FIELDS), fills([buy])):
+        summary = performance(df)["summary"]
+        assert summary["trades"] == 0 and summary["realized_pnl"] == 0.0
+
+
+def test_round_trip():
+    rows = [{"id": str(i), "client_order_id": f"sig-smv-{i}", "symbol": "AAPL", "side": side,
+             "qty": 10, "price": price, "submitted_at": f"2026-10-16T1{i}:00:00Z",
+             "filled_at": f"2026-10-16T1{i}:00:01Z"}
+            for i, (side, price) in enumerate([("buy", 100.0), ("sell", 103.0)], start=4)]
+    summary = performance(fills(rows))["summary"]
+    assert summary["trades"] == 1 and summary["realized_pnl"] == 30.0
@@ -0,0 +1,70 @@
+"""backtest.simulate against hand-built cycles: broker exits, trailing stop, scan order."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import simulate
+
+NAN = np.nan
+
+
+def prepared(px, sg, lo=None, hi=None, mo=None) -> dict:
+    px = np.array(px, dtype=float)
+    t  = len(px)
+    return {
+        "symbols": [f"S{j}" for j in range(px.shape[1])],
+        "times":   pd.date_range("2026-10-16 14:00", periods=t, freq="5min", tz="UTC"),
+        "px":      px,
+        "sg":      np.array(sg, dtype=float),
+        "mo":      np.zeros_like(px) if mo is None else np.array(mo, dtype=float),
+        "lo":      px if lo is None else np.array(lo, dtype=float),
+        "hi":      px if hi is None else np.array(hi, dtype=float),
+        "first":   px,
+        "day_id":  np.zeros(t),
+    }
+
+
+@pytest.fixture
+def cfg(base_cfg) -> dict:
+    return {**base_cfg, "stop_loss_pct": 0.03, "take_profit_pct": 0.06,
+            "daily_profit_target_pct": 10, "daily_loss_limit_pct": 10,
+            "max_trade_pct": 0.10, "max_position_pct": 0.20, "bracket_exits": True}
+
+
+def sells(result) -> list[tuple]:
+    t = result["trades"]
+    return [(r.reason, r.price) for r in t[t["side"] == "sell"].itertuples()]
+
+
+def test_stop_fills_intrabar_at_the_stop(cfg):
+    # Bought at 100.10; the low between cycles dips to 96 and recovers by the close
+    r = simulate(prepared([[100], [99], [99]], [[1], [0], [0]],
+                          lo=[[100], [96], [99]]), cfg)
+    assert sells(r) == [("stop", round(100.10 * 0.97, 2))]
+
+
+def test_sweep_misses_the_same_dip(cfg):
+    r = simulate(prepared([[100], [99], [99]], [[1], [0], [0]],
+                          lo=[[100], [96], [99]]), {**cfg, "bracket_exits": False})
+    assert sells(r) == []
+
+
+def test_take_profit_at_the_limit(cfg):
+    r = simulate(prepared([[100], [101], [101]], [[1], [0], [0]],
+                          hi=[[100], [107], [101]]), cfg)
+    assert sells(r) == [("take", round(100.10 * 1.06, 2))]
+
+
+def test_stop_ratchets_to_the_trailing_floor(cfg):
+    # Up 5.9%: the stop rises to 1.5% under 106; the dip to 104 then takes it out
+    r = simulate(prepared([[100], [106], [105], [105]], [[1], [0], [0], [0]],
+                          lo=[[100], [106], [104], [105]]), cfg)
+    assert sells(r) == [("stop", round(106 * (1 - 0.03 * 0.5), 2))]
+
+
+def test_buys_follow_the_scan_ranking(cfg):
+    # One slot, two buy signals: the stronger momentum gets it, not watchlist order
+    r = simulate(prepared([[100, 100]], [[1, 1]], mo=[[0.001, 0.02]]),
+                 {**cfg, "max_open_positions": 1})
+    assert list(r["trades"]["symbol"]) == ["S1"]
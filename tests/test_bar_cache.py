@@ -0,0 +1,71 @@
+"""bar_cache.get_cached_bars: what each run fetches, and what it returns."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import bar_cache
+from bars import Bars
+from bench import synthetic_bars
+from utils import history_start
+
+END = datetime(2026, 10, 16, 19, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    """The data API over synthetic bars; records (symbols, start) per request."""
+    full  = {s: Bars.from_frame(df) for s, df in synthetic_bars(2, 8, end=END, seed=1).items()}
+    calls = []
+
+    def get_bars_batch(client, symbols, start=None, now=None, **kw):
+        calls.append((sorted(symbols), start))
+        out = {}
+        for s in symbols:
+            bars = full[s].since(start.timestamp())
+            bars = bars[:int((bars.ts <= now.timestamp()).sum())]
+            if len(bars):
+                out[s] = bars
+        return out
+
+    monkeypatch.setattr(bar_cache, "get_bars_batch", get_bars_batch)
+    return full, calls
+
+
+def run(tmp_path, now: datetime, lookback: int) -> dict:
+    return bar_cache.get_cached_bars(None, ["SYM000", "SYM001"], str(tmp_path),
+                                     lookback=lookback, now=now)
+
+
+def test_warm_runs_fetch_only_new_bars(tmp_path, feed):
+    full, calls = feed
+    run(tmp_path, END - timedelta(minutes=30), 300)
+    bars = run(tmp_path, END - timedelta(minutes=25), 300)
+
+    (_, cold), (_, warm) = calls
+    assert cold == history_start(END - timedelta(minutes=30), 300)
+    assert warm > END - timedelta(minutes=32)
+    assert bars["SYM000"].ts[-1] == int((END - timedelta(minutes=25)).timestamp())
+
+
+def test_longer_lookback_backfills_the_head(tmp_path, feed):
+    full, calls = feed
+    run(tmp_path, END - timedelta(minutes=30), 300)
+    bars = run(tmp_path, END - timedelta(minutes=25), 1500)
+
+    start = history_start(END - timedelta(minutes=25), 1500)
+    assert calls[-1][1] == start
+    assert bars["SYM000"].ts[0] == full["SYM000"].since(start.timestamp()).ts[0]
+
+
+def test_cutoff_in_a_gap_stays_warm(tmp_path, feed):
+    """No bar at the window start itself (a quiet minute) isn't a missing head."""
+    full, calls = feed
+    start = history_start(END - timedelta(minutes=30), 300).timestamp()
+    for s, bars in full.items():                      # nothing for 20 minutes after the cutoff
+        keep    = (bars.ts < start) | (bars.ts >= start + 20 * 60)
+        full[s] = Bars(bars.ts[keep], bars.block[:, keep])
+
+    run(tmp_path, END - timedelta(minutes=30), 300)
+    run(tmp_path, END - timedelta(minutes=25), 300)
+    assert len(calls) == 2 and calls[1][1] > END - timedelta(minutes=32)
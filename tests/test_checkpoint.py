@@ -0,0 +1,82 @@
+"""checkpoint.Checkpoint: when a run resumes the last cycle, and what it skips."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from accounts import run_accounts
+from checkpoint import Checkpoint, open_checkpoint
+
+T0     = datetime(2026, 10, 16, 15, 0, 5, tzinfo=timezone.utc)
+WINDOW = 240
+
+
+def order(symbol: str, side: str = "buy"):
+    return SimpleNamespace(symbol=symbol, side=side, order_class=None, client_order_id=f"sig-{symbol}")
+
+
+def interrupted(path) -> Checkpoint:
+    """A cycle that finished account A, sent a buy for B and then died."""
+    ckpt = Checkpoint(str(path), T0, WINDOW)
+    ckpt.set_snapshot({"X": None}, ["X"])
+    ckpt.finish("A")
+    ckpt.record("B", "X", order("X"))
+    return ckpt
+
+
+def test_interrupted_cycle_resumes_on_the_same_bar(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    interrupted(path)
+    retry = Checkpoint(str(path), T0 + timedelta(seconds=30), WINDOW)
+    assert retry.resumed
+    assert retry.done("A") and not retry.done("B")
+    assert retry.sent("B") == {("X", "buy")}
+    assert retry.snapshot() == ({"X": None}, ["X"])
+
+
+def test_new_bar_trades_finished_accounts_again(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    interrupted(path)
+    retry = Checkpoint(str(path), T0 + timedelta(minutes=2), WINDOW)
+    assert retry.resumed
+    assert not retry.done("A")
+    assert retry.snapshot() is None
+    assert retry.sent("B") == {("X", "buy")}
+
+
+def test_complete_cycle_is_never_resumed(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    ckpt = interrupted(path)
+    ckpt.finish("B")
+    assert ckpt.complete(["A", "B"])
+    tick = Checkpoint(str(path), T0 + timedelta(seconds=30), WINDOW)
+    assert not tick.resumed
+    assert not tick.done("A") and tick.sent("B") == set()
+
+
+def test_retries_dont_extend_the_window(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    interrupted(path)
+    retry = Checkpoint(str(path), T0 + timedelta(seconds=200), WINDOW)
+    retry.finish("B")                        # saves; "started" stays the first attempt's
+    late = Checkpoint(str(path), T0 + timedelta(seconds=WINDOW + 1), WINDOW)
+    assert retry.resumed and not late.resumed
+
+
+def test_failed_account_leaves_the_cycle_open(tmp_path):
+    """An account that raises mid-cycle (run_accounts only logs it) isn't complete."""
+    cfg  = {"checkpoint_path": str(tmp_path / "checkpoint.json"), "checkpoint_window_sec": WINDOW}
+    ckpt = open_checkpoint(cfg, T0)
+
+    def job(name, *_):
+        ckpt.record(name, "X", order("X"))
+        if name == "B":
+            raise ConnectionError("API outage")
+        ckpt.finish(name)
+
+    run_accounts([("A", "", "", ""), ("B", "", "", "")], job, workers=2)
+    assert not ckpt.complete(["A", "B"])
+
+    retry = open_checkpoint(cfg, T0 + timedelta(seconds=30))
+    assert retry.resumed
+    assert retry.done("A") and not retry.done("B")
+    assert retry.sent("B") == {("X", "buy")}
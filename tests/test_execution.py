@@ -0,0 +1,57 @@
+"""execution order tags: every registered indicator survives signal_order_id → order_signals."""
+
+from itertools import combinations
+
+import pytest
+
+import indicators
+from execution import signal_order_id, order_signals
+from indicators import REGISTRY
+
+
+class Extra(indicators.Indicator):
+    """A stand-in for an indicator added after the built-in ones."""
+    name = "extra"
+    tag  = "z"
+
+    def lookback(self, cfg):
+        return 1
+
+    def compute(self, g, minutes, cfg):
+        return {}
+
+    def vote(self, v, cfg):
+        return False, False
+
+    def stats(self, v):
+        return {}
+
+    def describe(self, stats, cfg):
+        return ""
+
+
+@pytest.fixture
+def extra():
+    """Extra, registered for one test."""
+    indicators.register(Extra)
+    yield
+    REGISTRY.pop(Extra.name)
+
+
+def test_every_indicator_round_trips_through_the_order_tag():
+    names = list(REGISTRY)
+    for n in range(len(names) + 1):
+        for bullish in combinations(names, n):
+            cid = signal_order_id({f"{name}_bull": True for name in bullish})
+            assert order_signals(cid) == set(bullish), cid
+
+
+def test_newly_registered_indicator_is_tagged(extra):
+    cid = signal_order_id({"extra_bull": True, "sma_bull": True})
+    assert order_signals(cid) == {"extra", "sma"}
+
+
+def test_untagged_orders():
+    assert order_signals(None) is None
+    assert order_signals("3f2a9c") is None
+    assert order_signals(signal_order_id({})) == set()
@@ -0,0 +1,116 @@
+"""
+incremental.py against the pandas path (utils.generate_signals): the same
+signal and stats on every cycle of a replay, with the state carried between
+cycles as the bot does.
+"""
+
+import math
+import pandas as pd
+import pytest
+
+import incremental
+from bars import Bars
+from bench import synthetic_bars
+from utils import generate_signals, today_slice, session_start, lookback_bars
+
+CYCLE    = 11          # bars between replayed runs
+MACD_TOL = 1e-5        # the EMAs are seeded at the first bar ever seen, not the window start
+TOL      = 1e-9
+
+MULTI_TF = {"sma": 5, "rsi": 3, "macd": 15, "vwap": 1}
+
+
+def runs(df: pd.DataFrame, cfg: dict):
+    """
+    (window, now) per replayed cycle: the last lookback_bars × 1.3 bars, and
+    never less than all of today's, like the live fetch (utils.history_start).
+    """
+    full = Bars.from_frame(df)
+    size = int(lookback_bars(cfg) * 1.3)
+    for i in range(size, len(full), CYCLE):
+        now   = df.index[i].to_pydatetime() + pd.Timedelta(seconds=30)
+        open_ = int((full.ts < session_start(now).timestamp()).sum())
+        yield full[max(0, min(i + 1 - size, open_)):i + 1], now
+
+
+def assert_same(got: tuple, want: tuple):
+    signal, stats = got
+    assert signal == want[0]
+    assert stats.keys() == want[1].keys()
+    for k, y in want[1].items():
+        x = stats[k]
+        if isinstance(y, float):
+            if math.isnan(y):
+                assert math.isnan(x), k
+            else:
+                tol = MACD_TOL if k.startswith("macd") else TOL
+                assert abs(x - y) <= tol * max(abs(y), 1), (k, x, y)
+        else:
+            assert x == y, k
+
+
+def replay(df: pd.DataFrame, cfg: dict, symbol: str = "SYM", states: dict | None = None) -> int:
+    """Every cycle's evaluate_symbol vs generate_signals; returns the cycles compared."""
+    states = {} if states is None else states
+    cycles = 0
+    for window, now in runs(df, cfg):
+        got   = incremental.evaluate_symbol(states, symbol, window, cfg, now)
+        today = today_slice(window, now)
+        if today is None:
+            continue
+        assert_same(got, generate_signals(window, today, cfg))
+        cycles += 1
+    return cycles
+
+
+@pytest.mark.parametrize("overrides, days", [
+    ({}, 5),
+    ({"timeframes": MULTI_TF}, 12),
+    ({"indicators": {"sma": 1, "rsi": 1, "macd": 2, "vwap": 1, "atr": 1, "bollinger": 1}}, 5),
+], ids=["minute", "multi-timeframe", "all-indicators"])
+def test_sliding_windows_match_pandas(base_cfg, overrides, days):
+    cfg  = {**base_cfg, **overrides}
+    bars = synthetic_bars(2, days, gaps=0.03, zero_volume=0.03, seed=4)
+    for symbol, df in bars.items():
+        assert replay(df, cfg, symbol) > 100
+
+
+def test_advance_and_evaluate_match_pandas(base_cfg):
+    df    = synthetic_bars(1, 5, seed=2)["SYM000"]
+    state = None
+    for window, now in runs(df, base_cfg):
+        state = incremental.advance(state, window, base_cfg)
+        today = today_slice(window, now)
+        if today is not None:
+            assert_same(incremental.evaluate(state, window, base_cfg, now),
+                        generate_signals(window, today, base_cfg))
+
+
+@pytest.mark.parametrize("overrides, days", [({}, 5), ({"timeframes": MULTI_TF}, 12)],
+                         ids=["minute", "multi-timeframe"])
+def test_json_round_trip_between_runs(base_cfg, tmp_path, overrides, days):
+    """States written and re-read every cycle give exactly what in-memory states give."""
+    cfg    = {**base_cfg, **overrides}
+    df     = synthetic_bars(1, days, gaps=0.03, seed=6)["SYM000"]
+    path   = str(tmp_path / "indicators.json")
+    memory = {}
+    for window, now in runs(df, cfg):
+        states = incremental.load_states(path)
+        got    = incremental.evaluate_symbol(states, "SYM000", window, cfg, now)
+        incremental.save_states(path, states)
+        want   = incremental.evaluate_symbol(memory, "SYM000", window, cfg, now)
+        assert got[0] == want[0]
+        assert got[1] == pytest.approx(want[1], rel=0, abs=0, nan_ok=True)
+
+
+def test_zero_volume_and_flat_bars(base_cfg):
+    """Zero-volume minutes (VWAP) and a flat tape (RSI 0/0 = NaN) agree with pandas."""
+    df   = synthetic_bars(1, 5, zero_volume=0.3, seed=8)["SYM000"].copy()
+    flat = df.index >= df.index[-60]
+    df.loc[flat, ["open", "high", "low", "close"]] = float(df["close"].iloc[-61])
+
+    assert replay(df, base_cfg) > 100
+    window, now = list(runs(df, base_cfg))[-1]
+    signal, stats = incremental.evaluate_symbol({}, "SYM000", window, base_cfg, now)
+    assert math.isnan(stats["rsi"])
+    assert_same((signal, stats), generate_signals(window, today_slice(window, now), base_cfg))
@@ -0,0 +1,69 @@
+"""
+indicators.py registry: an indicator missing a method, or without a usable
+order tag, fails when it's registered, not when a cycle first calls it.
+"""
+
+import pytest
+
+import indicators
+
+
+def test_incomplete_indicator_fails_at_registration():
+    before = dict(indicators.REGISTRY)
+
+    with pytest.raises(TypeError, match="describe"):
+        @indicators.register
+        class Partial(indicators.Indicator):
+            name = "partial"
+            tag  = "p"
+
+            def lookback(self, cfg):
+                return 1
+
+            def compute(self, g, minutes, cfg):
+                return {}
+
+            def vote(self, v, cfg):
+                return False, False
+
+            def stats(self, v):
+                return {}
+
+    assert indicators.REGISTRY == before
+
+
+def tagged(tag: str):
+    class Tagged(indicators.Indicator):
+        name = "tagged"
+
+        def lookback(self, cfg):
+            return 1
+
+        def compute(self, g, minutes, cfg):
+            return {}
+
+        def vote(self, v, cfg):
+            return False, False
+
+        def stats(self, v):
+            return {}
+
+        def describe(self, stats, cfg):
+            return ""
+
+    Tagged.tag = tag
+    return Tagged
+
+
+@pytest.mark.parametrize("tag", ["", "_", "xy", "S", "s"], ids=["missing", "underscore", "two", "upper", "taken"])
+def test_bad_tag_fails_at_registration(tag):
+    before = dict(indicators.REGISTRY)
+    with pytest.raises(ValueError, match="tag"):
+        indicators.register(tagged(tag))
+    assert indicators.REGISTRY == before
+
+
+def test_registered_indicators_are_complete():
+    assert {"sma", "rsi", "macd", "vwap", "atr", "bollinger"} <= indicators.REGISTRY.keys()
+    for ind in indicators.REGISTRY.values():
+        assert not getattr(type(ind), "__abstractmethods__", None), ind.name
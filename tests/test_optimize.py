@@ -0,0 +1,25 @@
+"""optimize.write_best: the written config must run as-is."""
+
+import json
+
+from bench import synthetic_bars
+from backtest import run_backtest
+from optimize import sweep, write_best
+
+
+def test_write_best_round_trip(tmp_path, base_cfg):
+    bars   = synthetic_bars(3, 3, seed=1)
+    cfg    = {**base_cfg, "symbols": list(bars)}
+    combos = [{"sma_fast": 5, "sma_slow": 21, "rsi_period": 7, "stop_loss_pct": 0.02},
+              {"sma_fast": 8, "sma_slow": 30, "rsi_period": 14, "stop_loss_pct": 0.03}]
+    table  = sweep(bars, cfg, combos, workers=1)
+
+    path = tmp_path / "config.best.json"
+    write_best(table, cfg, list(combos[0]), str(path))
+    with open(path, "r") as f:
+        best = json.load(f)
+
+    for k in ("sma_fast", "sma_slow", "rsi_period"):
+        assert type(best[k]) is int, k
+    assert type(best["stop_loss_pct"]) is float
+    assert "summary" in run_backtest(bars, best)
@@ -0,0 +1,22 @@
+"""report.py follows config.json's backend, not only BOT_BACKEND."""
+
+import sim
+import report
+from bars import Bars
+from bar_cache import save_bars
+from bench import synthetic_bars
+
+
+def test_account_report_uses_the_configured_sim_backend(tmp_path, monkeypatch):
+    monkeypatch.delenv("BOT_BACKEND", raising=False)
+    monkeypatch.setattr(sim, "_market", None)
+    bars = synthetic_bars(2, 2, seed=3)
+    for symbol, df in bars.items():
+        save_bars(str(tmp_path / "history"), symbol, Bars.from_frame(df))
+    cfg = {"backend": "sim", "symbols": list(bars),
+           "sim_bars_dir": str(tmp_path / "history"), "ledger_dir": str(tmp_path / "ledger")}
+
+    text = report.build_account_report("Account 1", None, None, "paper", cfg)
+    assert "Equity:" in text
+    assert "error" not in text.lower()
+    assert sim._market is not None
@@ -0,0 +1,111 @@
+"""
+bot.run_signals: signals that would duplicate an order already working or
+already sent, and when the candidate scan stops.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+from alpaca.trading.enums import OrderClass, OrderSide
+
+import bot
+from bars import Bars
+from bench import synthetic_bars
+from scan import Budget, SCAN_CHUNK
+
+SYMBOLS = [f"SYM{i:03d}" for i in range(30)]
+
+
+class Executor:
+    """OrderExecutor stand-in that records instead of submitting."""
+
+    def __init__(self):
+        self.submitted, self.replaced, self.cancelled = [], [], []
+
+    def submit(self, symbol, req):
+        self.submitted.append((symbol, req.side))
+
+    def replace(self, symbol, order_id, req):
+        self.replaced.append(symbol)
+
+    def cancel(self, symbol, order_id):
+        self.cancelled.append(symbol)
+
+    def drain(self):
+        return []
+
+
+@pytest.fixture
+def cfg(base_cfg):
+    return {**base_cfg, "symbols": SYMBOLS, "bracket_exits": False}
+
+
+@pytest.fixture
+def market(cfg):
+    """{symbol: {signal, stats, price}} from real bars; tests set the signals."""
+    frames = synthetic_bars(len(SYMBOLS), 3, seed=5)
+    bars   = {s: Bars.from_frame(df) for s, df in frames.items()}
+    now    = max(df.index[-1] for df in frames.values()).to_pydatetime()
+    snap   = bot.evaluate_signals(bars, SYMBOLS, cfg, now)
+    assert list(snap) == SYMBOLS
+    return snap
+
+
+def snapshot(market: dict, signals: dict) -> dict:
+    return {s: {**v, "signal": signals.get(s)} for s, v in market.items()}
+
+
+def working_buy(symbol: str, price: float):
+    return SimpleNamespace(symbol=symbol, side=OrderSide.BUY, qty=1, id=f"o-{symbol}",
+                           limit_price=round(price * 1.001, 2), order_class=OrderClass.SIMPLE)
+
+
+def test_held_symbol_with_a_working_buy_is_not_bought_again(market, cfg):
+    held  = {"SYM000": {"qty": 1, "avg_cost": 1.0, "price": 1.0}}
+    snap  = snapshot(market, {"SYM000": "buy"})
+    order = working_buy("SYM000", snap["SYM000"]["price"])
+    ex    = Executor()
+    bot.run_signals(ex, snap, held, 100_000, cfg, set(), open_orders=[order])
+    assert ex.submitted == [] and ex.replaced == []
+
+
+def test_signal_sent_by_an_interrupted_attempt_is_not_resent(market, cfg):
+    ex = Executor()
+    bot.run_signals(ex, snapshot(market, {"SYM000": "buy", "SYM001": "buy"}), {}, 100_000,
+                    cfg, set(), open_orders=[], sent={("SYM000", "buy")})
+    assert [s for s, _ in ex.submitted] == ["SYM001"]
+
+
+def scan_run(market, cfg, positions, budget=None):
+    """run_signals over every symbol as a ranked buy candidate; (executor, chunks scanned)."""
+    snap    = snapshot(market, {s: "buy" for s in SYMBOLS})
+    scanned = []
+
+    def scan(symbols):
+        scanned.append(symbols)
+        return snap
+
+    ex = Executor()
+    candidates = [s for s in SYMBOLS if s not in positions]
+    bot.run_signals(ex, {s: snap[s] for s in positions}, positions, 100_000, cfg, set(),
+                    open_orders=[], candidates=candidates, scan=scan, budget=budget)
+    return ex, scanned
+
+
+def test_scan_stops_when_the_free_slots_are_taken(market, cfg):
+    ex, scanned = scan_run(market, {**cfg, "max_open_positions": 2}, {})
+    assert [s for s, _ in ex.submitted] == SYMBOLS[:2]
+    assert scanned == [SYMBOLS[:SCAN_CHUNK]]
+
+
+def test_no_candidates_scanned_without_free_slots(market, cfg):
+    held = {s: {"qty": 1, "avg_cost": 1.0, "price": 1.0} for s in SYMBOLS[:2]}
+    ex, scanned = scan_run(market, {**cfg, "max_open_positions": 2}, held)
+    assert scanned == [] and ex.submitted == []
+
+
+def test_no_candidates_scanned_once_the_budget_is_spent(market, cfg):
+    spent = Budget(5, started=Budget(None).started - 10)
+    assert spent.expired()
+    ex, scanned = scan_run(market, cfg, {}, spent)
+    assert scanned == [] and ex.submitted == []
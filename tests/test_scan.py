@@ -0,0 +1,37 @@
+"""scan.py: held symbols first, candidates best pre-filter score first, and the cycle budget."""
+
+import math
+
+from bars import Bars
+from bench import synthetic_bars
+from scan import Budget, rank, scan_order
+
+WATCHLIST = ["A", "B", "C", "D", "E"]
+
+
+def test_held_symbols_come_first_in_watchlist_order():
+    first, rest = scan_order(WATCHLIST, {"D", "B"}, ["E", "D", "C", "B", "A"])
+    assert first == ["B", "D"]
+    assert rest == ["E", "C", "A"]
+
+
+def test_symbols_the_ranking_missed_go_last():
+    first, rest = scan_order(WATCHLIST + ["F"], {"A"}, ["C", "B", "Z"])
+    assert first == ["A"]
+    assert rest == ["C", "B", "D", "E", "F"]
+
+
+def test_rank_is_by_momentum(base_cfg):
+    frames = synthetic_bars(4, 2, seed=9)
+    bars   = {s: Bars.from_frame(df) for s, df in frames.items()}
+    n      = base_cfg["sma_fast"]
+    moves  = {s: b["close"][-1] / b["close"][-1 - n] for s, b in bars.items()}
+    ranked = rank([*bars, "NODATA"], bars, base_cfg)
+    assert ranked[:-1] == sorted(bars, key=lambda s: -moves[s])
+    assert ranked[-1] == "NODATA"
+
+
+def test_budget():
+    assert Budget(None).left() == math.inf and not Budget(0).expired()
+    assert Budget(5, started=Budget(None).started - 10).expired()
+    assert not Budget(60).expired()
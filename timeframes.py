@@ -0,0 +1,109 @@
+"""
+timeframes.py — Per-indicator timeframes resampled from minute bars
+====================================================================
+config.json "timeframes" gives each indicator (indicators.REGISTRY) its bar
+size in minutes, e.g. {"sma": 5, "macd": 15}; unlisted indicators stay on
+1-minute bars. Coarser
+bars are built locally from the minute bars already fetched, so no extra
+StockBarsRequest is made per timeframe.
+
+Buckets are aligned to the 13:30 UTC open, never span two days, and are
+labelled with their start time. A bucket counts toward today's VWAP once it
+starts at/after the anchor, as a minute bar does. The newest bucket is
+usually still filling: its close is the latest minute's close, and like the
+forming minute bar it is evaluated but never committed to indicator state.
+
+Resampling is incremental: resample(..., since=ts) rebuilds only the buckets
+from `ts` on (the incremental engine passes its last committed bucket), and
+Resampler folds streaming minute bars into the open bucket one at a time.
+"""
+
+import numpy as np
+from bars import Bars, ROW
+from indicators import REGISTRY, weights
+
+OPEN_OFFSET = 13 * 3600 + 30 * 60      # 13:30 UTC, seconds into the day
+DAY         = 86400
+
+# ─── CONFIG ──────────────────────────────────────────────────────────────────
+
+def timeframes(cfg: dict) -> dict[str, int]:
+    """{indicator: minutes per bar} for every indicator (default 1)."""
+    tf = cfg.get("timeframes") or {}
+    return {k: max(int(tf.get(k, 1)), 1) for k in REGISTRY}
+
+
+def pick(values: dict[int, dict], cfg: dict) -> dict[str, dict]:
+    """
+    {indicator: values} for indicators.score from {minutes: {indicator:
+    values}} computed per timeframe, each taken from its own timeframe.
+    """
+    tf = timeframes(cfg)
+    return {name: values[tf[name]][name] for name in weights(cfg)}
+
+# ─── RESAMPLING ──────────────────────────────────────────────────────────────
+
+def bucket_start(ts, minutes: int):
+    """Start (epoch seconds) of the `minutes` bucket holding each epoch-second `ts`."""
+    size  = minutes * 60
+    day   = ts // DAY * DAY
+    start = day + OPEN_OFFSET + (ts - day - OPEN_OFFSET) // size * size
+    return np.maximum(start, day)
+
+
+def bar_count(bars: Bars, minutes: int) -> int:
+    """Number of `minutes` bars resample() would build from `bars`."""
+    if minutes <= 1 or bars.empty:
+        return len(bars)
+    starts = bucket_start(bars.ts, minutes)
+    return int(np.count_nonzero(np.diff(starts))) + 1
+
+
+def resample(bars: Bars, minutes: int, since: int | None = None) -> Bars:
+    """
+    OHLCV bars of `minutes` built from ascending minute `bars`. With `since`
+    (epoch seconds), only buckets from the one holding `since` on are built.
+    """
+    if since is not None:
+        bars = bars.since(bucket_start(since, minutes))
+    if minutes <= 1 or bars.empty:
+        return bars
+
+    starts = bucket_start(bars.ts, minutes)
+    first  = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    last   = np.r_[first[1:] - 1, len(starts) - 1]
+
+    x   = bars.block
+    out = x[:, last]                              # close and anything unlisted: last value
+    out[ROW["open"]]        = x[ROW["open"], first]
+    out[ROW["high"]]        = np.maximum.reduceat(x[ROW["high"]], first)
+    out[ROW["low"]]         = np.minimum.reduceat(x[ROW["low"]], first)
+    out[ROW["volume"]]      = np.add.reduceat(x[ROW["volume"]], first)
+    out[ROW["trade_count"]] = np.add.reduceat(x[ROW["trade_count"]], first)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[ROW["vwap"]] = (np.add.reduceat(x[ROW["vwap"]] * x[ROW["volume"]], first)
+                            / out[ROW["volume"]])
+    return Bars(starts[first], out)
+
+
+class Resampler:
+    """Streaming minute bars → `minutes` bars; the open bucket is updated in place."""
+
+    def __init__(self, minutes: int):
+        self.minutes = minutes
+        self.bucket  = None          # [start, high, low, close, volume]
+
+    def push(self, ts: int, high: float, low: float, close: float,
+             volume: float) -> list | None:
+        """Adds a minute bar; returns the bucket it closed, if it opened a new one."""
+        start = int(bucket_start(ts, self.minutes))
+        done  = None
+        if self.bucket is not None and self.bucket[0] != start:
+            done, self.bucket = self.bucket, None
+
+        if self.bucket is None:
+            self.bucket = [start, high, low, close, volume]
+        else:
+            b = self.bucket
+            b[1], b[2], b[3], b[4] = max(b[1], high), min(b[2], low), close, b[4] + volume
+        return done
@@ -0,0 +1,123 @@
+"""
+tracing.py — Per-stage timing and run trace
+============================================
+Lightweight instrumentation for bot.py:
+  - span("api.get_account", account="Account 1") — timed block; nests
+  - api("get_account")                          — span("api.get_account") + api_requests
+  - count("rows_fetched", 1500)                  — run-wide counters
+
+Every span is appended as one JSON line to the trace file when tracing is
+enabled (BOT_TRACE env var or "trace_path" in config.json), and summary()
+renders an end-of-run table of time per stage. Spans are thread-safe, so
+concurrent order submission is timed correctly.
+
+Span names used by the bot:
+  run, account, market.snapshot, fetch.bars, api.<method>, signals, orders.*
+"""
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from collections import defaultdict
+
+_lock     = threading.Lock()
+_local    = threading.local()
+_spans    = []                       # (name, duration_sec) for the summary
+_counters = defaultdict(int)
+_file     = None
+_next_id  = 0
+
+# ─── SETUP ───────────────────────────────────────────────────────────────────
+
+def enable(path: str | None):
+    """Start writing the JSONL trace to `path` (no-op if falsy)."""
+    global _file
+    if not path:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    _file = open(path, "a", buffering=1)
+
+
+def close():
+    global _file
+    if _file:
+        _write({"type": "counters", **_counters})
+        _file.close()
+        _file = None
+
+# ─── RECORDING ───────────────────────────────────────────────────────────────
+
+@contextmanager
+def span(name: str, **attrs):
+    """Time a block. Attributes and errors are recorded with the span."""
+    global _next_id
+    with _lock:
+        _next_id += 1
+        span_id = _next_id
+    stack  = getattr(_local, "stack", None) or []
+    parent = stack[-1] if stack else None
+    _local.stack = stack + [span_id]
+
+    start, wall, error = time.perf_counter(), time.time(), None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        _local.stack = stack
+        with _lock:
+            _spans.append((name, duration))
+        _write({
+            "type": "span", "name": name, "id": span_id, "parent": parent,
+            "start": round(wall, 6), "ms": round(duration * 1000, 3),
+            "thread": threading.current_thread().name,
+            **({"error": error} if error else {}), **attrs,
+        })
+
+
+@contextmanager
+def api(method: str, **attrs):
+    """span("api.<method>") that also bumps the api_requests counter."""
+    count("api_requests")
+    with span(f"api.{method}", **attrs) as a:
+        yield a
+
+
+def count(name: str, n: int = 1):
+    with _lock:
+        _counters[name] += n
+
+
+def _write(record: dict):
+    if _file:
+        line = json.dumps(record, default=str)
+        with _lock:
+            _file.write(line + "\n")
+
+# ─── SUMMARY ─────────────────────────────────────────────────────────────────
+
+def summary() -> str:
+    """End-of-run table: calls / total / mean / max per span name, then counters."""
+    with _lock:
+        spans    = list(_spans)
+        counters = dict(_counters)
+
+    stats = defaultdict(lambda: [0, 0.0, 0.0])
+    for name, duration in spans:
+        s = stats[name]
+        s[0] += 1
+        s[1] += duration
+        s[2] = max(s[2], duration)
+
+    lines = [f"  {'stage':<28} {'calls':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}",
+             f"  {'─'*28} {'─'*6} {'─'*10} {'─'*9} {'─'*9}"]
+    for name, (n, total, peak) in sorted(stats.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"  {name:<28} {n:>6} {total*1000:>10.1f} {total*1000/n:>9.1f} {peak*1000:>9.1f}")
+    if counters:
+        lines.append("")
+        lines += [f"  {name:<28} {value:>6}" for name, value in sorted(counters.items())]
+    return "\n".join(lines)
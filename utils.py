@@ -1,62 +1,128 @@
 """
 utils.py — Signal generation & data helpers
 ============================================
-Strategies (need 2-of-4 for a buy, 2-of-4 for a sell):
+Default strategies (need 2-of-4 for a buy, 2-of-4 for a sell):
   1. SMA trend       — fast SMA vs slow SMA crossover
   2. RSI momentum    — not overbought/oversold with direction filter
   3. MACD crossover  — histogram expanding in signal direction
   4. VWAP position   — price above/below intraday VWAP (today only)
+ATR and Bollinger votes, and per-indicator weights, are enabled through
+config.json "indicators" (indicators.py).
+
+Each indicator runs on 1-minute bars unless config.json "timeframes" puts it
+on coarser bars, which are resampled from the same minute bars (timeframes.py).
 
 Key fix from v1: VWAP now uses TODAY's bars only (proper intraday anchor).
 """
 
+import math
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, timezone
-from alpaca.data.historical import StockHistoricalDataClient
-from alpaca.data.requests import StockBarsRequest
-from alpaca.data.timeframe import TimeFrame
+from typing import TYPE_CHECKING
+from timeframes import timeframes, resample
+from bars import Bars, pack
+import indicators
+import tracing
+
+# alpaca-py's data stack is only imported by the fetchers below, so the
+# backtest, bench and vectorized paths that never fetch don't pay for it.
+if TYPE_CHECKING:
+    from alpaca.data.historical import StockHistoricalDataClient
 
 # ─── DATA FETCHERS ───────────────────────────────────────────────────────────
 
-def get_today_bars(data_client: StockHistoricalDataClient, symbol: str) -> pd.DataFrame | None:
-    """Fetch today's 1-minute bars (for VWAP). Returns None on failure."""
-    try:
-        now   = datetime.now(timezone.utc)
-        start = now.replace(hour=13, minute=25, second=0, microsecond=0)  # 9:25 AM ET
-        if now < start:
-            return None
-
-        req  = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Minute,
-                                start=start, end=now, feed="iex")
-        bars = data_client.get_stock_bars(req)
-        df   = bars.df
-        if isinstance(df.index, pd.MultiIndex):
-            df = df.xs(symbol, level=0)
-        return df.sort_index() if not df.empty else None
-    except Exception:
-        return None
+BATCH_SIZE      = 50     # symbols per StockBarsRequest (SDK follows page tokens itself)
+HISTORY_SLACK   = 1.5    # fetch this many times the bars needed (IEX skips quiet minutes)
+SESSION_OPEN    = timedelta(hours=13, minutes=30)
+SESSION_MINUTES = 390
+
 
+def session_start(now: datetime) -> datetime:
+    """Start of today's intraday window (9:25 AM ET) — VWAP anchor."""
+    return now.replace(hour=13, minute=25, second=0, microsecond=0)
 
-def get_multi_day_bars(data_client: StockHistoricalDataClient, symbol: str,
-                       days: int = 6) -> pd.DataFrame | None:
+
+def lookback_bars(cfg: dict) -> int:
+    """
+    Completed minute bars needed for warmed-up indicators: the bot's
+    sma_slow + 10 readiness check and each enabled indicator's declared
+    lookback (MACD's is MACD_WARMUP spans of the slow + signal EMAs, as
+    adjust=False EMAs carry their seed for a while), each in bars of its
+    own timeframe.
     """
-    Fetch minute bars for the past N calendar days.
-    Used for SMA, RSI, and MACD which need historical context.
+    tf = timeframes(cfg)
+    return max((cfg["sma_slow"] + 10) * tf["sma"], indicators.lookback(cfg, tf))
+
+
+def history_start(now: datetime, bars: int, slack: float = HISTORY_SLACK) -> datetime:
     """
-    try:
-        end   = datetime.now(timezone.utc)
-        start = end - timedelta(days=days)
-        req   = StockBarsRequest(symbol_or_symbols=symbol, timeframe=TimeFrame.Minute,
-                                 start=start, end=end, limit=1500, feed="iex")
-        bars  = data_client.get_stock_bars(req)
-        df    = bars.df
-        if isinstance(df.index, pd.MultiIndex):
-            df = df.xs(symbol, level=0)
-        df = df.sort_index()
-        return df if not df.empty else None
-    except Exception:
+    Earliest timestamp to request so the latest `bars` minute bars are
+    covered: walks back weekday sessions (13:30–20:00 UTC), counting each
+    one's minutes, with `slack` headroom for minutes IEX has no trades in.
+    Never later than today's VWAP anchor, which needs every bar of today.
+    """
+    need  = bars * slack
+    have  = 0.0
+    day   = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for _ in range(30):
+        open_ = day + SESSION_OPEN
+        close = min(day + SESSION_OPEN + timedelta(minutes=SESSION_MINUTES), now)
+        if day.weekday() < 5 and close > open_:
+            minutes = (close - open_).total_seconds() / 60
+            if have + minutes >= need:
+                start = close - timedelta(minutes=need - have)
+                return min(start, session_start(now))
+            have += minutes
+        day -= timedelta(days=1)
+    return day
+
+def get_bars_batch(data_client: "StockHistoricalDataClient", symbols: list[str],
+                   days: int = 6, batch_size: int = BATCH_SIZE,
+                   start: datetime | None = None, lookback: int | None = None,
+                   now: datetime | None = None) -> dict[str, Bars]:
+    """
+    Fetch minute bars for many symbols at once: since `start`, else enough
+    sessions for the latest `lookback` bars (see history_start), else the
+    past N calendar days. One StockBarsRequest per `batch_size` symbols;
+    pagination is handled by the SDK. Returns {symbol: Bars}, views into one
+    block per batch — symbols with no data (or whose batch failed) are
+    simply absent.
+    """
+    from alpaca.data.requests import StockBarsRequest
+    from alpaca.data.timeframe import TimeFrame
+
+    end = now or datetime.now(timezone.utc)
+    if start is None:
+        start = history_start(end, lookback) if lookback else end - timedelta(days=days)
+    out = {}
+
+    for i in range(0, len(symbols), batch_size):
+        chunk = symbols[i:i + batch_size]
+        try:
+            req  = StockBarsRequest(symbol_or_symbols=chunk, timeframe=TimeFrame.Minute,
+                                    start=start, end=end, feed="iex")
+            with tracing.api("get_stock_bars", symbols=len(chunk)) as attrs:
+                df = data_client.get_stock_bars(req).df
+                attrs["rows"] = len(df)
+            tracing.count("rows_fetched", len(df))
+            out.update(pack(df))
+        except Exception as e:
+            print(f"  ❌ Bar fetch failed for {chunk[0]}..{chunk[-1]}: {e}")
+
+    return out
+
+
+def today_slice(bars: Bars | None, now: datetime | None = None) -> Bars | None:
+    """Today's bars (for VWAP) cut from a multi-day window — a view, no extra request."""
+    if bars is None or bars.empty:
+        return None
+    now   = now or datetime.now(timezone.utc)
+    start = session_start(now)
+    if now < start:
         return None
+    today = bars.since(start.timestamp())
+    return today if not today.empty else None
 
 # ─── INDICATORS ──────────────────────────────────────────────────────────────
 
@@ -78,109 +144,43 @@ def macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9):
     return macd_line, signal_line, histogram
 
 
-def vwap_today(today_bars: pd.DataFrame) -> float | None:
+def vwap_today(today_bars: Bars | None) -> float | None:
     """VWAP calculated from today's bars only — correct intraday anchor."""
     if today_bars is None or today_bars.empty:
         return None
+    volume  = today_bars["volume"]
     typical = (today_bars["high"] + today_bars["low"] + today_bars["close"]) / 3
-    cum_tp_vol = (typical * today_bars["volume"]).cumsum()
-    cum_vol    = today_bars["volume"].cumsum()
-    vwap_series = cum_tp_vol / cum_vol.replace(0, np.nan)
-    return float(vwap_series.iloc[-1])
+    cum_vol = volume.sum()
+    return float(typical @ volume / cum_vol) if cum_vol else math.nan
 
 # ─── SIGNAL GENERATOR ────────────────────────────────────────────────────────
 
 def generate_signals(
-    bars_hist: pd.DataFrame,    # multi-day minute bars (for SMA/RSI/MACD)
-    bars_today: pd.DataFrame,   # today's minute bars (for VWAP)
+    bars_hist: Bars,            # multi-day minute bars (for SMA/RSI/MACD)
+    bars_today: Bars | None,    # today's minute bars (for VWAP)
     cfg: dict,
 ) -> tuple[str | None, dict]:
     """
     Returns (signal, stats) where signal is 'buy', 'sell', or None.
-    Requires 2-of-4 confirmations in the same direction.
+    The enabled indicators' weighted vote (see indicators.py), 2-of-4 by
+    default. Each indicator runs on its configured timeframe (see
+    timeframes.py), resampled from the minute bars; the newest, still-filling
+    bucket is included.
     """
-    close  = bars_hist["close"]
-    sma_fast_period = cfg["sma_fast"]
-    sma_slow_period = cfg["sma_slow"]
-    rsi_period      = cfg.get("rsi_period", 10)
-
-    # ── Compute indicators ───────────────────────────────────────────────────
-    sma_f_series = close.rolling(sma_fast_period).mean()
-    sma_s_series = close.rolling(sma_slow_period).mean()
-    rsi_series   = rsi(close, rsi_period)
-    macd_line, sig_line, hist_series = macd(close)
-    vwap_val     = vwap_today(bars_today)
-
-    # Latest values
-    sma_f      = float(sma_f_series.iloc[-1])
-    sma_s      = float(sma_s_series.iloc[-1])
-    rsi_val    = float(rsi_series.iloc[-1])
-    macd_hist  = float(hist_series.iloc[-1])
-    macd_hist_prev = float(hist_series.iloc[-2]) if len(hist_series) > 1 else 0.0
-    price      = float(close.iloc[-1])
-
-    # ── 1. SMA crossover (check last 3 bars for recent cross) ───────────────
-    recent_fast = sma_f_series.iloc[-3:]
-    recent_slow = sma_s_series.iloc[-3:]
-    bullish_cross = any(
-        recent_fast.iloc[i] > recent_slow.iloc[i] and
-        recent_fast.iloc[i-1] <= recent_slow.iloc[i-1]
-        for i in range(1, len(recent_fast))
+    tf    = timeframes(cfg)
+    used  = indicators.weights(cfg)
+    graph = indicators.Graph(
+        frames = {m: resample(bars_hist, m) for m in {tf[n] for n in used}},
+        today  = {tf[n]: today_buckets(bars_today, tf[n])
+                  for n in used if indicators.REGISTRY[n].today},
     )
-    bearish_cross = any(
-        recent_fast.iloc[i] < recent_slow.iloc[i] and
-        recent_fast.iloc[i-1] >= recent_slow.iloc[i-1]
-        for i in range(1, len(recent_fast))
-    )
-    sma_bullish = (sma_f > sma_s) or bullish_cross
-    sma_bearish = (sma_f < sma_s) or bearish_cross
-
-    # ── 2. RSI ───────────────────────────────────────────────────────────────
-    rsi_buy_min  = cfg.get("rsi_buy_min", 38)
-    rsi_overbought = cfg.get("rsi_overbought", 68)
-    rsi_sell_min = cfg.get("rsi_sell_min", 58)
-    # Buy: RSI in healthy momentum zone (not overbought, not extreme oversold)
-    rsi_bullish  = rsi_buy_min < rsi_val < rsi_overbought
-    # Sell: RSI elevated and price weakening
-    rsi_bearish  = rsi_val > rsi_sell_min
-
-    # ── 3. MACD histogram ────────────────────────────────────────────────────
-    # Bullish: histogram positive and expanding
-    macd_bullish = macd_hist > 0 and macd_hist > macd_hist_prev
-    # Bearish: histogram negative and expanding (more negative)
-    macd_bearish = macd_hist < 0 and macd_hist < macd_hist_prev
-
-    # ── 4. VWAP ──────────────────────────────────────────────────────────────
-    if vwap_val:
-        vwap_bullish = price > vwap_val
-        vwap_bearish = price < vwap_val
-    else:
-        # No intraday data yet — treat as neutral (don't count either way)
-        vwap_bullish = False
-        vwap_bearish = False
-
-    # ── Confirmation counts ──────────────────────────────────────────────────
-    buy_conf  = sum([sma_bullish, rsi_bullish, macd_bullish, vwap_bullish])
-    sell_conf = sum([sma_bearish, rsi_bearish, macd_bearish, vwap_bearish])
-
-    signal = None
-    threshold = cfg.get("signal_threshold", 2)
-    if buy_conf >= threshold:
-        signal = "buy"
-    elif sell_conf >= threshold:
-        signal = "sell"
-
-    stats = {
-        "sma_f":     sma_f,
-        "sma_s":     sma_s,
-        "rsi":       rsi_val,
-        "macd_hist": macd_hist,
-        "vwap":      vwap_val or 0.0,
-        "buy_conf":  buy_conf,
-        "sell_conf": sell_conf,
-        "sma_bull":  sma_bullish,
-        "rsi_bull":  rsi_bullish,
-        "macd_bull": macd_bullish,
-        "vwap_bull": vwap_bullish,
-    }
-    return signal, stats
+    return indicators.score(indicators.compute(graph, tf, cfg), cfg)
+
+
+def today_buckets(bars_today: Bars | None, minutes: int) -> Bars | None:
+    """Today's bars resampled to `minutes`, keeping buckets that start at/after the anchor."""
+    if bars_today is None or bars_today.empty or minutes <= 1:
+        return bars_today
+    anchor = session_start(datetime.fromtimestamp(int(bars_today.ts[0]), timezone.utc))
+    today  = resample(bars_today, minutes).since(anchor.timestamp())
+    return today if not today.empty else None
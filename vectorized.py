@@ -0,0 +1,100 @@
+"""
+vectorized.py — Whole-universe signal evaluation
+================================================
+Evaluates generate_signals for every symbol at once. Bars are stacked into
+(time × symbol) NumPy matrices, right-aligned on the latest bar: row -1 is
+each symbol's newest bar, row -2 the one before, and shorter histories are
+NaN-padded at the top. Aligning by bar position rather than wall-clock
+minute keeps each column's indicators identical to the per-symbol pandas
+path even when symbols have gaps at different minutes.
+
+The matrices go through the same indicators.Graph as the per-symbol path,
+so every enabled indicator is supported. Only the rows a vote reads are
+touched: rolling windows are filled for the newest few rows, the EMAs run
+over the full history (one vector op per row across all symbols), and VWAP
+is a masked sum over today's rows. With per-indicator timeframes each
+indicator reads its own stack of resampled bars (timeframes.py),
+right-aligned the same way.
+"""
+
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from utils import session_start
+from timeframes import timeframes, resample
+from bars import Bars
+from indicators import Graph, REGISTRY, weights, compute, vote
+
+# ─── MATRIX BUILD ────────────────────────────────────────────────────────────
+
+def stack_bars(all_bars: dict[str, Bars], symbols: list[str],
+               columns=("high", "low", "close", "volume")) -> dict[str, np.ndarray]:
+    """
+    {column: (rows × symbols) float64 matrix} right-aligned on each symbol's
+    newest bar, plus "timestamp" as epoch seconds (NaN where padded).
+    """
+    rows = max(len(all_bars[s]) for s in symbols)
+    out  = {c: np.full((rows, len(symbols)), np.nan) for c in ("timestamp", *columns)}
+
+    for j, sym in enumerate(symbols):
+        bars = all_bars[sym]
+        n    = len(bars)
+        out["timestamp"][rows - n:, j] = bars.ts
+        for c in columns:
+            out[c][rows - n:, j] = bars[c]
+    return out
+
+# ─── SIGNAL TABLE ────────────────────────────────────────────────────────────
+
+def today_rows(m: dict[str, np.ndarray], now: datetime) -> dict[str, np.ndarray]:
+    """The stacked columns with every row before today's session anchor NaN'd out."""
+    start = session_start(now)
+    today = m["timestamp"] >= start.timestamp() if now >= start else np.zeros_like(m["close"], bool)
+    return {c: np.where(today, x, np.nan) for c, x in m.items()}
+
+
+def signal_table(all_bars: dict[str, Bars], cfg: dict,
+                 now: datetime | None = None) -> pd.DataFrame:
+    """
+    generate_signals for every symbol in `all_bars` at once.
+    Returns a frame indexed by symbol with a "signal" column ('buy', 'sell'
+    or None) followed by the same keys as generate_signals' stats dict.
+    """
+    symbols = list(all_bars)
+    used    = weights(cfg)
+    if not symbols:
+        return pd.DataFrame(columns=["signal", *stat_columns(cfg)])
+
+    now    = now or datetime.now(timezone.utc)
+    tf     = timeframes(cfg)
+    stacks = {}
+    for minutes in {tf[n] for n in used}:
+        frames  = {s: resample(all_bars[s], minutes) for s in symbols}
+        columns = {c for n in used if tf[n] == minutes for c in REGISTRY[n].inputs}
+        stacks[minutes] = stack_bars(frames, symbols, sorted(columns))
+    today  = {tf[n]: today_rows(stacks[tf[n]], now) for n in used if REGISTRY[n].today}
+    values = compute(Graph(stacks, today), tf, cfg)
+    votes  = vote(values, cfg)
+
+    columns = {"signal": np.where(votes["signal"] > 0, "buy",
+                                  np.where(votes["signal"] < 0, "sell", None))}
+    for name in used:
+        columns.update(REGISTRY[name].stats(values[name]))
+    columns.update({k: v for k, v in votes.items() if k != "signal"})
+    return pd.DataFrame(columns, index=pd.Index(symbols, name="symbol"))
+
+
+def stat_columns(cfg: dict) -> list[str]:
+    """The stats keys generate_signals returns under `cfg`, in order."""
+    used = weights(cfg)
+    keys = [k for n in used for k in REGISTRY[n].stat_keys]
+    return [*keys, "buy_conf", "sell_conf", *(f"{n}_bull" for n in used)]
+
+
+def table_row(table: pd.DataFrame, symbol: str) -> tuple[str | None, dict]:
+    """(signal, stats) for one symbol, with plain Python types like generate_signals."""
+    row   = table.loc[symbol]
+    stats = {k: row[k].item() if hasattr(row[k], "item") else row[k]
+             for k in table.columns if k != "signal"}
+    signal = row["signal"] if isinstance(row["signal"], str) else None
+    return signal, stats